@@ -0,0 +1,45 @@
+import json
+import os
+import sys
+
+from draft_oracle import TournamentDraft
+from tests.baseline_features import compare, random_drafts
+
+
+# Microbenchmark + parity check for the compiled feature plan.
+#
+# Compares the per-call latency of the baseline per-feature dict construction
+# (tests/baseline_features.py: the original draft_oracle code, ported unchanged)
+# with `FeaturePlan.build`, checks that both produce bit-identical model rows and,
+# when a booster is loaded, that they give the same live win probability.
+#
+# Usage: python bench_feature_plan.py [n_drafts] [model_file]
+
+
+def main():
+    n_drafts = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    model_file = sys.argv[2] if len(sys.argv) > 2 else "draft_oracle_brain_v12_final.json"
+    app = TournamentDraft(model_file=model_file, quiet=True, refresh_champions=False)
+
+    feature_names = list(app.model_cols or [])
+    if not feature_names:
+        # No trained booster available: the plan only needs the feature layout.
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_features_v12.json")) as f:
+            feature_names = json.load(f)
+
+    result = compare(app, feature_names, random_drafts(sorted(app.role_map.keys()), n_drafts))
+    n = result["drafts"]
+    print(f"Synergy pairs: {result['synergy_pairs']} | differing from synergy_map: {result['synergy_mismatches']}")
+    print(f"Drafts: {n} | bit-identical rows: {n - result['mismatched_rows']}/{n}")
+    for name, count in sorted(result["mismatched_features"].items(), key=lambda kv: -kv[1]):
+        print(f"   {name}: differs in {count} rows")
+    if result["max_winprob_diff"] is not None:
+        print(f"Max live win probability difference: {result['max_winprob_diff']:.3g}")
+    print(f"Legacy dict build: {result['legacy_us']:8.1f} us/call")
+    print(f"Compiled plan:     {result['plan_us']:8.1f} us/call")
+    if result["mismatched_rows"] or result["synergy_mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import sys
+import time
+
+import numpy as np
+
+from draft_oracle import TournamentDraft
+from oracle_inference import BACKENDS, make_predictor, parity_error
+
+
+# Microbenchmark + parity check for the booster inference backends.
+#
+# Times single-row prediction (as done by predict_live_winrate) and one batched
+# what-if sized call for every backend, and checks each against Booster.predict
+# on a fixed set of random drafts.
+#
+# Usage: python bench_inference.py [model_file] [n_calls]
+
+
+def main():
+    model_file = sys.argv[1] if len(sys.argv) > 1 else "draft_oracle_brain_v12_final.json"
+    n_calls = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    app = TournamentDraft(model_file=model_file, quiet=True, refresh_champions=False)
+    if app.feature_plan is None:
+        print(f"No usable booster in {model_file}")
+        sys.exit(1)
+
+    probe = app._probe_rows(1024)
+    row = np.ascontiguousarray(probe[:1])
+    batch = np.ascontiguousarray(probe[:750])  # ~3 open roles x 250 SoloQ candidates
+
+    failed = False
+    for name in BACKENDS:
+        predictor = make_predictor(app.model, app.model_cols, name, quiet=False)
+        if predictor.backend != name:
+            continue
+        err = parity_error(predictor, probe)
+
+        predictor.predict(row)
+        t0 = time.perf_counter()
+        for _ in range(n_calls):
+            predictor.predict(row)
+        single = (time.perf_counter() - t0) / n_calls
+
+        t0 = time.perf_counter()
+        for _ in range(10):
+            predictor.predict(batch)
+        batched = (time.perf_counter() - t0) / 10
+
+        print(f"{name:8s} single row: {single * 1e6:8.1f} us | {len(batch)} rows: {batched * 1e3:6.2f} ms | max abs diff {err:.2e}")
+        failed = failed or err > 1e-5
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+# Whole-column versions of the suggestion score components.
+#
+# Every function takes per-candidate arrays aligned with a CandidateTable and returns
+# one value per candidate; the rules and constants are the ones the per-candidate
+# scorers in draft_oracle used. Notes are kept as small integer codes so the text is
+# only formatted for candidates that end up in the response.
+
+# Pro signature kinds (see pro_bias / pro_note).
+PRO_NONE, PRO_GOD, PRO_MAIN, PRO_POOR, PRO_EXPERIENCE, PRO_ERR = range(6)
+_PRO_BONUS = np.asarray([0.0, 0.4, 0.6, -0.10, 0.05, 0.0])
+
+# Tournament meta kinds (see meta_bias / meta_note).
+META_NONE, META_KING, META_HIDDEN_OP, META_META = range(4)
+_META_BONUS = np.asarray([0.0, 0.06, 0.04, 0.02])
+
+
+def pro_bias(
+    found: np.ndarray,
+    games: np.ndarray,
+    winrate: np.ndarray,
+    proficiency: np.ndarray,
+    is_pro_match: bool,
+    invalid: np.ndarray = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(bonus, kind) from a player's signature stats on each candidate.
+
+    `found` marks candidates the player has a signature row for; `invalid` marks rows
+    with unusable (null) stats, which score 0 with an "Err" note as before.
+    """
+
+    wr = winrate * 100
+    kind = np.select(
+        [~found, proficiency > 0.3, games > 15, (wr < 40) & (games > 5)],
+        [PRO_NONE, PRO_GOD, PRO_MAIN, PRO_POOR],
+        PRO_EXPERIENCE,
+    )
+    if invalid is not None:
+        kind = np.where(found & invalid, PRO_ERR, kind)
+
+    bonus = _PRO_BONUS[kind]
+    if is_pro_match:
+        # In pro matches signature picks should dominate: 1.5x on positive bonuses.
+        bonus = np.where(bonus > 0, bonus * 1.5, bonus)
+    return bonus, kind
+
+
+def pro_note(kind: int, games: int, winrate: float) -> str:
+    wr = winrate * 100
+    if kind == PRO_GOD:
+        return f"Pro GOD ({games}g {wr:.0f}%)"
+    if kind == PRO_MAIN:
+        return f"Pro Main ({games}g)"
+    if kind == PRO_POOR:
+        return f"Pro Poor ({wr:.0f}%)"
+    if kind == PRO_EXPERIENCE:
+        return f"Pro Experience ({games}g)"
+    if kind == PRO_ERR:
+        return "Err"
+    return ""
+
+
+def meta_bias(found: np.ndarray, presence: np.ndarray, winrate: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(bonus, kind) from tournament presence/winrate of each candidate."""
+
+    wr = winrate * 100
+    kind = np.select(
+        [~found, presence > 40, (presence > 15) & (wr > 55), presence > 10],
+        [META_NONE, META_KING, META_HIDDEN_OP, META_META],
+        META_NONE,
+    )
+    return _META_BONUS[kind], kind
+
+
+def meta_note(kind: int, presence: int, winrate: float) -> str:
+    if kind == META_KING:
+        return f"Meta King ({presence} picks)"
+    if kind == META_HIDDEN_OP:
+        return f"Hidden OP ({winrate * 100:.0f}% WR)"
+    if kind == META_META:
+        return f"Meta ({presence} picks)"
+    return ""
+
+
+# Lane matchup note kinds (see lane_matchup / lane_notes).
+LANE_EVEN, LANE_WINS, LANE_SAFE = range(3)
+SCALE_EVEN, SCALE_OUTSCALES, SCALE_STOMP = range(3)
+
+
+def lane_matchup(my_prio: np.ndarray, my_scale: np.ndarray, en_prio: np.ndarray, en_scale: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(lane kind, scaling kind) of the tactical matchup notes vs the enemy laner."""
+
+    lane = np.select([my_prio > en_prio + 2, my_prio < en_prio - 2], [LANE_WINS, LANE_SAFE], LANE_EVEN)
+    scale = np.select(
+        [my_scale > en_scale + 2, (my_prio > en_prio + 1) & (my_scale < en_scale)],
+        [SCALE_OUTSCALES, SCALE_STOMP],
+        SCALE_EVEN,
+    )
+    return lane, scale
+
+
+def lane_notes(lane: int, scale: int, enemy: str) -> List[str]:
+    notes: List[str] = []
+    if lane == LANE_WINS:
+        notes.append(f"Wins lane vs {enemy} (Dominant)")
+    elif lane == LANE_SAFE:
+        notes.append(f"Play safe vs {enemy} (Low Prio)")
+    if scale == SCALE_OUTSCALES:
+        notes.append(f"Outscales {enemy} (Late)")
+    elif scale == SCALE_STOMP:
+        notes.append(f"Must stomp early vs {enemy}")
+    return notes
+
+
+def soloq_counter_bonus(my_prio: np.ndarray, my_scale: np.ndarray, en_prio: float, en_scale: float) -> np.ndarray:
+    """Lane counter heuristic vs the enemy laner (roughly capped around +/-0.45)."""
+
+    lane_adv = my_prio - en_prio
+    scale_adv = my_scale - en_scale
+
+    lane_norm = np.clip(lane_adv / 6.0, -1.0, 1.0)
+    scale_norm = np.clip(scale_adv / 6.0, -1.0, 1.0)
+
+    # Continuous component.
+    bonus = (lane_norm * 0.14) + (scale_norm * 0.10)
+
+    # Discrete component (more "counter-like" and noticeable).
+    bonus = bonus + np.select([lane_adv >= 2, lane_adv <= -2], [0.18, -0.14], 0.0)
+    bonus = bonus + np.select([scale_adv >= 2, scale_adv <= -2], [0.12, -0.10], 0.0)
+
+    # If you have tempo AND they outscale, reward early snowball picks.
+    bonus = bonus + np.where((lane_adv >= 1) & (my_scale < en_scale), 0.06, 0.0)
+
+    return np.clip(bonus, -0.45, 0.45)
+
+
+def soloq_popularity_bonus(games: np.ndarray, pr: np.ndarray) -> np.ndarray:
+    """Bounded lift for champions that are played a lot (role-local pick rate + sample size)."""
+
+    pr_norm = np.clip(pr / 0.06, 0.0, 1.0)  # ~6%+ in-role is very common
+    gp_norm = np.clip(np.log1p(games) / np.log1p(4000.0), 0.0, 1.0)
+
+    pop = (pr_norm * 0.70) + (gp_norm * 0.30)
+
+    # Shift so average-ish popularity is ~0; very popular picks get a lift.
+    bonus = (pop - 0.35) * 0.16
+    return np.clip(bonus, -0.03, 0.10)
+
+
+def soloq_soft_cap(raw: np.ndarray) -> np.ndarray:
+    """Map raw SoloQ scores into [0, 1]: linear below 1.0, then an exponential
+    approach to 1.0 starting at 0.985 so over-the-top scores still keep their order."""
+
+    cap_low = 0.985
+    alpha = 1.6
+    over = np.maximum(raw - 1.0, 0.0)
+    capped = 1.0 - (1.0 - cap_low) * np.exp(-alpha * over)
+    score = np.where(raw <= 0.0, 0.0, np.where(raw < 1.0, raw, capped))
+    return np.clip(score, 0.0, 1.0)
+
+
+def threat_levels(scores: np.ndarray) -> List[str]:
+    return np.select([scores > 0.60, scores > 0.55], ["LETHAL", "HIGH"], "Normal").tolist()
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the `k` highest scores, best first.
+
+    Equal scores keep index order, exactly like a stable descending sort cut to `k`,
+    but only the selected entries are sorted.
+    """
+
+    n = len(scores)
+    if n <= k:
+        return np.argsort(-scores, kind="stable")
+    kth = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[: k - len(above)]
+    selected = np.sort(np.concatenate([above, ties]))
+    return selected[np.argsort(-scores[selected], kind="stable")]
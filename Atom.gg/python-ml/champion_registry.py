@@ -0,0 +1,219 @@
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+DDRAGON_VERSIONS_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
+DDRAGON_CHAMPIONS_URL = "https://ddragon.leagueoflegends.com/cdn/{version}/data/en_US/champion.json"
+
+
+def version_key(version: str) -> Tuple[int, ...]:
+    """Comparable key for Data Dragon versions such as '16.2.1'."""
+
+    parts = []
+    for p in str(version or "").split("."):
+        try:
+            parts.append(int(p))
+        except ValueError:
+            parts.append(0)
+    return tuple(parts)
+
+
+def _read_champion_file(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("data"), dict):
+        return None
+    return data
+
+
+def normalize_name(text: str) -> str:
+    """Lowercased, punctuation/space-free form ("Kai'Sa" -> "kaisa", "Dr. Mundo" -> "drmundo")."""
+
+    return re.sub(r"[^a-z0-9]", "", str(text).lower())
+
+
+class ChampionNameIndex:
+    """Resolves user-typed champion names to ids without scanning every key.
+
+    The primary lookup keeps the original semantics: among the lowercased ids that
+    contain the query, the shortest wins (first in registry order on ties). Every
+    substring of every key is precomputed, so that is a single dict hit. Queries
+    that match nothing fall back to normalised aliases (ids and display names with
+    punctuation and spaces stripped, e.g. "kai'sa", "wukong", "dr. mundo").
+    """
+
+    def __init__(self, name_to_id: Dict[str, int], display_names: Dict[int, str]):
+        self._by_substring = self._substring_index((k, k) for k in name_to_id)
+
+        aliases: Dict[str, str] = {}
+        for key, champ_id in name_to_id.items():
+            aliases.setdefault(normalize_name(key), key)
+            if champ_id in display_names:
+                aliases.setdefault(normalize_name(display_names[champ_id]), key)
+        self._by_alias_substring = self._substring_index(aliases.items())
+        self._name_to_id = name_to_id
+
+    @staticmethod
+    def _substring_index(names: Iterable[Tuple[str, str]]) -> Dict[str, Tuple[str, str]]:
+        # substring -> (shortest name containing it, its key); the first one wins ties.
+        index: Dict[str, Tuple[str, str]] = {}
+        for name, key in names:
+            for i in range(len(name) + 1):
+                for j in range(i, len(name) + 1):
+                    best = index.get(name[i:j])
+                    if best is None or len(name) < len(best[0]):
+                        index[name[i:j]] = (name, key)
+        return index
+
+    def resolve(self, text: str) -> Optional[int]:
+        hit = self._by_substring.get(str(text).lower())
+        if hit is None:
+            hit = self._by_alias_substring.get(normalize_name(text))
+        return self._name_to_id[hit[1]] if hit else None
+
+
+class ChampionRegistry:
+    """Offline-first champion id/name registry.
+
+    Loads the bundled (or previously cached) Data Dragon champion.json synchronously,
+    so startup never waits on the network. `start_background_refresh()` optionally
+    checks Data Dragon for a newer patch in a daemon thread; when one is found the
+    file is cached next to the snapshot and, unless `apply=False`, the maps are
+    swapped in one assignment.
+    """
+
+    def __init__(self, bundled_file: str, cache_file: Optional[str] = None, quiet: bool = True):
+        self.bundled_file = bundled_file
+        self.cache_file = cache_file
+        self.quiet = quiet
+
+        self.version = ""
+        self.source = "empty"
+        self.source_file = bundled_file
+        # (name_to_id, id_to_name, id_to_display_name, name index) swapped as a single reference.
+        self._maps: Tuple[Dict[str, int], Dict[int, str], Dict[int, str], ChampionNameIndex] = (
+            {},
+            {},
+            {},
+            ChampionNameIndex({}, {}),
+        )
+        self._refresh_thread: Optional[threading.Thread] = None
+
+        self.load()
+
+    @property
+    def name_to_id(self) -> Dict[str, int]:
+        return self._maps[0]
+
+    @property
+    def id_to_name(self) -> Dict[int, str]:
+        return self._maps[1]
+
+    @property
+    def id_to_display_name(self) -> Dict[int, str]:
+        return self._maps[2]
+
+    def resolve(self, text: str) -> Optional[int]:
+        """Champion id for a user-typed name (see ChampionNameIndex), or None."""
+
+        return self._maps[3].resolve(text)
+
+    def load(self) -> None:
+        """Load the newest of the cached and bundled champion.json files."""
+
+        bundled = _read_champion_file(self.bundled_file)
+        cached = _read_champion_file(self.cache_file) if self.cache_file else None
+
+        if cached is not None and (
+            bundled is None or version_key(cached.get("version", "")) >= version_key(bundled.get("version", ""))
+        ):
+            self._apply(cached, "cache", self.cache_file or "")
+        elif bundled is not None:
+            self._apply(bundled, "bundled", self.bundled_file)
+
+        if not self.quiet:
+            if self.version:
+                print(f"   Champion registry: v{self.version} ({self.source})")
+            else:
+                print("   Champion registry: no local champion.json found.")
+
+    def _apply(self, data: Dict[str, Any], source: str, source_file: str) -> None:
+        champs = data["data"]
+        name_to_id = {k.lower(): int(vv["key"]) for k, vv in champs.items()}
+        id_to_name = {int(vv["key"]): vv["id"] for k, vv in champs.items()}
+        id_to_display_name = {int(vv["key"]): vv["name"] for k, vv in champs.items()}
+
+        names = ChampionNameIndex(name_to_id, id_to_display_name)
+
+        self._maps = (name_to_id, id_to_name, id_to_display_name, names)
+        self.version = str(data.get("version", ""))
+        self.source = source
+        self.source_file = source_file
+
+    # --- NETWORK REFRESH ---
+    def refresh(self, timeout: float = 10.0, apply: bool = True) -> bool:
+        """Fetch the latest patch from Data Dragon. Returns True if a newer patch was found.
+
+        With `apply=False` the patch is only written to the cache file (picked up by
+        the next `load()`) and the in-memory maps stay untouched.
+        """
+
+        # Imported lazily: requests is only needed when we actually go online.
+        import requests
+
+        latest = requests.get(DDRAGON_VERSIONS_URL, timeout=timeout).json()[0]
+        if version_key(latest) <= version_key(self.version):
+            return False
+
+        data = requests.get(DDRAGON_CHAMPIONS_URL.format(version=latest), timeout=timeout).json()
+        if not isinstance(data, dict) or not isinstance(data.get("data"), dict):
+            return False
+
+        source_file = ""
+        if self.cache_file:
+            try:
+                os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+                tmp = f"{self.cache_file}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp, self.cache_file)
+                source_file = self.cache_file
+            except OSError:
+                source_file = ""
+
+        if not apply:
+            if not self.quiet:
+                print(f"API v{latest} cached for the next start")
+            return True
+
+        self._apply(data, "network", source_file)
+        if not self.quiet:
+            print(f"API Updated to v{self.version}")
+        return True
+
+    def start_background_refresh(
+        self,
+        on_update: Optional[Callable[["ChampionRegistry"], None]] = None,
+        timeout: float = 10.0,
+        apply: bool = True,
+    ) -> threading.Thread:
+        """Run `refresh()` in a daemon thread; network errors are ignored (offline boxes)."""
+
+        def run() -> None:
+            try:
+                updated = self.refresh(timeout=timeout, apply=apply)
+            except Exception:
+                return
+            if updated and on_update is not None:
+                on_update(self)
+
+        if self._refresh_thread is None or not self._refresh_thread.is_alive():
+            self._refresh_thread = threading.Thread(target=run, name="champion-registry-refresh", daemon=True)
+            self._refresh_thread.start()
+        return self._refresh_thread
@@ -1,23 +1,53 @@
-import itertools
-import json
+import copy
 import os
 import sqlite3
-import sys
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import numpy as np
 import pandas as pd
 import polars as pl
-import requests
 import xgboost as xgb
 
+from candidate_scoring import (
+    lane_notes,
+    meta_bias,
+    meta_note,
+    pro_bias,
+    pro_note,
+    soloq_popularity_bonus,
+    soloq_soft_cap,
+    threat_levels,
+    top_k,
+)
+from champion_registry import ChampionRegistry
+from feature_plan import ROLES, FeaturePlan
+from oracle_inference import DEFAULT_BACKEND, BoosterPredictor, PredictionCache, make_predictor
+from oracle_snapshot import SnapshotStore
+from oracle_tables import (
+    CandidateTable,
+    ChampionIndex,
+    ChampionStatTable,
+    FeatureTensor,
+    LaneCounterMatrix,
+    MetaTable,
+    ProSignatureIndex,
+    SynergyMatrix,
+)
+from role_solver import RoleSolver
+
 
 # NOTE: This file is a refactor of the logic that previously lived in `Testing.ipynb`.
 # The draft/pick/ban/suggestion logic is intentionally preserved; the main change is
 # that the logic is now importable and can be driven programmatically (e.g. by Rust).
 
 
+def _no_checkpoint() -> None:
+    pass
+
+
 @dataclass
 class Suggestion:
     role: str
@@ -26,6 +56,32 @@ class Suggestion:
     tactical: str
     tags: str = ""
     threat: str = ""
+    model_delta: float = 0.0
+
+
+@dataclass
+class LaneOpponent:
+    champion: str
+    champ_id: Optional[int]
+    # Feature-store means over all of the champion's rows (None if unavailable).
+    lane_dominance: Optional[float]
+    gold_hunger: Optional[float]
+    # Row in the champion index (-1 if unknown).
+    index: int = -1
+
+
+@dataclass
+class DraftContext:
+    """Draft state derived once per suggestion request and shared by every candidate scorer."""
+
+    target_side: str
+    forbidden: set
+    # (name, champion id) for each ally pick, in pick order.
+    allies: List[Tuple[str, Optional[int]]]
+    ally_ids: np.ndarray
+    enemy_roles: Dict[str, str]
+    # Enemy laner per role, with the stats the matchup heuristics need.
+    lane_opponents: Dict[str, LaneOpponent]
 
 
 class TournamentDraft:
@@ -38,8 +94,19 @@ class TournamentDraft:
         synergy_file: str = "draft_oracle_synergy_matrix.parquet",
         db_file: str = "esports_data.db",
         quiet: bool = False,
+        cache_dir: Optional[str] = ".oracle_cache",
+        use_snapshot: bool = True,
+        refresh_champions: bool = True,
+        inference_backend: str = DEFAULT_BACKEND,
+        prediction_cache_size: int = 4096,
     ):
         self.quiet = quiet
+        self.inference_backend = inference_backend
+        # Win probability per resolved draft state; replaced whenever the model or
+        # the feature store is (re)loaded.
+        self.prediction_cache = PredictionCache(prediction_cache_size)
+        # Per-thread scratch buffers (see _row_buffer).
+        self._buffers = threading.local()
 
         base_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -59,6 +126,17 @@ class TournamentDraft:
         if not self.quiet:
             print("Loading Tournament Suite V9.5 (SQL Preserved + Meta)...")
 
+        # Startup timing breakdown (milliseconds per stage) so cold vs warm starts can be compared.
+        self.startup_timings: Dict[str, float] = {}
+        t_start = time.perf_counter()
+        t_last = t_start
+
+        def mark(stage: str) -> None:
+            nonlocal t_last
+            now = time.perf_counter()
+            self.startup_timings[stage] = (now - t_last) * 1000.0
+            t_last = now
+
         # 1. MODEL
         self.model = xgb.Booster()
         try:
@@ -68,9 +146,11 @@ class TournamentDraft:
         except Exception:
             if not self.quiet:
                 print(f"   Error loading {self.MODEL_FILE}. Check path.")
+        mark("model")
 
         # 2. FEATURES
         self.df = pl.read_parquet(self.FEATURE_FILE)
+        mark("feature_store")
 
         # 3. PROS
         if os.path.exists(self.PRO_SIG_FILE):
@@ -81,6 +161,7 @@ class TournamentDraft:
             if not self.quiet:
                 print("   Pro signatures not found. SoloQ mode.")
             self.pro_stats = None
+        self._prepare_pro_index()
 
         # 4. TOURNAMENT META
         if os.path.exists(self.TOURNAMENT_META_FILE):
@@ -91,28 +172,31 @@ class TournamentDraft:
             if not self.quiet:
                 print("   Tournament Meta not found. Ignoring factor.")
             self.meta_stats = None
+        mark("pro_and_meta")
 
-        # 5. SYNERGY
-        if os.path.exists(self.SYNERGY_FILE):
-            if not self.quiet:
-                print("   Synergy Matrix: Loaded")
-            self.synergy_raw = pl.read_parquet(self.SYNERGY_FILE)
-            self.synergy_map: Dict[Tuple[int, int], float] = {}
-            rows = self.synergy_raw.select(["champ_id", "champ_id_right", "syn_winrate"]).to_numpy()
-            for r in rows:
-                self.synergy_map[(r[0], r[1])] = r[2]
-                self.synergy_map[(r[1], r[0])] = r[2]
-        else:
-            self.synergy_map = {}
+        # 5. CHAMPION REGISTRY
+        self._load_champions(abs_path(cache_dir) if cache_dir else None)
+        mark("champion_registry")
+
+        # 6. DERIVED STRUCTURES (synergy, role map, feature lookup)
+        self._snapshot = SnapshotStore(abs_path(cache_dir)) if (use_snapshot and cache_dir) else None
+        self._load_derived_tables(mark)
 
-        self._load_api()
-        self._prepare_role_solver()
         self._prepare_model_cols()
+        self.startup_timings["total"] = (time.perf_counter() - t_start) * 1000.0
+        if not self.quiet:
+            print(f"   Startup ({self.snapshot_status}): {self.format_startup_timings()}")
+
+        self._init_draft_state()
 
-        self._feature_lookup: Dict[Tuple[int, str], Dict[str, float]] = {}
-        self._pos_means: Dict[str, Dict[str, float]] = {}
-        self._prepare_feature_lookup()
+        # Started only once every name-dependent table exists. A newer patch is just
+        # cached for the next start: champ_index, the role solver, candidate and meta
+        # tables and the prediction/suggestion caches are all built from the current
+        # name maps, and swapping those underneath them would leave them inconsistent.
+        if refresh_champions:
+            self.champions.start_background_refresh(apply=False)
 
+    def _init_draft_state(self) -> None:
         # SERIES STATE
         self.series_config = {"mode": "NORMAL", "total_games": 1, "current_game": 1}
         self.history: List[Dict[str, Any]] = []
@@ -124,47 +208,216 @@ class TournamentDraft:
 
         self.reset_game_board()
 
-    def _prepare_feature_lookup(self) -> None:
-        # Cache per-(champ_id, position) feature rows for fast lookup.
+    def _load_synergy(self) -> None:
+        synergy_raw = None
+        if os.path.exists(self.SYNERGY_FILE):
+            if not self.quiet:
+                print("   Synergy Matrix: Loaded")
+            synergy_raw = pl.read_parquet(self.SYNERGY_FILE).select(["champ_id", "champ_id_right", "syn_winrate"])
+
+        # One champion index shared by all array-backed tables.
+        id_sets = [self.df["champ_id"].to_list(), self.id_to_name.keys()]
+        if synergy_raw is not None:
+            id_sets += [synergy_raw["champ_id"].to_list(), synergy_raw["champ_id_right"].to_list()]
+        self.champ_index = ChampionIndex.from_ids(*id_sets)
+
+        if synergy_raw is not None:
+            self.synergy = SynergyMatrix.from_pairs(
+                self.champ_index,
+                synergy_raw["champ_id"].to_numpy(),
+                synergy_raw["champ_id_right"].to_numpy(),
+                synergy_raw["syn_winrate"].to_numpy(),
+            )
+        else:
+            self.synergy = SynergyMatrix.empty(self.champ_index)
+
+    def _load_derived_tables(self, mark: Callable[[str], None]) -> None:
+        """Synergy matrix, role map and feature tensor, restored from the snapshot when
+        none of the source artifacts changed."""
+
+        self.snapshot_status = "disabled"
+        snapshot_sources = {
+            "feature_store": self.FEATURE_FILE,
+            "synergy": self.SYNERGY_FILE,
+            "champions": self.champions.source_file,
+        }
+        fingerprints: Dict[str, Dict[str, Any]] = {}
+        restored = None
+        if self._snapshot is not None:
+            fingerprints = self._snapshot.fingerprint(snapshot_sources)
+            restored = self._snapshot.load(fingerprints)
+            mark("snapshot_load")
+
+        if restored is not None:
+            self._restore_snapshot(*restored)
+            self.snapshot_status = "warm"
+            if not self.quiet:
+                print("   Derived tables restored from snapshot")
+        else:
+            self._load_synergy()
+            mark("synergy")
+            self._prepare_role_solver()
+            mark("role_solver")
+
+            self._prepare_feature_tensor()
+            mark("feature_tensor")
+            self._prepare_candidate_tables()
+            mark("candidate_tables")
+            self._prepare_champion_stats()
+            mark("champion_stats")
+
+            if self._snapshot is not None:
+                self.snapshot_status = "cold"
+                try:
+                    self._snapshot.save(fingerprints, self._snapshot_objects(), self._snapshot_arrays())
+                except Exception as e:
+                    if not self.quiet:
+                        print(f"   Could not write snapshot: {e}")
+                mark("snapshot_save")
+
+        # Not snapshotted: cheap to compile and swappable on its own (reload_tournament_meta).
+        self._prepare_meta_table()
+        mark("meta_table")
+
+    def reload_model(self, model_file: Optional[str] = None) -> None:
+        """Swap in a new booster (default: re-read MODEL_FILE); keeps the old one if loading fails."""
+
+        path = model_file or self.MODEL_FILE
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+        model = xgb.Booster()
+        model.load_model(path)
+        self.MODEL_FILE = path
+        self.model = model
+        self._prepare_model_cols()
+
+    def reload_feature_store(self) -> None:
+        """Re-read the feature store and rebuild every table derived from it."""
+
+        self.df = pl.read_parquet(self.FEATURE_FILE)
+        self._load_derived_tables(lambda stage: None)
+        self._prepare_model_cols()
+
+    def reload_tournament_meta(self, meta_file: Optional[str] = None) -> None:
+        """Swap in another tournament meta parquet (default: re-read TOURNAMENT_META_FILE).
+
+        Only the meta table is recompiled; keeps the current meta if loading fails.
+        """
+
+        path = meta_file or self.TOURNAMENT_META_FILE
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+        meta_stats = pl.read_parquet(path)
+        self.TOURNAMENT_META_FILE = path
+        self.meta_stats = meta_stats
+        self._prepare_meta_table()
+
+    # --- SNAPSHOT ---
+    def _snapshot_objects(self) -> Dict[str, Any]:
+        return {
+            "synergy_pairs": self.synergy.pairs,
+            "role_map": self.role_map,
+            "feature_positions": self.features.positions,
+            "feature_names": self.features.features,
+            "candidate_tables": {
+                role: {order: table.columns for order, table in by_order.items()}
+                for role, by_order in self.candidate_tables.items()
+            },
+            "champion_stat_names": self.champion_stats.stats,
+            "champion_stat_roles": self.champion_stats.roles,
+        }
+
+    def _snapshot_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "champ_ids": self.champ_index.ids,
+            "synergy": self.synergy.values,
+            "features": self.features.values,
+            "champion_stats": self.champion_stats.champion,
+            "champion_role_stats": self.champion_stats.by_role,
+        }
+
+    def _restore_snapshot(self, objects: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+        self.champ_index = ChampionIndex(arrays["champ_ids"])
+        self.synergy = SynergyMatrix(self.champ_index, arrays["synergy"], objects["synergy_pairs"])
+        self.role_map = objects["role_map"]
+        self.role_solver = RoleSolver(self.role_map)
+        self.features = FeatureTensor(
+            self.champ_index, objects["feature_positions"], objects["feature_names"], arrays["features"]
+        )
+        self.candidate_tables = {
+            role: {order: CandidateTable(columns) for order, columns in by_order.items()}
+            for role, by_order in objects["candidate_tables"].items()
+        }
+        self.champion_stats = ChampionStatTable(
+            self.champ_index,
+            objects["champion_stat_names"],
+            objects["champion_stat_roles"],
+            arrays["champion_stats"],
+            arrays["champion_role_stats"],
+        )
+        self.lane_counters = LaneCounterMatrix(self.champion_stats)
+
+    def format_startup_timings(self) -> str:
+        return " | ".join(f"{stage} {ms:.1f}ms" for stage, ms in self.startup_timings.items())
+
+    def _prepare_feature_tensor(self) -> None:
+        # Compile the feature store into a [champion, position, feature] float32 tensor.
         # The feature store is the single source of truth for per-champion stats.
         ignore = {"champ_id", "position", "region"}
         feature_cols = [c for c in self.df.columns if c not in ignore]
 
-        for row in self.df.select(["champ_id", "position", *feature_cols]).to_dicts():
-            champ_id = int(row["champ_id"])
-            position = str(row["position"])
-            self._feature_lookup[(champ_id, position)] = {
-                k: (0.0 if row.get(k) is None else float(row[k])) for k in feature_cols
-            }
-
-        # Precompute global per-position means so we can predict during partial drafts.
-        for pos in ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY", ""]:
+        # Global per-position means so we can predict during partial drafts.
+        pos_means: Dict[str, List[float]] = {}
+        for pos in FeatureTensor.MEAN_POSITIONS:
             pos_df = self.df.filter(pl.col("position") == pos)
             if pos_df.height == 0:
-                self._pos_means[pos] = {k: 0.0 for k in feature_cols}
+                pos_means[pos] = [0.0] * len(feature_cols)
                 continue
-
             mean_row = pos_df.select(feature_cols).mean().to_dicts()[0]
-            self._pos_means[pos] = {k: float(mean_row.get(k) or 0.0) for k in feature_cols}
+            pos_means[pos] = [float(mean_row.get(k) or 0.0) for k in feature_cols]
+
+        self.features = FeatureTensor.from_columns(
+            self.champ_index,
+            self.df["champ_id"].to_numpy(),
+            self.df["position"].cast(pl.String).to_list(),
+            {k: self.df[k].cast(pl.Float64).fill_null(0.0).to_numpy() for k in feature_cols},
+            pos_means,
+        )
+
+    def _prepare_champion_stats(self) -> None:
+        # Per-champion and per-(role, champion) means of every feature, so matchup
+        # heuristics read an array instead of filtering the feature store.
+        ignore = {"champ_id", "position", "region"}
+        stats = [c for c in self.df.columns if c not in ignore]
+        # Averaged in the stored dtype, exactly like a filter(...).mean() on the frame.
+        means = [pl.col(k).mean() for k in stats]
+
+        by_champ = self.df.group_by("champ_id").agg(means)
+        by_role = self.df.with_columns(pl.col("position").cast(pl.String)).group_by(["position", "champ_id"]).agg(means)
+        self.champion_stats = ChampionStatTable.from_columns(
+            self.champ_index,
+            stats,
+            by_champ["champ_id"].to_numpy(),
+            by_champ.select(stats).to_numpy(),
+            by_role["position"].to_list(),
+            by_role["champ_id"].to_numpy(),
+            by_role.select(stats).to_numpy(),
+        )
+        self.lane_counters = LaneCounterMatrix(self.champion_stats)
 
     def _champ_id(self, champ_name: str) -> Optional[int]:
         if not champ_name:
             return None
         return self.name_to_id.get(champ_name.lower())
 
-    def _get_features_for_slot(self, champ_name: Optional[str], position: str) -> Dict[str, float]:
-        """Return feature dict for a given slot.
-
-        If champion is missing/unknown, returns per-position global means.
-        """
+    def _role_champ_indices(self, assign: Dict[str, str]) -> np.ndarray:
+        """Champion-index per role (ROLES order) for a {champion: role} assignment; -1 if empty."""
 
-        if champ_name:
-            champ_id = self._champ_id(champ_name)
-            if champ_id is not None:
-                row = self._feature_lookup.get((champ_id, position))
-                if row is not None:
-                    return row
-        return self._pos_means.get(position, {})
+        idx = np.full(len(ROLES), -1, dtype=np.int64)
+        for champ, role in assign.items():
+            if role in ROLES:
+                idx[ROLES.index(role)] = self.champ_index.index_of(self._champ_id(champ))
+        return idx
 
     def predict_live_winrate(self) -> Dict[str, float]:
         """Predict BLUE/RED winrate for the current draft state.
@@ -173,231 +426,59 @@ class TournamentDraft:
         even during partial drafts by filling missing roles with global means.
         """
 
-        feature_names = list(self.model.feature_names or [])
-        if not feature_names:
+        if self.feature_plan is None:
             return {"blue": 0.5, "red": 0.5}
 
-        roles = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
-        blue_assign = self._solve_roles(self.blue_picks)
-        red_assign = self._solve_roles(self.red_picks)
-
-        blue_role_to_champ = {role: champ for champ, role in blue_assign.items()}
-        red_role_to_champ = {role: champ for champ, role in red_assign.items()}
-
-        # Base per-slot columns we can map directly from the feature store.
-        slot_cols = [
-            "stat_dpm",
-            "stat_gpm",
-            "stat_dmg_taken",
-            "stat_mitigated",
-            "stat_heal",
-            "stat_hard_cc",
-            "stat_vision_score",
-            "z_style_roaming_tendency",
-            "z_style_lane_dominance",
-            "z_style_gank_heaviness",
-            "z_style_objective_control",
-            "z_style_invade_pressure",
-            "z_style_gold_hunger",
-        ]
-
-        feats: Dict[str, float] = {k: 0.0 for k in feature_names}
-
-        def set_if_present(key: str, val: float) -> None:
-            if key in feats:
-                feats[key] = float(val)
-
-        def compute_side(side: str, role_to_champ: Dict[str, str]) -> Dict[str, Dict[str, float]]:
-            side_slots: Dict[str, Dict[str, float]] = {}
-            for r in roles:
-                side_slots[r] = self._get_features_for_slot(role_to_champ.get(r), r)
-            return side_slots
-
-        blue_slots = compute_side("blue", blue_role_to_champ)
-        red_slots = compute_side("red", red_role_to_champ)
-
-        # Per-role features
-        for r in roles:
-            for col in slot_cols:
-                set_if_present(f"blue_{r}_{col}", blue_slots[r].get(col, 0.0))
-                set_if_present(f"red_{r}_{col}", red_slots[r].get(col, 0.0))
-
-        # Team-level "__" aggregates (mean across roles)
-        for col in slot_cols:
-            blue_mean = float(np.mean([blue_slots[r].get(col, 0.0) for r in roles]))
-            red_mean = float(np.mean([red_slots[r].get(col, 0.0) for r in roles]))
-            set_if_present(f"blue__{col}", blue_mean)
-            set_if_present(f"red__{col}", red_mean)
-
-        # Team totals/ratios derived from per-slot stats.
-        # We compute totals across the 5 roles (missing roles filled with means).
-        def sum_side(col: str, side_slots: Dict[str, Dict[str, float]]) -> float:
-            return float(sum(side_slots[r].get(col, 0.0) for r in roles))
-
-        # Damage types
-        blue_magic = sum_side("avg_magic_dmg", blue_slots)
-        blue_phys = sum_side("avg_phys_dmg", blue_slots)
-        blue_true = sum_side("avg_true_dmg", blue_slots)
-        red_magic = sum_side("avg_magic_dmg", red_slots)
-        red_phys = sum_side("avg_phys_dmg", red_slots)
-        red_true = sum_side("avg_true_dmg", red_slots)
-
-        set_if_present("blue_total_magic_dmg", blue_magic)
-        set_if_present("blue_total_phys_dmg", blue_phys)
-        set_if_present("blue_total_true_dmg", blue_true)
-        set_if_present("red_total_magic_dmg", red_magic)
-        set_if_present("red_total_phys_dmg", red_phys)
-        set_if_present("red_total_true_dmg", red_true)
-
-        set_if_present(
-            "blue_magic_dmg_ratio",
-            blue_magic / max(1e-9, (blue_magic + blue_phys + blue_true)),
-        )
-        set_if_present(
-            "red_magic_dmg_ratio",
-            red_magic / max(1e-9, (red_magic + red_phys + red_true)),
-        )
+        # The feature plan turns the resolved role slots into the model row
+        # (written into a preallocated buffer) with a few array gathers; the
+        # predictor evaluates it without building a DMatrix.
+        blue_idx = self._role_champ_indices(self._solve_roles(self.blue_picks))
+        red_idx = self._role_champ_indices(self._solve_roles(self.red_picks))
+
+        # Bans and re-sent states resolve to the same role slots: serve them from the cache.
+        key = (tuple(blue_idx.tolist()), tuple(red_idx.tolist()))
+        pred = self.prediction_cache.get(key)
+        if pred is None:
+            row = self.feature_plan.build(blue_idx, red_idx, out=self._row_buffer())
+            pred = float(self.predictor.predict(row)[0])
+            pred = max(0.0, min(1.0, pred))
+            self.prediction_cache.put(key, pred)
+        return {"blue": pred, "red": 1.0 - pred}
 
-        # Tankiness/sustain/cc proxies
-        blue_tank = sum_side("stat_dmg_taken", blue_slots) + sum_side("stat_mitigated", blue_slots)
-        red_tank = sum_side("stat_dmg_taken", red_slots) + sum_side("stat_mitigated", red_slots)
-        set_if_present("blue_total_tankiness", blue_tank)
-        set_if_present("red_total_tankiness", red_tank)
-        set_if_present("blue_total_sustain", sum_side("stat_heal", blue_slots))
-        set_if_present("red_total_sustain", sum_side("stat_heal", red_slots))
-        set_if_present("blue_total_cc", sum_side("stat_hard_cc", blue_slots))
-        set_if_present("red_total_cc", sum_side("stat_hard_cc", red_slots))
-
-        # Strategy proxies (best-effort)
-        set_if_present(
-            "blue_strat_gank_compatibility",
-            float(np.mean([blue_slots[r].get("z_style_gank_heaviness", 0.0) for r in roles])),
-        )
-        set_if_present(
-            "red_strat_gank_compatibility",
-            float(np.mean([red_slots[r].get("z_style_gank_heaviness", 0.0) for r in roles])),
-        )
-        set_if_present(
-            "blue_strat_resource_friction",
-            float(np.std([blue_slots[r].get("z_style_gold_hunger", 0.0) for r in roles])),
-        )
-        set_if_present(
-            "red_strat_resource_friction",
-            float(np.std([red_slots[r].get("z_style_gold_hunger", 0.0) for r in roles])),
-        )
-        set_if_present(
-            "blue_strat_invade_safety",
-            float(np.mean([blue_slots[r].get("z_style_invade_pressure", 0.0) for r in roles])),
-        )
-        set_if_present(
-            "red_strat_invade_safety",
-            float(np.mean([red_slots[r].get("z_style_invade_pressure", 0.0) for r in roles])),
+    # --- SUPPORT ---
+    LOCAL_DD_VERSION = "16.2.1"
+
+    def _local_champion_file(self) -> str:
+        # Bundled Data Dragon champion.json (same as frontend), relative to python-ml directory
+        dd_version = self.LOCAL_DD_VERSION
+        return os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            "..",
+            "public",
+            f"dragontail-{dd_version}",
+            dd_version,
+            "data",
+            "en_US",
+            "champion.json",
         )
 
-        # Team volatility (proxy)
-        def team_vol(side_slots: Dict[str, Dict[str, float]]) -> float:
-            cols = ["var_gold_volatility", "var_damage_volatility", "var_lane_stability"]
-            per_role = [float(sum(side_slots[r].get(c, 0.0) for c in cols)) for r in roles]
-            return float(np.mean(per_role))
-
-        set_if_present("diff_team_volatility", team_vol(blue_slots) - team_vol(red_slots))
-
-        # Synergy features (baseline 0.5 if unknown)
-        def duo_syn(role_a: str, role_b: str, role_to_champ: Dict[str, str]) -> float:
-            a = role_to_champ.get(role_a)
-            b = role_to_champ.get(role_b)
-            if not a or not b:
-                return 0.5
-            a_id = self._champ_id(a)
-            b_id = self._champ_id(b)
-            if a_id is None or b_id is None:
-                return 0.5
-            return float(self.synergy_map.get((a_id, b_id), 0.5))
-
-        blue_syn_mid_jg = duo_syn("MIDDLE", "JUNGLE", blue_role_to_champ)
-        blue_syn_bot_duo = duo_syn("BOTTOM", "UTILITY", blue_role_to_champ)
-        blue_syn_top_jg = duo_syn("TOP", "JUNGLE", blue_role_to_champ)
-        red_syn_mid_jg = duo_syn("MIDDLE", "JUNGLE", red_role_to_champ)
-        red_syn_bot_duo = duo_syn("BOTTOM", "UTILITY", red_role_to_champ)
-        red_syn_top_jg = duo_syn("TOP", "JUNGLE", red_role_to_champ)
-
-        set_if_present("blue_syn_mid_jg", blue_syn_mid_jg)
-        set_if_present("blue_syn_bot_duo", blue_syn_bot_duo)
-        set_if_present("blue_syn_top_jg", blue_syn_top_jg)
-        set_if_present("red_syn_mid_jg", red_syn_mid_jg)
-        set_if_present("red_syn_bot_duo", red_syn_bot_duo)
-        set_if_present("red_syn_top_jg", red_syn_top_jg)
-        set_if_present("gap_syn_mid_jg", blue_syn_mid_jg - red_syn_mid_jg)
-
-        # Duel features
-        duel_cols = [
-            ("stat_gpm", "duel_{r}_stat_gpm"),
-            ("stat_dpm", "duel_{r}_stat_dpm"),
-            ("z_style_lane_dominance", "duel_{r}_z_style_lane_dominance"),
-        ]
-        for r in roles:
-            for src, tmpl in duel_cols:
-                key = tmpl.format(r=r)
-                set_if_present(key, blue_slots[r].get(src, 0.0) - red_slots[r].get(src, 0.0))
-
-        # Build row in the exact feature order.
-        row = np.array([[feats.get(name, 0.0) for name in feature_names]], dtype=np.float32)
-        dm = xgb.DMatrix(row, feature_names=feature_names)
+    def _load_champions(self, cache_dir: Optional[str]) -> None:
+        # Offline-first: the bundled/cached champion.json is loaded synchronously and the
+        # network is only consulted from a background thread (see __init__).
+        cache_file = os.path.join(cache_dir, "champion.json") if cache_dir else None
+        self.champions = ChampionRegistry(self._local_champion_file(), cache_file=cache_file, quiet=self.quiet)
 
-        pred = float(self.model.predict(dm)[0])
-        pred = max(0.0, min(1.0, pred))
-        return {"blue": pred, "red": 1.0 - pred}
+    @property
+    def name_to_id(self) -> Dict[str, int]:
+        return self.champions.name_to_id
 
-    # --- SUPPORT ---
-    def _load_api(self):
-        if not self.quiet:
-            print("Connecting to Riot API...")
-        try:
-            v = requests.get("https://ddragon.leagueoflegends.com/api/versions.json", timeout=10).json()[0]
-            r = requests.get(
-                f"https://ddragon.leagueoflegends.com/cdn/{v}/data/en_US/champion.json",
-                timeout=10,
-            ).json()
-            self.name_to_id = {k.lower(): int(vv["key"]) for k, vv in r["data"].items()}
-            self.id_to_name = {int(vv["key"]): vv["id"] for k, vv in r["data"].items()}
-            self.id_to_display_name = {int(vv["key"]): vv["name"] for k, vv in r["data"].items()}
-            if not self.quiet:
-                print(f"API Updated to v{v}")
-        except Exception:
-            if not self.quiet:
-                print("API Error. Using local dictionary.")
-
-            # Fallback to local champion.json (same as frontend)
-            try:
-                dd_version = "16.2.1"
-                # Path relative to python-ml directory
-                local_path = os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    "..",
-                    "public",
-                    f"dragontail-{dd_version}",
-                    dd_version,
-                    "data",
-                    "en_US",
-                    "champion.json",
-                )
+    @property
+    def id_to_name(self) -> Dict[int, str]:
+        return self.champions.id_to_name
 
-                if os.path.exists(local_path):
-                    with open(local_path, "r", encoding="utf-8") as f:
-                        r = json.load(f)
-                    self.name_to_id = {k.lower(): int(vv["key"]) for k, vv in r["data"].items()}
-                    self.id_to_name = {int(vv["key"]): vv["id"] for k, vv in r["data"].items()}
-                    self.id_to_display_name = {int(vv["key"]): vv["name"] for k, vv in r["data"].items()}
-                    if not self.quiet:
-                        print(f"   Loaded local fallback: v{dd_version}")
-                else:
-                    self.name_to_id = {}
-                    self.id_to_name = {}
-                    self.id_to_display_name = {}
-            except Exception:
-                self.name_to_id = {}
-                self.id_to_name = {}
-                self.id_to_display_name = {}
+    @property
+    def id_to_display_name(self) -> Dict[int, str]:
+        return self.champions.id_to_display_name
 
     def _prepare_role_solver(self):
         rs = self.df.group_by(["champ_id", "position"]).agg(pl.col("games_played").sum())
@@ -410,6 +491,52 @@ class TournamentDraft:
                 if c not in self.role_map:
                     self.role_map[c] = {}
                 self.role_map[c][row["position"]] = row["prob"]
+        self.role_solver = RoleSolver(self.role_map)
+
+    # Candidate pool orderings: NORMAL/FEARLESS/IRONMAN rank by winrate (top 150); SoloQ
+    # widens the pool and prioritizes popular champs (top 250 by pick rate, then winrate).
+    CANDIDATE_ORDERS = {"winrate": (["stat_winrate"], 150), "popularity": (["pr", "stat_winrate"], 250)}
+
+    # Suggestions returned per open role.
+    SUGGESTIONS_PER_ROLE = 18
+
+    def _prepare_candidate_tables(self):
+        # None of this depends on the draft state, so every role's candidate pool is
+        # aggregated once here instead of on every suggest call.
+        self.candidate_tables: Dict[str, Dict[str, CandidateTable]] = {}
+        for role in self.df["position"].unique().to_list():
+            raw_cands = self.df.filter(pl.col("position") == role)
+
+            cands = raw_cands.group_by("champ_id").agg(
+                [
+                    pl.col("games_played").sum(),
+                    ((pl.col("stat_winrate") * pl.col("games_played")).sum() / pl.col("games_played").sum()).alias(
+                        "stat_winrate"
+                    ),
+                    pl.col("style_lane_dominance").mean().fill_null(0),
+                    pl.col("style_gold_hunger").mean().fill_null(0),
+                ]
+            )
+
+            total_games = cands["games_played"].sum()
+            cands = cands.filter(pl.col("games_played") > 100)
+            cands = cands.with_columns((pl.col("games_played") / total_games).alias("pr")).filter(pl.col("pr") > 0.005)
+
+            self.candidate_tables[role] = {}
+            for order, (sort_cols, limit) in self.CANDIDATE_ORDERS.items():
+                ranked = cands.sort(sort_cols, descending=True).limit(limit)
+                self.candidate_tables[role][order] = CandidateTable(
+                    {name: ranked[name].to_numpy() for name in CandidateTable.COLUMNS}
+                )
+
+    def _candidates(self, role: str, forbidden: set) -> Tuple[CandidateTable, List[str]]:
+        """Ranked candidate pool for `role` in the current mode, minus forbidden/unknown champs."""
+
+        order = "popularity" if self.series_config["mode"] == "SOLOQ" else "winrate"
+        table = self.candidate_tables.get(role, {}).get(order) or CandidateTable.empty()
+        names = [self.id_to_name.get(c) for c in table["champ_id"].tolist()]
+        keep = np.asarray([bool(n) and n not in forbidden for n in names], dtype=bool)
+        return table.take(keep), [n for n, k in zip(names, keep) if k]
 
     def _prepare_model_cols(self):
         try:
@@ -417,6 +544,43 @@ class TournamentDraft:
         except Exception:
             self.model_cols = []
 
+        # Compile the model's feature layout once; predictions reuse a row buffer.
+        # Anything cached against the previous model / feature tables is stale now; a
+        # fresh cache (rather than clear()) keeps in-flight forks from refilling it.
+        self.prediction_cache = PredictionCache(self.prediction_cache.maxsize)
+        self.feature_plan: Optional[FeaturePlan] = None
+        self.predictor: Optional[BoosterPredictor] = None
+        if self.model_cols:
+            self.feature_plan = FeaturePlan(self.model_cols, self.features, self.synergy)
+            self.predictor = make_predictor(
+                self.model,
+                self.model_cols,
+                self.inference_backend,
+                probe_rows=self._probe_rows(),
+                quiet=self.quiet,
+            )
+            if not self.quiet:
+                print(f"   Inference backend: {self.predictor.backend}")
+
+    def _row_buffer(self) -> np.ndarray:
+        # One model-row buffer per thread (shared with forks): the server predicts concurrently.
+        buf = getattr(self._buffers, "row", None)
+        if buf is None or buf.shape[1] != len(self.model_cols):
+            buf = self._buffers.row = np.zeros((1, len(self.model_cols)), dtype=np.float32)
+        return buf
+
+    def _probe_rows(self, n: int = 256) -> np.ndarray:
+        """Model rows for a fixed set of random drafts (partial and full), used to validate
+        an inference backend against Booster.predict."""
+
+        rng = np.random.default_rng(0)
+        n_champs = len(self.champ_index)
+        slots = rng.integers(0, n_champs, size=(2, n, len(ROLES)))
+        # Empty out a random suffix of each side's slots to cover partial drafts.
+        filled = rng.integers(0, len(ROLES) + 1, size=(2, n, 1))
+        slots = np.where(np.arange(len(ROLES)) < filled, slots, -1)
+        return self.feature_plan.build(slots[0], slots[1])
+
     # --- DATA / ROSTERS (SQL) ---
     def set_roster_auto(self, side: str, team_name: str):
         if not self.quiet:
@@ -519,70 +683,62 @@ class TournamentDraft:
         """Determines if the current match is professional by checking if both teams have players loaded."""
         return bool(self.teams["BLUE"]["players"]) and bool(self.teams["RED"]["players"])
 
-    def get_pro_bias(self, player_name: Optional[str], champ_name: str) -> Tuple[float, str, int]:
-        if self.pro_stats is None or not player_name or player_name.lower() in ["none", ""]:
-            return 0.0, "", 0
-
-        stats = self.pro_stats.filter(
-            (pl.col("player_name").str.to_lowercase() == player_name.lower())
-            & (pl.col("champion_name").str.to_lowercase() == champ_name.lower())
-        )
+    def _prepare_pro_index(self):
+        # (player, champion) -> signature stats, so bias lookups never scan pro_stats.
+        self.pro_index = ProSignatureIndex({})
+        if self.pro_stats is not None:
+            self.pro_index = ProSignatureIndex.from_columns(
+                self.pro_stats["player_name"].to_list(),
+                self.pro_stats["champion_name"].to_list(),
+                self.pro_stats["games_played"].to_list(),
+                self.pro_stats["pro_winrate"].to_list(),
+                self.pro_stats["proficiency_score"].to_list(),
+            )
 
-        if stats.height == 0:
-            return 0.0, "", 0
+    def _pro_signatures(
+        self, player_name: Optional[str], champ_names: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Signature stats of `player_name` on each champion (case-insensitive match).
 
-        try:
-            games = int(stats["games_played"][0])
-            wr = stats["pro_winrate"][0] * 100
-            score = stats["proficiency_score"][0]
-
-            # In professional matches, we want these picks to jump to the top.
-            # Normalizing everything relative to 0.5 winrate.
-            is_pro = self.is_pro_match()
-            
-            # Base values (SoloQ/Normal context)
-            if score > 0.3:
-                bonus = 0.4
-                note = f"Pro GOD ({games}g {wr:.0f}%)"
-            elif games > 15:
-                bonus = 0.6
-                note = f"Pro Main ({games}g)"
-            elif wr < 40 and games > 5:
-                bonus = -0.10
-                note = f"Pro Poor ({wr:.0f}%)"
-            else:
-                bonus = 0.05
-                note = f"Pro Experience ({games}g)"
+        Returns aligned (found, games, winrate, proficiency, invalid) arrays; `invalid`
+        marks signature rows with null stats.
+        """
 
-            # If it's a professional match, amplify the signature pick bonuses significantly.
-            if is_pro and bonus > 0:
-                # Up to 1.5x bonus for pro matches to ensure signature picks dominate recommendations.
-                bonus *= 1.5
+        return self.pro_index.gather(self._pro_player(player_name), champ_names)
 
+    @staticmethod
+    def _pro_player(player_name: Optional[str]) -> Optional[str]:
+        # Rosters use "none"/"" for unknown players; they get no signature bonus.
+        if not player_name or player_name.lower() in ["none", ""]:
+            return None
+        return player_name
 
-            return bonus, note, games
-        except Exception:
-            return 0.0, "Err", 0
+    def get_pro_bias(self, player_name: Optional[str], champ_name: str) -> Tuple[float, str, int]:
+        found, games, winrate, proficiency, invalid = self._pro_signatures(player_name, [champ_name])
+        bonus, kind = pro_bias(found, games, winrate, proficiency, self.is_pro_match(), invalid)
+        return float(bonus[0]), pro_note(kind[0], int(games[0]), float(winrate[0])), int(games[0])
 
-    def get_tournament_bias(self, champ_name: str) -> Tuple[float, str]:
+    def _prepare_meta_table(self):
+        names = [self.id_to_name.get(int(c)) for c in self.champ_index.ids]
         if self.meta_stats is None:
-            return 0.0, ""
-
-        row = self.meta_stats.filter(pl.col("champ_key") == champ_name.lower())
-        if row.height == 0:
-            return 0.0, ""
+            self.meta_table = MetaTable({}, names)
+            return
+        self.meta_table = MetaTable.from_columns(
+            self.meta_stats["champ_key"].to_list(),
+            self.meta_stats["tourney_presence"].to_list(),
+            self.meta_stats["tourney_winrate"].to_list(),
+            names,
+        )
 
-        presence = row["tourney_presence"][0]
-        wr = row["tourney_winrate"][0] * 100
+    def _tournament_meta(self, champ_names: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Tournament (found, presence, winrate) per champion, matched on the lowercased name."""
 
-        if presence > 40:
-            return 0.06, f"Meta King ({presence} picks)"
-        if presence > 15 and wr > 55:
-            return 0.04, f"Hidden OP ({wr:.0f}% WR)"
-        if presence > 10:
-            return 0.02, f"Meta ({presence} picks)"
+        return self.meta_table.lookup(champ_names)
 
-        return 0.0, ""
+    def get_tournament_bias(self, champ_name: str) -> Tuple[float, str]:
+        found, presence, winrate = self._tournament_meta([champ_name])
+        bonus, kind = meta_bias(found, presence, winrate)
+        return float(bonus[0]), meta_note(kind[0], int(presence[0]), float(winrate[0]))
 
     def predict_final_matchup(self):
         # Real model prediction.
@@ -596,20 +752,54 @@ class TournamentDraft:
             else:
                 print(" PREDICTION: RED TEAM WINS")
 
-    def get_tactical_analysis(self, champ_id: int, champ_stats: Any, my_role: str, target_side: str) -> List[str]:
+    def build_draft_context(self, target_side: str) -> DraftContext:
+        """Resolve everything the candidate scorers need about the current board, once."""
+
+        allies = self.blue_picks if target_side == "BLUE" else self.red_picks
+        enemies = self.red_picks if target_side == "BLUE" else self.blue_picks
+
+        ally_pairs = [(a, self.name_to_id.get(str(a).lower())) for a in allies]
+        ally_ids = np.asarray([i for _, i in ally_pairs if i], dtype=np.int64)
+
+        enemy_roles = self._solve_roles(enemies)
+        lane_opponents: Dict[str, LaneOpponent] = {}
+        for enemy, role in enemy_roles.items():
+            enemy_id = self.name_to_id.get(str(enemy).lower())
+            idx = self.champ_index.index_of(enemy_id)
+            lane_dom, gold_hunger = None, None
+            if enemy_id is not None:
+                lane_dom = float(self.champion_stats.column(LaneCounterMatrix.LANE_DOMINANCE)[idx])
+                gold_hunger = float(self.champion_stats.column(LaneCounterMatrix.GOLD_HUNGER)[idx])
+            lane_opponents[role] = LaneOpponent(enemy, enemy_id, lane_dom, gold_hunger, idx)
+
+        return DraftContext(
+            target_side=target_side,
+            forbidden=self.get_forbidden_champs(target_side),
+            allies=ally_pairs,
+            ally_ids=ally_ids,
+            enemy_roles=enemy_roles,
+            lane_opponents=lane_opponents,
+        )
+
+    def get_tactical_analysis(
+        self,
+        champ_id: int,
+        my_role: str,
+        target_side: str,
+        ctx: Optional[DraftContext] = None,
+    ) -> List[str]:
+        ctx = ctx or self.build_draft_context(target_side)
         reasons: List[str] = []
 
         # A. SYNERGY (YOUR TEAM)
-        my_allies = self.blue_picks if target_side == "BLUE" else self.red_picks
         best_syn_score = 0
         best_syn_partner = ""
 
-        for ally_name in my_allies:
-            ally_id = self.name_to_id.get(ally_name.lower())
+        for ally_name, ally_id in ctx.allies:
             if not ally_id or ally_id == champ_id:
                 continue
 
-            wr = self.synergy_map.get((champ_id, ally_id), 0.5)
+            wr = self.synergy.pair(champ_id, ally_id)
             if wr > 0.53:
                 diff = wr - 0.5
                 if diff > best_syn_score:
@@ -620,188 +810,144 @@ class TournamentDraft:
             reasons.append(f"Combo with {best_syn_partner} ({(0.5 + best_syn_score):.0%} WR)")
 
         # B. MATCHUP (VS ENEMY)
-        enemies = self.red_picks if target_side == "BLUE" else self.blue_picks
-        enemy_roles = self._solve_roles(enemies)
-        role_to_enemy = {v: k for k, v in enemy_roles.items()}
-        enemy_laner = role_to_enemy.get(my_role)
-
-        if enemy_laner:
-            enemy_id = self.name_to_id.get(enemy_laner.lower())
-            enemy_row = self.df.filter(pl.col("champ_id") == enemy_id).mean()
-
-            if enemy_row.height > 0:
-                my_prio = champ_stats["style_lane_dominance"] or 0
-                en_prio = enemy_row["style_lane_dominance"][0] or 0
+        opponent = ctx.lane_opponents.get(my_role)
 
-                my_scale = champ_stats["style_gold_hunger"] or 0
-                en_scale = enemy_row["style_gold_hunger"][0] or 0
-
-                if my_prio > en_prio + 2:
-                    reasons.append(f"Wins lane vs {enemy_laner} (Dominant)")
-                elif my_prio < en_prio - 2:
-                    reasons.append(f"Play safe vs {enemy_laner} (Low Prio)")
-
-                if my_scale > en_scale + 2:
-                    reasons.append(f"Outscales {enemy_laner} (Late)")
-                elif my_prio > en_prio + 1 and my_scale < en_scale:
-                    reasons.append(f"Must stomp early vs {enemy_laner}")
+        if opponent:
+            lane, scale = self.lane_counters.kinds(my_role, self.champ_index.index_of(champ_id), opponent.index)
+            reasons.extend(lane_notes(lane, scale, opponent.champion))
 
         return reasons
 
-    def _solo_q_synergy_bonus(self, champ_id: int, target_side: str) -> float:
+    def _solo_q_synergy_bonus(
+        self, champ_ids: np.ndarray, target_side: str, ctx: Optional[DraftContext] = None
+    ) -> np.ndarray:
         """SoloQ-only bonus based on synergy with already-picked allies.
 
-        Returns an additive score delta that can be large enough to reshuffle the top picks
-        when allies change (roughly capped around +/-0.50).
+        Vectorized over candidates: returns one additive score delta per entry of
+        `champ_ids`, large enough to reshuffle the top picks when allies change
+        (roughly capped around +/-0.50).
         """
 
-        if not self.synergy_map:
-            return 0.0
-
-        allies = self.blue_picks if target_side == "BLUE" else self.red_picks
-        if not allies:
-            return 0.0
+        champ_ids = np.asarray(champ_ids, dtype=np.int64)
+        zeros = np.zeros(len(champ_ids), dtype=np.float64)
+        if not self.synergy:
+            return zeros
 
-        diffs: List[float] = []
-        for ally_name in allies:
-            ally_id = self.name_to_id.get(str(ally_name).lower())
-            if not ally_id or ally_id == champ_id:
-                continue
-            wr = float(self.synergy_map.get((champ_id, ally_id), 0.5))
-            diffs.append(wr - 0.5)
+        ally_ids = (ctx or self.build_draft_context(target_side)).ally_ids
+        if len(ally_ids) == 0 or len(champ_ids) == 0:
+            return zeros
 
-        if not diffs:
-            return 0.0
+        diffs = self.synergy.against(champ_ids, ally_ids).astype(np.float64) - 0.5
+        valid = champ_ids[:, None] != ally_ids[None, :]
+        count = valid.sum(axis=1)
 
-        mean_diff = float(np.mean(diffs))
-        best_diff = float(np.max(diffs))
-        worst_diff = float(np.min(diffs))
+        mean_diff = np.where(valid, diffs, 0.0).sum(axis=1) / np.maximum(count, 1)
+        best_diff = np.where(valid, diffs, -np.inf).max(axis=1)
+        worst_diff = np.where(valid, diffs, np.inf).min(axis=1)
 
         # Use "best buddy" synergy heavily so that changing a single ally can
         # strongly affect rankings (SOLOQ behavior).
-        mean_diff = max(-0.25, min(0.25, mean_diff))
-        best_diff = max(-0.25, min(0.25, best_diff))
-        worst_diff = max(-0.25, min(0.25, worst_diff))
-
-        bonus = (best_diff * 1.6) + (mean_diff * 0.6) + (worst_diff * 0.2)
-        return float(max(-0.50, min(0.50, bonus)))
-
-    def _solo_q_counter_bonus(self, champ_stats: Any, my_role: str, target_side: str) -> float:
-        """SoloQ-only bonus based on a simple lane counter heuristic.
-
-        We compare lane dominance + gold hunger against the enemy laner for the same role
-        (when identifiable). Returns an additive score delta that can be large enough to
-        reshuffle the top picks when enemies change (roughly capped around +/-0.45).
-        """
-
-        enemies = self.red_picks if target_side == "BLUE" else self.blue_picks
-        if not enemies:
-            return 0.0
+        mean_diff = np.clip(mean_diff, -0.25, 0.25)
+        best_diff = np.clip(best_diff, -0.25, 0.25)
+        worst_diff = np.clip(worst_diff, -0.25, 0.25)
 
-        enemy_roles = self._solve_roles(enemies)
-        role_to_enemy = {v: k for k, v in enemy_roles.items()}
-        enemy_laner = role_to_enemy.get(my_role)
-        if not enemy_laner:
-            return 0.0
-
-        enemy_id = self.name_to_id.get(str(enemy_laner).lower())
-        if not enemy_id:
-            return 0.0
-
-        enemy_row = self.df.filter(pl.col("champ_id") == enemy_id).mean()
-        if enemy_row.height == 0:
-            return 0.0
-
-        def val(key: str) -> float:
-            try:
-                if hasattr(champ_stats, "get"):
-                    v = champ_stats.get(key, 0)
-                else:
-                    v = champ_stats[key]
-                return float(v or 0)
-            except Exception:
-                return 0.0
+        bonus = np.clip((best_diff * 1.6) + (mean_diff * 0.6) + (worst_diff * 0.2), -0.50, 0.50)
+        return np.where(count > 0, bonus, 0.0)
 
-        my_prio = val("style_lane_dominance")
-        my_scale = val("style_gold_hunger")
+    # --- GAME STATE ---
+    def configure_series(self, mode: str, total_games: int):
+        modes = {"NORMAL": "NORMAL", "FEARLESS": "FEARLESS", "IRONMAN": "IRONMAN", "SOLOQ": "SOLOQ"}
+        self.series_config["mode"] = modes.get(mode.upper(), "NORMAL")
+        self.series_config["total_games"] = max(1, min(5, int(total_games)))
+        self.history = []
+        self.series_config["current_game"] = 1
+        self.reset_game_board()
 
-        en_prio = float(enemy_row["style_lane_dominance"][0] or 0)
-        en_scale = float(enemy_row["style_gold_hunger"][0] or 0)
+    def reset_game_board(self):
+        self.blue_picks: List[str] = []
+        self.red_picks: List[str] = []
+        self.bans: List[str] = []
+        self.blue_roles: Dict[str, str] = {}
+        self.red_roles: Dict[str, str] = {}
+        if not self.quiet:
+            self.print_dashboard(last_action="Game Started")
 
-        lane_adv = my_prio - en_prio
-        scale_adv = my_scale - en_scale
+    # Everything a pick/ban/series message can change; the rest of the oracle is loaded data.
+    DRAFT_STATE = ("series_config", "history", "teams", "blue_picks", "red_picks", "bans", "blue_roles", "red_roles")
 
-        lane_norm = max(-1.0, min(1.0, lane_adv / 6.0))
-        scale_norm = max(-1.0, min(1.0, scale_adv / 6.0))
+    # Standard tournament draft: (side, is_ban) of every turn, in order.
+    PRO_DRAFT_ORDER = (
+        ("BLUE", True), ("RED", True), ("BLUE", True), ("RED", True), ("BLUE", True), ("RED", True),
+        ("BLUE", False), ("RED", False), ("RED", False), ("BLUE", False), ("BLUE", False), ("RED", False),
+        ("RED", True), ("BLUE", True), ("RED", True), ("BLUE", True),
+        ("RED", False), ("BLUE", False), ("BLUE", False), ("RED", False),
+    )
 
-        # Continuous component.
-        bonus = (lane_norm * 0.14) + (scale_norm * 0.10)
+    def next_turn(self) -> Optional[Tuple[str, bool]]:
+        """(side, is_ban) of the next turn in PRO_DRAFT_ORDER; None once the draft is complete.
 
-        # Discrete component (more "counter-like" and noticeable).
-        if lane_adv >= 2:
-            bonus += 0.18
-        elif lane_adv <= -2:
-            bonus -= 0.14
+        Bans are not recorded per side, so turns are matched by ban and pick counts.
+        """
 
-        if scale_adv >= 2:
-            bonus += 0.12
-        elif scale_adv <= -2:
-            bonus -= 0.10
+        left = {"BAN": len(self.bans), "BLUE": len(self.blue_picks), "RED": len(self.red_picks)}
+        for side, is_ban in self.PRO_DRAFT_ORDER:
+            slot = "BAN" if is_ban else side
+            if left[slot] == 0:
+                return side, is_ban
+            left[slot] -= 1
+        return None
 
-        # If you have tempo AND they outscale, reward early snowball picks.
-        if lane_adv >= 1 and my_scale < en_scale:
-            bonus += 0.06
+    def state_key(self) -> Tuple:
+        """Hashable value of the draft state (everything suggestions depend on besides loaded data)."""
 
-        return float(max(-0.45, min(0.45, bonus)))
+        def freeze(value: Any) -> Any:
+            if isinstance(value, dict):
+                return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+            if isinstance(value, (list, tuple)):
+                return tuple(freeze(v) for v in value)
+            return value
 
-    def _solo_q_popularity_bonus(self, games_played: float, pr: float) -> float:
-        """SoloQ-only bonus for champions that are played a lot.
+        return tuple(freeze(getattr(self, name)) for name in self.DRAFT_STATE if name not in ("blue_roles", "red_roles"))
 
-        The feature store provides per-role aggregated pick frequency via:
-        - games_played: absolute number of samples for this champ+role
-        - pr: share of games within that role slice
+    def new_session(self) -> "TournamentDraft":
+        """A new, empty draft over the same loaded data.
 
-        We want a noticeable but bounded lift for very common picks, because in SoloQ
-        comfort/availability matters even when raw winrate is only "decent".
+        Sessions share the model, feature store and every derived table by reference
+        and only own the DRAFT_STATE attributes, so each one costs a few small dicts.
         """
 
-        try:
-            gp = float(games_played or 0.0)
-            pr = float(pr or 0.0)
-        except Exception:
-            return 0.0
-
-        # Normalize pick-rate (role-local) and absolute sample size with log scaling.
-        pr_norm = max(0.0, min(1.0, pr / 0.06))  # ~6%+ in-role is very common
-        gp_norm = max(0.0, min(1.0, np.log1p(gp) / np.log1p(4000.0)))
+        session = copy.copy(self)
+        session._init_draft_state()
+        return session
 
-        pop = (pr_norm * 0.70) + (gp_norm * 0.30)
+    def adopt_data(self, source: "TournamentDraft") -> None:
+        """Point this session at `source`'s loaded data (e.g. after a reload), keeping its draft."""
 
-        # Shift so average-ish popularity is ~0; very popular picks get a lift.
-        bonus = (pop - 0.35) * 0.16
+        state = {name: getattr(self, name) for name in self.DRAFT_STATE}
+        self.__dict__.update(source.__dict__)
+        self.__dict__.update(state)
 
-        return float(max(-0.03, min(0.10, bonus)))
+    def fork(self) -> "TournamentDraft":
+        """A copy that shares every loaded table but owns a private copy of the draft state.
 
-    # --- GAME STATE ---
-    def configure_series(self, mode: str, total_games: int):
-        modes = {"NORMAL": "NORMAL", "FEARLESS": "FEARLESS", "IRONMAN": "IRONMAN", "SOLOQ": "SOLOQ"}
-        self.series_config["mode"] = modes.get(mode.upper(), "NORMAL")
-        self.series_config["total_games"] = max(1, min(5, int(total_games)))
-        self.history = []
-        self.series_config["current_game"] = 1
-        self.reset_game_board()
+        Read-only requests run against a fork so they see one consistent board while
+        later picks and bans are applied to the original.
+        """
 
-    def reset_game_board(self):
-        self.blue_picks: List[str] = []
-        self.red_picks: List[str] = []
-        self.bans: List[str] = []
-        self.blue_roles: Dict[str, str] = {}
-        self.red_roles: Dict[str, str] = {}
-        if not self.quiet:
-            self.print_dashboard(last_action="Game Started")
+        view = copy.copy(self)
+        for name in self.DRAFT_STATE:
+            setattr(view, name, copy.deepcopy(getattr(self, name)))
+        return view
 
     def get_forbidden_champs(self, my_side: str):
         forbidden = set(self.blue_picks + self.red_picks + self.bans)
+        forbidden.update(self._series_forbidden(my_side))
+        return forbidden
+
+    def _series_forbidden(self, my_side: str) -> Set[str]:
+        """Champions earlier games of the series make unavailable to `my_side` (Fearless/Ironman)."""
+
+        forbidden: Set[str] = set()
         mode = self.series_config["mode"]
         for prev in self.history:
             if mode == "FEARLESS":
@@ -849,6 +995,50 @@ class TournamentDraft:
         if not self.quiet:
             self.print_dashboard(last_action=f"{side} PICK: {c}")
 
+    def sync_board(self, blue_picks: List[str], red_picks: List[str], bans: List[str]) -> bool:
+        """Make the board match a full client state; returns whether anything changed.
+
+        The result is the board that resetting and adding every ban, then the blue and
+        red picks, would give (unknown names dropped, unavailable picks blocked), but
+        only the lists that differ are replaced. Role assignments of an unchanged side
+        are kept, and a resync of the current board is a no-op.
+        """
+
+        new_bans = [c for c in map(self._resolve_name, bans) if c]
+        board = set(new_bans)
+        new_picks: Dict[str, List[str]] = {}
+        for side, names in (("BLUE", blue_picks), ("RED", red_picks)):
+            blocked = self._series_forbidden(side)
+            out: List[str] = []
+            for name in names:
+                c = self._resolve_name(name)
+                if not c:
+                    continue
+                if c in board or c in blocked:
+                    if not self.quiet:
+                        print(f"BLOCKED ({self.series_config['mode']}): {c} not available.")
+                    continue
+                out.append(c)
+                board.add(c)
+            new_picks[side] = out
+
+        changed = False
+        if new_bans != self.bans:
+            self.bans = new_bans
+            changed = True
+        if new_picks["BLUE"] != self.blue_picks:
+            self.blue_picks = new_picks["BLUE"]
+            self.blue_roles = self._solve_roles(self.blue_picks)
+            changed = True
+        if new_picks["RED"] != self.red_picks:
+            self.red_picks = new_picks["RED"]
+            self.red_roles = self._solve_roles(self.red_picks)
+            changed = True
+
+        if changed and not self.quiet:
+            self.print_dashboard(last_action="SYNC")
+        return changed
+
     def end_game(self):
         self.history.append(
             {"blue_picks": self.blue_picks.copy(), "red_picks": self.red_picks.copy(), "bans": self.bans.copy()}
@@ -876,14 +1066,29 @@ class TournamentDraft:
             print(f"Analyzing threats from {enemy_team['name']} (Ban recommendations)...")
         self._analyze_and_print(enemy_side, is_ban_mode=True)
 
-    def get_suggestions(self, target_side: str, is_ban_mode: bool, roles: Optional[List[str]] = None) -> Dict[str, Any]:
+    def get_suggestions(
+        self,
+        target_side: str,
+        is_ban_mode: bool,
+        roles: Optional[List[str]] = None,
+        what_if: bool = False,
+        notes: bool = True,
+        checkpoint: Optional[Callable[[], None]] = None,
+    ) -> Dict[str, Any]:
         """Structured version of _analyze_and_print() for UI consumption.
 
         Logic is preserved; only the output is returned instead of printed.
         If `roles` is provided, it overrides the inferred open roles (useful for flex picks).
+        If `what_if` is set, every candidate is also scored by the model: the change in
+        `target_side` win probability from adding it to the board is added to its score.
+        Notes ("tactical") are only built for returned candidates; `notes=False` skips
+        them entirely for callers that only need the rankings.
+        `checkpoint`, if given, is called between roles and between returned candidates;
+        it may raise to abandon a computation whose result is no longer wanted.
         """
 
-        forbidden = self.get_forbidden_champs(target_side)
+        if checkpoint is None:
+            checkpoint = _no_checkpoint
 
         # Keep the original role inference; only the output selection is optionally overridden.
         self.blue_roles = self._solve_roles(self.blue_picks)
@@ -910,140 +1115,79 @@ class TournamentDraft:
                 "total_games": self.series_config["total_games"],
             }
 
-        suggestions: List[Suggestion] = []
-
-        for role in open_roles:
-            p_name = self.teams[target_side]["players"].get(role.lower(), None)
+        # Shared by every candidate scorer below.
+        ctx = self.build_draft_context(target_side)
+        forbidden = ctx.forbidden
 
-            raw_cands = self.df.filter(pl.col("position") == role)
+        role_cands = {role: self._candidates(role, forbidden) for role in open_roles}
 
-            cands = raw_cands.group_by("champ_id").agg(
-                [
-                    pl.col("games_played").sum(),
-                    ((pl.col("stat_winrate") * pl.col("games_played")).sum() / pl.col("games_played").sum()).alias(
-                        "stat_winrate"
-                    ),
-                    pl.col("style_lane_dominance").mean().fill_null(0),
-                    pl.col("style_gold_hunger").mean().fill_null(0),
-                ]
+        model_deltas: Dict[str, np.ndarray] = {}
+        if what_if:
+            checkpoint()
+            model_deltas = self._what_if_deltas(
+                target_side, {role: table["champ_id"] for role, (table, _) in role_cands.items()}
             )
 
-            total_games = cands["games_played"].sum()
-            cands = cands.filter(pl.col("games_played") > 100)
-            cands = cands.with_columns((pl.col("games_played") / total_games).alias("pr")).filter(pl.col("pr") > 0.005)
-            if self.series_config["mode"] == "SOLOQ":
-                # In SoloQ, widen the pool and prioritize popular champs so high-playrate
-                # "comfort" picks can compete even if winrate isn't top-1.
-                cand_pd = cands.sort(["pr", "stat_winrate"], descending=True).limit(250).to_pandas()
-            else:
-                cand_pd = cands.sort("stat_winrate", descending=True).limit(150).to_pandas()
-
-            for _, row in cand_pd.iterrows():
-                c_name = self.id_to_name.get(row["champ_id"])
-                if not c_name or c_name in forbidden:
-                    continue
+        mode = self.series_config["mode"]
+        recs: Dict[str, List[Dict[str, Any]]] = {}
+        for role in open_roles:
+            checkpoint()
+            p_name = self.teams[target_side]["players"].get(role.lower(), None)
+            cand_table, cand_names = role_cands[role]
+            display_names = [
+                self.id_to_display_name.get(c, n) for c, n in zip(cand_table["champ_id"].tolist(), cand_names)
+            ]
 
-                display_name = self.id_to_display_name.get(int(row["champ_id"]), c_name)
-                base_score = row["stat_winrate"]
-                pro_bonus, pro_note, pro_games = 0.0, "", 0
-                meta_bonus, meta_note = 0.0, ""
-                soloq_syn_bonus = 0.0
-                soloq_counter_bonus = 0.0
-                soloq_pop_bonus = 0.0
-
-                if self.series_config["mode"] != "SOLOQ":
-                    pro_bonus, pro_note, pro_games = self.get_pro_bias(p_name, display_name)
-                    meta_bonus, meta_note = self.get_tournament_bias(c_name)
-                    final_score = base_score + pro_bonus + meta_bonus
-                    final_score = min(1.0, float(final_score))
-                else:
-                    # SoloQ scoring: emphasize ally synergy + lane countering.
-                    raw_syn = self._solo_q_synergy_bonus(int(row["champ_id"]), target_side)
-                    raw_counter = self._solo_q_counter_bonus(row, role, target_side)
-                    soloq_pop_bonus = self._solo_q_popularity_bonus(float(row.get("games_played", 0)), float(row.get("pr", 0)))
-
-                    # Make counters heavier; slightly reduce other factors.
-                    soloq_syn_bonus = raw_syn * 0.80
-                    soloq_counter_bonus = max(-0.65, min(0.70, raw_counter * 2.0))
-
-                    # Further compress raw stat winrate so matchups/counters can drive changes.
-                    base_component = 0.5 + (float(base_score) - 0.5) * 0.25
-
-
-                    raw_score = float(base_component + soloq_syn_bonus + soloq_counter_bonus + soloq_pop_bonus)
-                    if raw_score <= 0.0:
-                        final_score = 0.0
-                    elif raw_score < 1.0:
-                        final_score = raw_score
-                    else:
-                        cap_low = 0.985
-                        alpha = 1.6
-                        over = raw_score - 1.0
-                        final_score = 1.0 - (1.0 - cap_low) * float(np.exp(-alpha * over))
-                    final_score = max(0.0, min(1.0, float(final_score)))
-
-                tactical_note = self.get_tactical_analysis(int(row["champ_id"]), row, role, target_side)
-
-                parts: List[str] = []
-                if pro_note:
-                    parts.append(pro_note)
-                if pro_bonus > 0 and p_name and pro_games >= 20:
-                    parts.append(f"{display_name} is best for {p_name}")
-                if meta_note:
-                    parts.append(meta_note)
-                if self.series_config["mode"] == "SOLOQ":
-                    if abs(soloq_syn_bonus) >= 0.012:
-                        parts.append(f"SoloQ synergy impact: {soloq_syn_bonus:+.1%}")
-                    if abs(soloq_counter_bonus) >= 0.012:
-                        parts.append(f"SoloQ counter impact: {soloq_counter_bonus:+.1%}")
-                    if abs(soloq_pop_bonus) >= 0.012:
-                        parts.append(f"SoloQ popularity impact: {soloq_pop_bonus:+.1%}")
-                if tactical_note:
-                    parts.extend(tactical_note)
-                elif row["stat_winrate"] > 0.52:
-                    parts.append("Strong Stats")
-
-                reason_text = "\n- ".join(parts)
-                if reason_text:
-                    reason_text = "- " + reason_text
+            # Phase 1: every score component for the whole role pool at once.
+            comp = self._score_candidates(role, cand_table, cand_names, display_names, p_name, ctx, model_deltas.get(role))
+            scores = comp["score"]
+
+            # Equal scores keep candidate order (as the old global stable sort did).
+            top = top_k(scores, self.SUGGESTIONS_PER_ROLE).tolist()
+            threats = threat_levels(scores[top]) if is_ban_mode else None
+
+            # Phase 2: tags and notes, only for the candidates that are returned.
+            role_items: List[Suggestion] = []
+            for rank, i in enumerate(top):
+                checkpoint()
+                pro_bonus = comp["pro_bonus"][i]
+                meta_bonus = comp["meta_bonus"][i]
+                soloq_syn_bonus = comp["soloq_syn"][i]
+                soloq_counter_bonus = comp["soloq_counter"][i]
+                soloq_pop_bonus = comp["soloq_pop"][i]
+                model_delta = float(comp["model_delta"][i])
+
+                reason_text = ""
+                if notes:
+                    reason_text = self._suggestion_notes(role, i, comp, cand_table, display_names[i], p_name, ctx, what_if)
 
                 tags: List[str] = []
                 if pro_bonus > 0:
                     tags.append("P")
                 if meta_bonus > 0:
                     tags.append("T")
-                if self.series_config["mode"] == "SOLOQ":
+                if mode == "SOLOQ":
                     if soloq_syn_bonus > 0.0:
                         tags.append("S")
                     if soloq_counter_bonus > 0.0:
                         tags.append("C")
                     if soloq_pop_bonus > 0.0:
                         tags.append("R")
+                if model_delta > 0.0:
+                    tags.append("M")
 
-                threat = ""
-                if is_ban_mode:
-                    threat = "Normal"
-                    if final_score > 0.60:
-                        threat = "LETHAL"
-                    elif final_score > 0.55:
-                        threat = "HIGH"
-
-                suggestions.append(
+                role_items.append(
                     Suggestion(
                         role=role,
-                        champion=c_name,
-                        score=float(final_score),
+                        champion=cand_names[i],
+                        score=float(scores[i]),
                         tactical=reason_text,
                         tags="".join(tags),
-                        threat=threat,
+                        threat=threats[rank] if threats else "",
+                        model_delta=model_delta,
                     )
                 )
 
-        # sort and top-10 per role
-        suggestions.sort(key=lambda s: s.score, reverse=True)
-        recs: Dict[str, List[Dict[str, Any]]] = {r: [] for r in open_roles}
-        for role in open_roles:
-            role_items = [s for s in suggestions if s.role == role][:18]
             recs[role] = [
                 {
                     "champion": s.champion,
@@ -1054,6 +1198,9 @@ class TournamentDraft:
                 }
                 for s in role_items
             ]
+            if what_if:
+                for rec, s in zip(recs[role], role_items):
+                    rec["model_delta"] = s.model_delta
 
         wr = self.predict_live_winrate()
         return {
@@ -1062,6 +1209,12 @@ class TournamentDraft:
             "open_roles": open_roles,
             "inferred_open_roles": inferred_open_roles,
             "recommendations": recs,
+            "what_if": what_if,
+            # Flex picks: how likely each locked champion is to play each role.
+            "role_probabilities": {
+                "BLUE": self.get_role_probabilities(self.blue_picks),
+                "RED": self.get_role_probabilities(self.red_picks),
+            },
             "blue_winrate": wr["blue"],
             "red_winrate": wr["red"],
             "blocked_count": self.get_blocked_count(),
@@ -1079,6 +1232,157 @@ class TournamentDraft:
             },
         }
 
+    def _suggestion_notes(
+        self,
+        role: str,
+        i: int,
+        comp: Dict[str, np.ndarray],
+        table: CandidateTable,
+        display_name: str,
+        player_name: Optional[str],
+        ctx: DraftContext,
+        what_if: bool,
+    ) -> str:
+        """The "tactical" reason text of candidate `i` of `role` (see _score_candidates)."""
+
+        tactical_note = self.get_tactical_analysis(int(table["champ_id"][i]), role, ctx.target_side, ctx)
+
+        parts: List[str] = []
+        note = pro_note(comp["pro_kind"][i], comp["pro_games"][i], comp["pro_winrate"][i])
+        if note:
+            parts.append(note)
+        if comp["pro_bonus"][i] > 0 and player_name and comp["pro_games"][i] >= 20:
+            parts.append(f"{display_name} is best for {player_name}")
+        note = meta_note(comp["meta_kind"][i], comp["meta_presence"][i], comp["meta_winrate"][i])
+        if note:
+            parts.append(note)
+        if self.series_config["mode"] == "SOLOQ":
+            soloq_syn_bonus = comp["soloq_syn"][i]
+            soloq_counter_bonus = comp["soloq_counter"][i]
+            soloq_pop_bonus = comp["soloq_pop"][i]
+            if abs(soloq_syn_bonus) >= 0.012:
+                parts.append(f"SoloQ synergy impact: {soloq_syn_bonus:+.1%}")
+            if abs(soloq_counter_bonus) >= 0.012:
+                parts.append(f"SoloQ counter impact: {soloq_counter_bonus:+.1%}")
+            if abs(soloq_pop_bonus) >= 0.012:
+                parts.append(f"SoloQ popularity impact: {soloq_pop_bonus:+.1%}")
+        model_delta = float(comp["model_delta"][i])
+        if what_if and abs(model_delta) >= 0.005:
+            parts.append(f"Model what-if: {model_delta:+.1%}")
+        if tactical_note:
+            parts.extend(tactical_note)
+        elif table["stat_winrate"][i] > 0.52:
+            parts.append("Strong Stats")
+
+        reason_text = "\n- ".join(parts)
+        if reason_text:
+            reason_text = "- " + reason_text
+        return reason_text
+
+    def _score_candidates(
+        self,
+        role: str,
+        table: CandidateTable,
+        names: List[str],
+        display_names: List[str],
+        player_name: Optional[str],
+        ctx: DraftContext,
+        model_delta: Optional[np.ndarray] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Score components for every candidate of `role`, as columns aligned with `table`.
+
+        "score" is the final suggestion score; the other columns feed the tags and notes.
+        """
+
+        n = len(table)
+        base = table["stat_winrate"].astype(np.float64)
+        comp: Dict[str, np.ndarray] = {
+            "base": base,
+            "pro_bonus": np.zeros(n),
+            "pro_kind": np.zeros(n, dtype=np.int64),
+            "pro_games": np.zeros(n, dtype=np.int64),
+            "pro_winrate": np.zeros(n),
+            "meta_bonus": np.zeros(n),
+            "meta_kind": np.zeros(n, dtype=np.int64),
+            "meta_presence": np.zeros(n, dtype=np.int64),
+            "meta_winrate": np.zeros(n),
+            "soloq_syn": np.zeros(n),
+            "soloq_counter": np.zeros(n),
+            "soloq_pop": np.zeros(n),
+            "model_delta": model_delta if model_delta is not None else np.zeros(n),
+        }
+
+        if self.series_config["mode"] != "SOLOQ":
+            found, games, winrate, proficiency, invalid = self._pro_signatures(player_name, display_names)
+            comp["pro_bonus"], comp["pro_kind"] = pro_bias(found, games, winrate, proficiency, self.is_pro_match(), invalid)
+            comp["pro_games"], comp["pro_winrate"] = games, winrate
+
+            meta = self.meta_table.take(self.champ_index.indices(table["champ_id"]))
+            comp["meta_bonus"], comp["meta_kind"], comp["meta_presence"], comp["meta_winrate"] = meta
+
+            comp["score"] = np.minimum(1.0, base + comp["pro_bonus"] + comp["meta_bonus"] + comp["model_delta"])
+            return comp
+
+        # SoloQ scoring: emphasize ally synergy + lane countering.
+        raw_syn = self._solo_q_synergy_bonus(table["champ_id"], ctx.target_side, ctx)
+        opponent = ctx.lane_opponents.get(role)
+        if opponent and opponent.champ_id:
+            raw_counter = self.lane_counters.counter(role, self.champ_index.indices(table["champ_id"]), opponent.index)
+        else:
+            raw_counter = np.zeros(n)
+        comp["soloq_pop"] = soloq_popularity_bonus(table["games_played"].astype(np.float64), table["pr"].astype(np.float64))
+
+        # Make counters heavier; slightly reduce other factors.
+        comp["soloq_syn"] = raw_syn * 0.80
+        comp["soloq_counter"] = np.clip(raw_counter * 2.0, -0.65, 0.70)
+
+        # Further compress raw stat winrate so matchups/counters can drive changes.
+        base_component = 0.5 + (base - 0.5) * 0.25
+
+        raw_score = base_component + comp["soloq_syn"] + comp["soloq_counter"] + comp["soloq_pop"] + comp["model_delta"]
+        comp["score"] = soloq_soft_cap(raw_score)
+        return comp
+
+    def _what_if_deltas(self, target_side: str, role_cands: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Model win-probability delta for `target_side` of adding each candidate to its role.
+
+        `role_cands` maps an open role to candidate champion ids. Every hypothetical
+        board ("current picks + candidate", for all roles) is stacked with the current
+        board into one matrix and evaluated in a single `predict` call.
+        """
+
+        deltas = {role: np.zeros(len(ids)) for role, ids in role_cands.items()}
+        if self.feature_plan is None:
+            return deltas
+
+        own = self._role_champ_indices(self.blue_roles if target_side == "BLUE" else self.red_roles)
+        other = self._role_champ_indices(self.red_roles if target_side == "BLUE" else self.blue_roles)
+
+        # Row 0 is the current board; each role contributes one row per candidate.
+        blocks = [own[None, :]]
+        spans: Dict[str, Tuple[int, int]] = {}
+        start = 1
+        for role, ids in role_cands.items():
+            if role not in ROLES or len(ids) == 0:
+                continue
+            block = np.repeat(own[None, :], len(ids), axis=0)
+            block[:, ROLES.index(role)] = self.champ_index.indices(ids)
+            blocks.append(block)
+            spans[role] = (start, start + len(ids))
+            start += len(ids)
+
+        own_rows = np.concatenate(blocks, axis=0)
+        other_rows = np.broadcast_to(other, own_rows.shape)
+        blue_rows, red_rows = (own_rows, other_rows) if target_side == "BLUE" else (other_rows, own_rows)
+
+        rows = self.feature_plan.build(blue_rows, red_rows)
+        pred = np.clip(self.predictor.predict(rows), 0.0, 1.0)
+        win = pred if target_side == "BLUE" else 1.0 - pred
+
+        for role, (lo, hi) in spans.items():
+            deltas[role] = win[lo:hi].astype(np.float64) - float(win[0])
+        return deltas
+
     def _analyze_and_print(self, target_side: str, is_ban_mode: bool):
         res = self.get_suggestions(target_side, is_ban_mode, roles=None)
         open_roles = res["open_roles"]
@@ -1116,30 +1420,17 @@ class TournamentDraft:
                 print(top_10[cols].to_string(index=False, formatters={"Score": "{:.1%}".format}))
 
     def _resolve_name(self, text: str) -> Optional[str]:
-        matches = [k for k in self.name_to_id.keys() if text.lower() in k]
-        return self.id_to_name[self.name_to_id[min(matches, key=len)]] if matches else None
+        champ_id = self.champions.resolve(text)
+        return self.id_to_name[champ_id] if champ_id is not None else None
 
     def _solve_roles(self, picks: List[str]) -> Dict[str, str]:
-        if not picks:
-            return {}
-        roles = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
-        best_sc, best_assign = -1, {}
-        for combo in itertools.permutations(roles, len(picks)):
-            sc, valid = 1.0, True
-            temp = {}
-            for i, p in enumerate(picks):
-                prob = self.role_map.get(p, {}).get(combo[i], 0.0001)
-                if prob < 0.05:
-                    prob *= 0.1
-                sc *= prob
-                temp[p] = combo[i]
-                if sc < 1e-12:
-                    valid = False
-                    break
-            if valid and sc > best_sc:
-                best_sc = sc
-                best_assign = temp
-        return best_assign
+        # Memoized DP over role masks; same result as trying every permutation.
+        return dict(self.role_solver.solve(picks))
+
+    def get_role_probabilities(self, picks: List[str]) -> Dict[str, Dict[str, float]]:
+        """Marginal role probabilities per pick (how likely each champion plays each role)."""
+
+        return self.role_solver.marginals(picks)
 
     # --- DISPLAY (CLI) ---
     def print_dashboard(self, last_action: str = "Waiting for action..."):
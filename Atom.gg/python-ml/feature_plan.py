@@ -0,0 +1,159 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from oracle_tables import FeatureTensor, SynergyMatrix
+
+
+# Layout of the Draft Oracle model input (see model_features_v12.json). Kept in one
+# place so the compiled plan and the feature store agree on column names.
+ROLES = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+
+# Base per-slot columns we can map directly from the feature store.
+SLOT_COLS = [
+    "stat_dpm",
+    "stat_gpm",
+    "stat_dmg_taken",
+    "stat_mitigated",
+    "stat_heal",
+    "stat_hard_cc",
+    "stat_vision_score",
+    "z_style_roaming_tendency",
+    "z_style_lane_dominance",
+    "z_style_gank_heaviness",
+    "z_style_objective_control",
+    "z_style_invade_pressure",
+    "z_style_gold_hunger",
+]
+
+# Team totals (sum across the 5 roles).
+SUM_COLS = ["avg_magic_dmg", "avg_phys_dmg", "avg_true_dmg", "stat_dmg_taken", "stat_mitigated", "stat_heal", "stat_hard_cc"]
+
+VOLATILITY_COLS = ["var_gold_volatility", "var_damage_volatility", "var_lane_stability"]
+
+DUEL_COLS = ["stat_gpm", "stat_dpm", "z_style_lane_dominance"]
+
+# (feature suffix, role a, role b)
+SYNERGY_DUOS = [("mid_jg", "MIDDLE", "JUNGLE"), ("bot_duo", "BOTTOM", "UTILITY"), ("top_jg", "TOP", "JUNGLE")]
+
+
+class FeaturePlan:
+    """`model.feature_names` compiled into an index plan over the feature tensor.
+
+    A draft state is described by the champion-index of each role slot per side
+    (-1 for an empty slot or unknown champion). `build()` turns a batch of those into
+    model input rows with one gather for both sides, a handful of axis reductions
+    written straight into one quantity row and a final column permutation into the
+    model's feature order. Features the plan does not know about are left at 0.0,
+    as before.
+    """
+
+    def __init__(self, feature_names: Sequence[str], features: FeatureTensor, synergy: SynergyMatrix):
+        self.feature_names = list(feature_names)
+        self.features = features
+        self.synergy = synergy
+        # Plain ndarray views: snapshot tables are np.memmap, whose per-index
+        # bookkeeping dominates at batch size 1.
+        self._values = np.asarray(features.values)
+        self._synergy = np.asarray(synergy.values)
+
+        # Only the feature-store columns the plan reads are gathered; SLOT_COLS come
+        # first, so the per-slot block is a slice of the gather.
+        self._cols = list(dict.fromkeys([*SLOT_COLS, *SUM_COLS, *VOLATILITY_COLS, *DUEL_COLS]))
+        self._col_idx = features.columns(self._cols)
+        local = {c: i for i, c in enumerate(self._cols)}
+        self._sum_k = np.asarray([local[c] for c in SUM_COLS])
+        self._vol_k = np.asarray([local[c] for c in VOLATILITY_COLS])
+        self._duel_k = np.asarray([local[c] for c in DUEL_COLS])
+        self._pos_idx = np.asarray([features.position(r) for r in ROLES])
+        self._duo_a = np.asarray([ROLES.index(a) for _, a, _ in SYNERGY_DUOS])
+        self._duo_b = np.asarray([ROLES.index(b) for _, _, b in SYNERGY_DUOS])
+
+        # Offsets into one side's block of quantities (see _side_names).
+        n_slot = len(ROLES) * len(SLOT_COLS)
+        self._means_at = n_slot
+        self._totals_at = n_slot + len(SLOT_COLS)
+        self._side_len = len(self._side_names("blue"))
+        self._syn_at = self._side_len - len(SYNERGY_DUOS)
+        self._gank_k = SLOT_COLS.index("z_style_gank_heaviness")
+        self._hunger_k = SLOT_COLS.index("z_style_gold_hunger")
+        self._invade_k = SLOT_COLS.index("z_style_invade_pressure")
+
+        names = self._quantity_names()
+        position = {n: i for i, n in enumerate(names)}
+        self._n_quantities = len(names) + 1  # trailing 0.0 column for unknown model features
+        self._plan = np.asarray([position.get(n, len(names)) for n in self.feature_names], dtype=np.int64)
+
+    @staticmethod
+    def _side_names(side: str) -> List[str]:
+        names = [f"{side}_{r}_{c}" for r in ROLES for c in SLOT_COLS]
+        names += [f"{side}__{c}" for c in SLOT_COLS]
+        names += [
+            f"{side}_total_magic_dmg",
+            f"{side}_total_phys_dmg",
+            f"{side}_total_true_dmg",
+            f"{side}_magic_dmg_ratio",
+            f"{side}_total_tankiness",
+            f"{side}_total_sustain",
+            f"{side}_total_cc",
+            f"{side}_strat_gank_compatibility",
+            f"{side}_strat_resource_friction",
+            f"{side}_strat_invade_safety",
+        ]
+        names += [f"{side}_syn_{d}" for d, _, _ in SYNERGY_DUOS]
+        return names
+
+    def _quantity_names(self) -> List[str]:
+        names = self._side_names("blue") + self._side_names("red")
+        names += ["diff_team_volatility", "gap_syn_mid_jg"]
+        names += [f"duel_{r}_{c}" for r in ROLES for c in DUEL_COLS]
+        return names
+
+    def build(self, blue_idx: np.ndarray, red_idx: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Model input rows for a batch of drafts.
+
+        `blue_idx`/`red_idx` hold champion-index per role (shape (5,) or (B, 5), -1 for
+        empty). Returns float32 rows of shape (B, len(feature_names)), written into
+        `out` when given.
+        """
+
+        # (B, side, role): both sides go through every step together.
+        blue_idx = np.asarray(blue_idx, dtype=np.int64).reshape(-1, len(ROLES))
+        red_idx = np.asarray(red_idx, dtype=np.int64).reshape(-1, len(ROLES))
+        idx = np.stack([blue_idx, red_idx], axis=1)
+        b = idx.shape[0]
+        slots = self._values[idx[:, :, :, None], self._pos_idx[None, None, :, None], self._col_idx].astype(np.float64)
+        slot_vals = slots[:, :, :, : len(SLOT_COLS)]
+
+        q = np.zeros((b, self._n_quantities))
+        sides = q[:, : 2 * self._side_len].reshape(b, 2, self._side_len)
+        sides[:, :, : self._means_at] = slot_vals.reshape(b, 2, -1)
+        means = sides[:, :, self._means_at : self._totals_at]
+        np.mean(slot_vals, axis=2, out=means)
+
+        sums = slots[:, :, :, self._sum_k].sum(axis=2)
+        magic, phys, true_dmg, taken, mitigated, heal, cc = (sums[:, :, i] for i in range(len(SUM_COLS)))
+        totals = sides[:, :, self._totals_at : self._syn_at]
+        totals[:, :, 0:3] = sums[:, :, 0:3]
+        totals[:, :, 3] = magic / np.maximum(1e-9, magic + phys + true_dmg)
+        totals[:, :, 4] = taken + mitigated
+        totals[:, :, 5] = heal
+        totals[:, :, 6] = cc
+        totals[:, :, 7] = means[:, :, self._gank_k]
+        totals[:, :, 8] = slot_vals[:, :, :, self._hunger_k].std(axis=2)
+        totals[:, :, 9] = means[:, :, self._invade_k]
+
+        syn = sides[:, :, self._syn_at :]
+        syn[:] = self._synergy[idx[:, :, self._duo_a], idx[:, :, self._duo_b]]
+
+        vol = slots[:, :, :, self._vol_k].sum(axis=3).mean(axis=2)
+        at = 2 * self._side_len
+        q[:, at] = vol[:, 0] - vol[:, 1]
+        q[:, at + 1] = syn[:, 0, 0] - syn[:, 1, 0]
+        duel = slots[:, :, :, self._duel_k]
+        q[:, at + 2 : -1] = (duel[:, 0] - duel[:, 1]).reshape(b, -1)
+
+        if out is None or out.shape != (b, len(self._plan)):
+            out = np.empty((b, len(self._plan)), dtype=np.float32)
+        out[:] = q[:, self._plan]
+        return out
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import struct
+from typing import Any, BinaryIO, Dict, Optional
+
+# Optional codecs; the JSON lines framing needs neither.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Wire formats of the ml_server stream transports (stdin/stdout and Unix socket
+# clients). Every connection starts with JSON lines; an `init` message carrying
+# {"framing": "<name>"} switches both directions right after its response, which
+# reports the framing actually in use (unknown or unavailable names keep the
+# current one).
+
+# Largest accepted line / frame (a full sync_state is a few KB).
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+def _plain(value: Any) -> Any:
+    """NumPy scalars/arrays as plain Python values (for codecs that reject them)."""
+
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Type is not serializable: {type(value).__name__}")
+
+
+def error_response(request_id: Any, error: str) -> Dict[str, Any]:
+    return {"request_id": request_id, "ok": False, "type": "error", "error": error}
+
+
+class JsonLines:
+    """One JSON document per line (stdlib json): the default framing."""
+
+    name = "json"
+    available = True
+
+    def dumps(self, resp: Dict[str, Any]) -> bytes:
+        return json.dumps(resp).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+    def serialize(self, resp: Dict[str, Any]) -> bytes:
+        """`resp` encoded; a response that cannot be serialized becomes an error."""
+
+        try:
+            return self.dumps(resp)
+        except (TypeError, ValueError) as e:
+            return self.dumps(error_response(resp.get("request_id"), str(e)))
+
+    def encode(self, resp: Dict[str, Any]) -> bytes:
+        """`resp` as one frame."""
+
+        return self._frame(self.serialize(resp))
+
+    def _frame(self, data: bytes) -> bytes:
+        return data + b"\n"
+
+    def read_blocking(self, stream: BinaryIO) -> Optional[bytes]:
+        """Next frame from a binary stream (b"" for a blank line, None at the end)."""
+
+        line = stream.readline(MAX_MESSAGE_BYTES + 1)
+        if not line:
+            return None
+        if len(line) > MAX_MESSAGE_BYTES:
+            raise ValueError("Message too large")
+        return line.strip()
+
+    async def read(self, reader: asyncio.StreamReader) -> Optional[bytes]:
+        """Next frame from an asyncio stream (see read_blocking)."""
+
+        line = await reader.readline()
+        if not line:
+            return None
+        return line.strip()
+
+
+class OrjsonLines(JsonLines):
+    """JSON lines written and parsed with orjson (compact output, same wire format)."""
+
+    name = "orjson"
+    available = orjson is not None
+
+    def dumps(self, resp: Dict[str, Any]) -> bytes:
+        return orjson.dumps(resp, default=_plain, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackFrames(JsonLines):
+    """msgpack documents, each preceded by its length as a 4-byte big-endian integer."""
+
+    name = "msgpack"
+    available = msgpack is not None
+    _HEADER = struct.Struct(">I")
+
+    def dumps(self, resp: Dict[str, Any]) -> bytes:
+        return msgpack.packb(resp, default=_plain)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data)
+
+    def _frame(self, data: bytes) -> bytes:
+        return self._HEADER.pack(len(data)) + data
+
+    def _length(self, head: bytes) -> int:
+        (n,) = self._HEADER.unpack(head)
+        if n > MAX_MESSAGE_BYTES:
+            raise ValueError("Message too large")
+        return n
+
+    def read_blocking(self, stream: BinaryIO) -> Optional[bytes]:
+        head = stream.read(self._HEADER.size)
+        if len(head) < self._HEADER.size:
+            return None
+        n = self._length(head)
+        data = stream.read(n)
+        return data if len(data) == n else None
+
+    async def read(self, reader: asyncio.StreamReader) -> Optional[bytes]:
+        try:
+            head = await reader.readexactly(self._HEADER.size)
+            return await reader.readexactly(self._length(head))
+        except asyncio.IncompleteReadError:
+            return None
+
+
+JSON_LINES = JsonLines()
+FRAMINGS: Dict[str, JsonLines] = {f.name: f for f in (JSON_LINES, OrjsonLines(), MsgpackFrames())}
+
+
+def negotiate(current: JsonLines, msg: Dict[str, Any], resp: Dict[str, Any]) -> JsonLines:
+    """Framing after answering `msg` with `resp` (an init that asked for one).
+
+    Records the framing in use as resp["framing"].
+    """
+
+    framing = current
+    if resp.get("ok"):
+        requested = FRAMINGS.get(str(msg.get("framing", "")).lower())
+        if requested is not None and requested.available:
+            framing = requested
+    resp["framing"] = framing.name
+    return framing
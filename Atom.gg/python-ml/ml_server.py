@@ -1,15 +1,32 @@
-import json
+import asyncio
+import copy
 import os
+import signal
+import socket
+import stat
 import sys
-from typing import Any, Dict, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 from draft_oracle import TournamentDraft
+from ml_framing import JSON_LINES, MAX_MESSAGE_BYTES, JsonLines, error_response, negotiate
+from ml_speculation import Superseded, SuggestionCache, superseded_response
+from oracle_inference import DEFAULT_BACKEND
 
 
 def _eprint(*args: Any, **kwargs: Any) -> None:
     print(*args, file=sys.stderr, **kwargs)
 
 
+# Messages without a session_id address this session (the single-draft protocol).
+DEFAULT_SESSION = "default"
+# Messages that may open a new session; anything else needs an existing one.
+SESSION_SETUP_TYPES = ("init", "configure_series", "set_team", "roster")
+
+# (target_side, is_ban_mode, roles, what_if, notes) of a suggest request.
+SuggestParams = Tuple[str, bool, Optional[Tuple[str, ...]], bool, bool]
+
+
 class MlServer:
     def __init__(self):
         # CWD is expected to be python-ml
@@ -21,6 +38,12 @@ class MlServer:
         tournament_meta_file = os.environ.get("ATOMGG_TOURNAMENT_META_FILE", "draft_oracle_tournament_meta.parquet")
         synergy_file = os.environ.get("ATOMGG_SYNERGY_FILE", "draft_oracle_synergy_matrix.parquet")
         db_file = os.environ.get("ATOMGG_DB_FILE", os.path.join("..", "src-tauri", "src", "esports_data.db"))
+        cache_dir = os.environ.get("ATOMGG_CACHE_DIR", ".oracle_cache")
+        use_snapshot = os.environ.get("ATOMGG_SNAPSHOT", "1") != "0"
+        refresh_champions = os.environ.get("ATOMGG_CHAMPION_REFRESH", "1") != "0"
+        # "auto" (default: numpy for small batches, inplace above), "inplace",
+        # "numpy" (pure-NumPy tree evaluator) or "dmatrix".
+        inference_backend = os.environ.get("ATOMGG_INFERENCE", DEFAULT_BACKEND)
 
         self.app = TournamentDraft(
             model_file=model_file,
@@ -30,75 +53,236 @@ class MlServer:
             synergy_file=synergy_file,
             db_file=db_file,
             quiet=quiet,
+            cache_dir=cache_dir,
+            use_snapshot=use_snapshot,
+            refresh_champions=refresh_champions,
+            inference_backend=inference_backend,
+        )
+        _eprint(f"ML server startup ({self.app.snapshot_status}): {self.app.format_startup_timings()}")
+        if self.app.predictor is not None:
+            _eprint(f"ML server inference backend: {self.app.predictor.backend}")
+
+        # Concurrent drafts by session_id. Every session shares the oracle's loaded
+        # data (see TournamentDraft.new_session); self.app is the default session.
+        self.max_sessions = int(os.environ.get("ATOMGG_MAX_SESSIONS", "64"))
+        self.sessions: Dict[str, TournamentDraft] = {DEFAULT_SESSION: self.app}
+        self.initialized: Set[str] = set()
+
+        # Suggest payloads by draft state and parameters, shared by every session
+        # (filled by requests and by speculation, see ConcurrentMlServer).
+        self.suggestions = SuggestionCache(int(os.environ.get("ATOMGG_SUGGESTION_CACHE", "256")))
+
+    @staticmethod
+    def session_id(msg: Dict[str, Any]) -> str:
+        return str(msg.get("session_id") or DEFAULT_SESSION)
+
+    def session(self, session_id: str, create: bool = False) -> TournamentDraft:
+        """The draft for `session_id`; `create` opens it on first use."""
+
+        app = self.sessions.get(session_id)
+        if app is None:
+            if not create:
+                raise RuntimeError(f"Unknown session: {session_id}")
+            if len(self.sessions) >= self.max_sessions:
+                raise RuntimeError(f"Too many sessions (max {self.max_sessions})")
+            app = self.sessions[session_id] = self.app.new_session()
+        return app
+
+    def fork_session(self, msg: Dict[str, Any]) -> TournamentDraft:
+        """Snapshot of the message's session for a read-only request (checked here, as
+        later mutations must not affect it)."""
+
+        session_id = self.session_id(msg)
+        app = self.session(session_id)
+        if session_id not in self.initialized:
+            raise RuntimeError("ML not initialized")
+        return app.fork()
+
+    @staticmethod
+    def suggest_params(msg: Dict[str, Any]) -> SuggestParams:
+        """(target_side, is_ban_mode, roles, what_if, notes) of a suggest message."""
+
+        roles = msg.get("roles")
+        return (
+            str(msg.get("target_side", "BLUE")).upper(),
+            bool(msg.get("is_ban_mode", False)),
+            tuple(str(r).upper() for r in roles) if roles is not None else None,
+            bool(msg.get("what_if", False)),
+            # Rankings-only callers can skip the per-suggestion "tactical" notes.
+            bool(msg.get("notes", True)),
+        )
+
+    def suggest(
+        self, app: TournamentDraft, params: SuggestParams, checkpoint: Optional[Callable[[], None]] = None
+    ) -> Dict[str, Any]:
+        """get_suggestions for `params`, served from the suggestion cache when possible."""
+
+        if checkpoint is not None:
+            # A request that is already outdated stops before any work.
+            checkpoint()
+        return self.suggestions.get_or_compute(
+            (app.state_key(),) + params, lambda: self._suggestions(app, params, checkpoint)
+        )
+
+    def speculate(self, app: TournamentDraft, params: SuggestParams, is_current: Callable[[], bool]) -> None:
+        """Precompute `params` for `app` (a fork) into the suggestion cache, abandoning
+        the work as soon as `is_current()` turns false."""
+
+        def checkpoint() -> None:
+            if not is_current():
+                raise Superseded()
+
+        self.suggestions.speculate(
+            (app.state_key(),) + params, lambda: self._suggestions(app, params, checkpoint), is_current
+        )
+
+    @staticmethod
+    def _suggestions(
+        app: TournamentDraft, params: SuggestParams, checkpoint: Optional[Callable[[], None]]
+    ) -> Dict[str, Any]:
+        # On a private fork: payloads reference draft lists (debug_state) and cached
+        # ones must not change when the session moves on.
+        target_side, is_ban_mode, roles, what_if, notes = params
+        return app.fork().get_suggestions(
+            target_side,
+            is_ban_mode,
+            roles=list(roles) if roles is not None else None,
+            what_if=what_if,
+            notes=notes,
+            checkpoint=checkpoint,
         )
 
-        self.initialized = False
+    def handle(
+        self,
+        msg: Dict[str, Any],
+        app: Optional[TournamentDraft] = None,
+        checkpoint: Optional[Callable[[], None]] = None,
+    ) -> Dict[str, Any]:
+        """Handle one message against `app` (default: the message's session; read-only
+        messages may pass a fork of it, see ConcurrentMlServer). A suggest calls
+        `checkpoint` between roles and candidates; raising Superseded there answers it
+        with a "superseded" response."""
+
+        if msg.get("type") == "batch":
+            resp = self._handle_batch(msg, app)
+        else:
+            resp = self._handle(msg, app, checkpoint)
+        if "session_id" in msg:
+            resp["session_id"] = msg["session_id"]
+        return resp
+
+    def _handle_batch(self, msg: Dict[str, Any], app: Optional[TournamentDraft]) -> Dict[str, Any]:
+        """Handle msg["messages"] in order and return every response in one batch_result.
+
+        Sub-messages default to the batch's session_id; a failing one does not stop the
+        rest. Batches do not nest.
+        """
+
+        request_id = msg.get("request_id")
+        subs = msg.get("messages")
+        if not isinstance(subs, list):
+            return error_response(request_id, "batch needs a list of messages")
 
-    def handle(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        results: List[Dict[str, Any]] = []
+        for sub in subs:
+            if not isinstance(sub, dict) or sub.get("type") == "batch":
+                sub_id = sub.get("request_id") if isinstance(sub, dict) else None
+                results.append(error_response(sub_id, "Invalid batch entry"))
+                continue
+            if "session_id" in msg and "session_id" not in sub:
+                sub = dict(sub, session_id=msg["session_id"])
+            results.append(self.handle(sub, app))
+        return {"request_id": request_id, "ok": True, "type": "batch_result", "payload": {"results": results}}
+
+    def _handle(
+        self, msg: Dict[str, Any], app: Optional[TournamentDraft], checkpoint: Optional[Callable[[], None]] = None
+    ) -> Dict[str, Any]:
         msg_type = msg.get("type")
         request_id = msg.get("request_id")
+        session_id = self.session_id(msg)
 
         try:
             if msg_type == "ping":
-                return {"request_id": request_id, "ok": True, "type": "pong", "payload": {"status": "ok"}}
+                return {
+                    "request_id": request_id,
+                    "ok": True,
+                    "type": "pong",
+                    "payload": {
+                        "status": "ok",
+                        "prediction_cache": self.app.prediction_cache.stats(),
+                        "suggestion_cache": self.suggestions.stats(),
+                        "sessions": len(self.sessions),
+                    },
+                }
+
+            if msg_type == "close_session":
+                closed = session_id != DEFAULT_SESSION and self.sessions.pop(session_id, None) is not None
+                if closed:
+                    self.initialized.discard(session_id)
+                return {"request_id": request_id, "ok": True, "type": "close_session_result", "payload": {"closed": closed}}
+
+            # A fork passed in was already checked by fork_session.
+            forked = app is not None
+            if app is None:
+                app = self.session(session_id, create=msg_type in SESSION_SETUP_TYPES)
 
             if msg_type == "init":
                 config = msg.get("config") or {}
                 mode = str(config.get("mode", "NORMAL"))
                 total_games = int(config.get("numGames", 1))
 
-                self.app.configure_series(mode, total_games)
+                app.configure_series(mode, total_games)
 
                 # Team names are provided by the frontend; roster is loaded from DB
                 blue_team = config.get("blueTeam")
                 red_team = config.get("redTeam")
 
                 if blue_team:
-                    self.app.teams["BLUE"]["name"] = str(blue_team)
+                    app.teams["BLUE"]["name"] = str(blue_team)
                 if red_team:
-                    self.app.teams["RED"]["name"] = str(red_team)
+                    app.teams["RED"]["name"] = str(red_team)
 
                 # Auto-roster load (keeps existing SQL logic)
                 if blue_team:
-                    self.app.set_roster_auto("BLUE", str(blue_team))
+                    app.set_roster_auto("BLUE", str(blue_team))
                 if red_team:
-                    self.app.set_roster_auto("RED", str(red_team))
+                    app.set_roster_auto("RED", str(red_team))
 
-                self.initialized = True
-                wr = self.app.predict_live_winrate()
+                self.initialized.add(session_id)
+                wr = app.predict_live_winrate()
                 return {
                     "request_id": request_id,
                     "ok": True,
                     "type": "init_result",
                     "payload": {
-                        "mode": self.app.series_config["mode"],
-                        "game": self.app.series_config["current_game"],
-                        "total_games": self.app.series_config["total_games"],
+                        "mode": app.series_config["mode"],
+                        "game": app.series_config["current_game"],
+                        "total_games": app.series_config["total_games"],
                         "blue_winrate": wr["blue"],
                         "red_winrate": wr["red"],
                         "teams": {
-                            "BLUE": self.app.teams["BLUE"],
-                            "RED": self.app.teams["RED"],
+                            "BLUE": app.teams["BLUE"],
+                            "RED": app.teams["RED"],
                         },
                     },
                 }
 
-            if not self.initialized and msg_type not in ("configure_series", "set_team", "roster"):
+            if not forked and session_id not in self.initialized and msg_type not in SESSION_SETUP_TYPES:
                 return {"request_id": request_id, "ok": False, "type": "error", "error": "ML not initialized"}
 
             if msg_type == "configure_series":
                 mode = str(msg.get("mode", "NORMAL"))
                 total_games = int(msg.get("total_games", 1))
-                self.app.configure_series(mode, total_games)
-                self.initialized = True
+                app.configure_series(mode, total_games)
+                self.initialized.add(session_id)
                 return {
                     "request_id": request_id,
                     "ok": True,
                     "type": "configure_series_result",
                     "payload": {
-                        "mode": self.app.series_config["mode"],
-                        "game": self.app.series_config["current_game"],
-                        "total_games": self.app.series_config["total_games"],
+                        "mode": app.series_config["mode"],
+                        "game": app.series_config["current_game"],
+                        "total_games": app.series_config["total_games"],
                     },
                 }
 
@@ -107,19 +291,19 @@ class MlServer:
                 name = str(msg.get("name", ""))
                 if side not in ("BLUE", "RED"):
                     return {"request_id": request_id, "ok": False, "type": "error", "error": "Invalid side"}
-                self.app.teams[side]["name"] = name
+                app.teams[side]["name"] = name
                 return {"request_id": request_id, "ok": True, "type": "set_team_result", "payload": {"side": side, "name": name}}
 
             if msg_type == "roster":
                 side = str(msg.get("side", "")).upper()
                 team = str(msg.get("team", ""))
-                self.app.set_roster_auto(side, team)
-                return {"request_id": request_id, "ok": True, "type": "roster_result", "payload": {"side": side, "team": team, "players": self.app.teams[side]["players"]}}
+                app.set_roster_auto(side, team)
+                return {"request_id": request_id, "ok": True, "type": "roster_result", "payload": {"side": side, "team": team, "players": app.teams[side]["players"]}}
 
             if msg_type == "ban":
                 champ = str(msg.get("champion", ""))
-                self.app.add_ban(champ)
-                wr = self.app.predict_live_winrate()
+                app.add_ban(champ)
+                wr = app.predict_live_winrate()
                 return {
                     "request_id": request_id,
                     "ok": True,
@@ -130,8 +314,8 @@ class MlServer:
             if msg_type == "pick":
                 side = str(msg.get("side", "")).upper()
                 champ = str(msg.get("champion", ""))
-                self.app.add_pick(side, champ)
-                wr = self.app.predict_live_winrate()
+                app.add_pick(side, champ)
+                wr = app.predict_live_winrate()
                 return {
                     "request_id": request_id,
                     "ok": True,
@@ -143,81 +327,740 @@ class MlServer:
                 blue_picks = msg.get("blue_picks") or []
                 red_picks = msg.get("red_picks") or []
                 bans = msg.get("bans") or []
-                self.app.reset_game_board()
-
-                for c in bans:
-                    self.app.add_ban(str(c))
-                for c in blue_picks:
-                    self.app.add_pick("BLUE", str(c))
-                for c in red_picks:
-                    self.app.add_pick("RED", str(c))
+                # Only the difference to the current board is applied (a resync is a no-op).
+                changed = app.sync_board(
+                    [str(c) for c in blue_picks], [str(c) for c in red_picks], [str(c) for c in bans]
+                )
 
-                wr = self.app.predict_live_winrate()
+                wr = app.predict_live_winrate()
                 return {
                     "request_id": request_id,
                     "ok": True,
                     "type": "sync_state_result",
                     "payload": {
-                        "blue_picks": self.app.blue_picks,
-                        "red_picks": self.app.red_picks,
-                        "bans": self.app.bans,
+                        "blue_picks": app.blue_picks,
+                        "red_picks": app.red_picks,
+                        "bans": app.bans,
                         "blue_winrate": wr["blue"],
                         "red_winrate": wr["red"],
+                        "changed": changed,
                     },
                 }
 
             if msg_type == "next_game":
-                self.app.end_game()
-                wr = self.app.predict_live_winrate()
+                app.end_game()
+                wr = app.predict_live_winrate()
                 return {
                     "request_id": request_id,
                     "ok": True,
                     "type": "next_game_result",
                     "payload": {
-                        "game": self.app.series_config["current_game"],
-                        "total_games": self.app.series_config["total_games"],
+                        "game": app.series_config["current_game"],
+                        "total_games": app.series_config["total_games"],
                         "blue_winrate": wr["blue"],
                         "red_winrate": wr["red"],
                     },
                 }
 
-            if msg_type == "suggest":
-                target_side = str(msg.get("target_side", "BLUE")).upper()
-                is_ban_mode = bool(msg.get("is_ban_mode", False))
-                roles = msg.get("roles")
-                if roles is not None:
-                    roles = [str(r).upper() for r in roles]
+            if msg_type == "reload":
+                # Picks up retrained artifacts; cached predictions are dropped by the oracle.
+                what = str(msg.get("what", "model")).lower()
+                if what not in ("model", "features", "meta", "all"):
+                    return {"request_id": request_id, "ok": False, "type": "error", "error": f"Invalid reload target: {what}"}
+                # Data is shared: reload it once and point every session at the result.
+                if what in ("model", "all"):
+                    model_file = msg.get("model_file")
+                    self.app.reload_model(str(model_file) if model_file else None)
+                if what in ("features", "all"):
+                    self.app.reload_feature_store()
+                if what in ("meta", "all"):
+                    # e.g. switch to another event's draft_oracle_tournament_meta.parquet.
+                    meta_file = msg.get("meta_file")
+                    self.app.reload_tournament_meta(str(meta_file) if meta_file else None)
+                for other in self.sessions.values():
+                    if other is not self.app:
+                        other.adopt_data(self.app)
+                self.suggestions.clear()
+
+                wr = app.predict_live_winrate()
+                return {
+                    "request_id": request_id,
+                    "ok": True,
+                    "type": "reload_result",
+                    "payload": {"what": what, "blue_winrate": wr["blue"], "red_winrate": wr["red"]},
+                }
+
+            if msg_type == "winrate":
+                wr = app.predict_live_winrate()
+                return {
+                    "request_id": request_id,
+                    "ok": True,
+                    "type": "winrate_result",
+                    "payload": {"blue_winrate": wr["blue"], "red_winrate": wr["red"]},
+                }
 
-                payload = self.app.get_suggestions(target_side, is_ban_mode, roles=roles)
+            if msg_type == "suggest":
+                payload = self.suggest(app, self.suggest_params(msg), checkpoint)
                 return {"request_id": request_id, "ok": True, "type": "suggest_result", "payload": payload}
 
             return {"request_id": request_id, "ok": False, "type": "error", "error": f"Unknown type: {msg_type}"}
 
+        except Superseded:
+            return superseded_response(request_id)
         except Exception as e:
             _eprint("ML server error:", repr(e))
             return {"request_id": request_id, "ok": False, "type": "error", "error": str(e)}
 
 
-def main():
-    server = MlServer()
+# Message types that never change the draft. They run concurrently on worker threads,
+# each against a fork of the draft taken after every mutation that arrived before it.
+READ_ONLY_TYPES = ("ping", "suggest", "winrate")
 
-    # Read JSONL from stdin, write JSONL to stdout.
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
+# Message types MlServer handles that may change a draft; anything else is answered
+# with an error and touches nothing.
+MUTATION_TYPES = (
+    *SESSION_SETUP_TYPES,
+    "ban",
+    "pick",
+    "sync_state",
+    "next_game",
+    "reload",
+    "close_session",
+    "batch",
+)
+
+
+def _read_only_batch(msg: Dict[str, Any]) -> bool:
+    """A batch of reads on the batch's own session can run on one fork of it."""
+
+    subs = msg.get("messages")
+    if not isinstance(subs, list) or not subs:
+        return False
+    session_id = msg.get("session_id")
+    return all(
+        isinstance(sub, dict)
+        and sub.get("type") in READ_ONLY_TYPES
+        and sub.get("type") != "ping"
+        and sub.get("session_id", session_id) == session_id
+        for sub in subs
+    )
+
+
+# Mutations after which the next turn's suggestions are precomputed.
+SPECULATE_AFTER = ("pick", "ban", "sync_state")
+
+# Reads that are answered "superseded" once a later mutation changes their session's draft.
+SUPERSEDABLE_TYPES = ("suggest",)
+
+
+def _changes_board(msg: Dict[str, Any]) -> bool:
+    if msg.get("type") == "batch":
+        subs = msg.get("messages")
+        return isinstance(subs, list) and any(isinstance(sub, dict) and _changes_board(sub) for sub in subs)
+    return msg.get("type") in SPECULATE_AFTER
+
+
+def _no_op() -> None:
+    pass
+
+
+def _with_session(msg: Dict[str, Any], resp: Dict[str, Any]) -> Dict[str, Any]:
+    if "session_id" in msg:
+        resp["session_id"] = msg["session_id"]
+    return resp
+
+
+class ConcurrentMlServer:
+    """Schedules MlServer.handle calls over threads.
+
+    Mutations (init, picks, bans, sync_state, reload, ...) of every session run one
+    at a time in arrival order on a single state thread. A read-only request first
+    forks its session's draft on that same thread, so it sees every earlier
+    mutation and none of the later ones, then runs on the worker pool. Responses complete out of order and
+    are matched by request_id. A batch counts as a mutation unless it only reads.
+
+    With `coalesce`, work for an outdated draft is dropped under bursty input:
+    - a queued sync_state is skipped when a newer sync_state of the session arrived
+      right behind it (no other message of the session in between, unknown types
+      aside);
+    - a suggest is dropped once a later mutation has changed its session's draft
+      state (state_key), before it starts or at the next checkpoint of
+      get_suggestions. Unknown, failing and no-op messages change nothing and
+      supersede nothing.
+    Both are answered with a small "superseded" response, so the newest request
+    waits for at most one computation. Batches are never superseded.
+
+    With `speculate`, every pick/ban/sync_state that changes the session's draft
+    state (its state_key) also queues the suggestions for the next turn of the pro
+    draft order (with the session's last suggest options) on a background thread,
+    into the server's suggestion cache. That work is cancelled, also at the
+    checkpoints of a computation in progress, once the session's state_key moves on.
+    """
+
+    def __init__(self, server: MlServer, workers: int = 4, speculate: bool = True, coalesce: bool = True):
+        self.server = server
+        self.coalesce = coalesce
+        self._state = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ml-state")
+        self._workers = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ml-worker")
+        self._speculation = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ml-speculate") if speculate else None
+        # Per session, written on the event loop thread: the number of messages other
+        # than reads that arrived, the number of sync_state messages that arrived, and
+        # the last of those whose board a later message relies on.
+        self._arrived: Dict[str, int] = {}
+        self._last_sync: Dict[str, int] = {}
+        self._pinned: Dict[str, int] = {}
+        # Per session, written on the state thread: the number of those messages that
+        # ran and the state_key of its draft after the last one.
+        self._applied: Dict[str, int] = {}
+        self._state_keys: Dict[str, Tuple] = {}
+        # Per session: the options of its last suggest and its queued speculation.
+        self._suggest_options: Dict[str, SuggestParams] = {}
+        self._speculation_jobs: Dict[str, "Future[None]"] = {}
+
+    async def handle(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        # Every executor submission below happens before the first await, so the
+        # state thread sees requests in the order their tasks were created.
+        loop = asyncio.get_running_loop()
+        msg_type = msg.get("type")
+        self._remember_suggest_options(msg)
+        if msg_type == "ping":
+            return await loop.run_in_executor(self._workers, self.server.handle, msg)
+
+        session_id = self.server.session_id(msg)
+        if msg_type in READ_ONLY_TYPES or (msg_type == "batch" and _read_only_batch(msg)):
+            self._pin(session_id)
+            try:
+                view, key = await loop.run_in_executor(self._state, self._fork, msg)
+            except Exception as e:
+                return _with_session(msg, error_response(msg.get("request_id"), str(e)))
+
+            checkpoint: Optional[Callable[[], None]] = None
+            if self.coalesce and msg_type in SUPERSEDABLE_TYPES:
+
+                def checkpoint() -> None:
+                    if self._current_key_now(session_id) != key:
+                        raise Superseded()
+
+            return await loop.run_in_executor(self._workers, self.server.handle, msg, view, checkpoint)
+
+        for sid in self._sessions_of(msg):
+            self._arrived[sid] = self._arrived.get(sid, 0) + 1
+        sync = 0
+        if msg_type == "sync_state":
+            sync = self._last_sync[session_id] = self._last_sync.get(session_id, 0) + 1
+        elif msg_type in MUTATION_TYPES:
+            for sid in self._sessions_of(msg):
+                self._pin(sid)
+        return await loop.run_in_executor(self._state, self._handle_mutation, msg, sync)
+
+    def _pin(self, session_id: str) -> None:
+        """Keep the session's last sync_state from being skipped (event loop thread)."""
+
+        self._pinned[session_id] = self._last_sync.get(session_id, 0)
+
+    def _fork(self, msg: Dict[str, Any]) -> Tuple[TournamentDraft, Optional[Tuple]]:
+        """A fork of the message's session and its state_key (state thread only)."""
+
+        view = self.server.fork_session(msg)
+        return view, self._current_key(self.server.session_id(msg))
+
+    def _handle_mutation(self, msg: Dict[str, Any], sync: int) -> Dict[str, Any]:
+        """Run a mutation on the state thread; `sync` numbers a sync_state of the session (else 0)."""
+
+        session_id = self.server.session_id(msg)
+        sessions = self._sessions_of(msg)
+        for sid in sessions:
+            self._applied[sid] = self._applied.get(sid, 0) + 1
+        if (
+            self.coalesce
+            and sync
+            and self._last_sync.get(session_id, 0) > sync
+            and self._pinned.get(session_id, 0) < sync
+        ):
+            # A newer sync_state replaces the whole board and nothing queued needs this one.
+            return _with_session(msg, superseded_response(msg.get("request_id")))
+
+        before = [self._current_key(s) for s in sessions]
+
+        # Responses may reference the live draft (teams, debug_state, ...) and are
+        # serialized after later mutations ran, so detach them on the state thread.
+        resp = copy.deepcopy(self.server.handle(msg))
+
+        if msg.get("type") == "close_session":
+            self._last_sync.pop(session_id, None)
+            self._pinned.pop(session_id, None)
+            self._suggest_options.pop(session_id, None)
+            self._cancel_speculation(session_id)
+
+        for sid, old in zip(sessions, before):
+            app = self.server.sessions.get(sid)
+            if app is None:
+                self._state_keys.pop(sid, None)
+                continue
+            key = app.state_key()
+            if key == old:
+                continue
+            self._state_keys[sid] = key
+            if self._speculation is not None and _changes_board(msg):
+                self._speculate(sid, key)
+        return resp
+
+    def _sessions_of(self, msg: Dict[str, Any]) -> List[str]:
+        """Sessions a mutation may change: its own and those named by its batch entries."""
+
+        session_ids = [self.server.session_id(msg)]
+        subs = msg.get("messages") if msg.get("type") == "batch" else None
+        for sub in subs if isinstance(subs, list) else ():
+            if isinstance(sub, dict) and "session_id" in sub:
+                session_ids.append(self.server.session_id(sub))
+        return list(dict.fromkeys(session_ids))
+
+    def _current_key(self, session_id: str) -> Optional[Tuple]:
+        """The session's state_key as of the last mutation (state thread only); None
+        for an unknown session."""
+
+        key = self._state_keys.get(session_id)
+        if key is None:
+            app = self.server.sessions.get(session_id)
+            if app is not None:
+                key = self._state_keys[session_id] = app.state_key()
+        return key
+
+    def _current_key_now(self, session_id: str) -> Optional[Tuple]:
+        """The session's state_key once every message of it that has arrived ran (worker
+        and speculation threads; waits for the state thread if some are still queued)."""
+
+        if self._arrived.get(session_id, 0) != self._applied.get(session_id, 0):
+            self._state.submit(_no_op).result()
+        return self._state_keys.get(session_id)
+
+    def _remember_suggest_options(self, msg: Dict[str, Any]) -> None:
+        subs = msg.get("messages") if msg.get("type") == "batch" else [msg]
+        for sub in subs if isinstance(subs, list) else ():
+            if isinstance(sub, dict) and sub.get("type") == "suggest":
+                session_id = self.server.session_id(sub if "session_id" in sub else msg)
+                self._suggest_options[session_id] = self.server.suggest_params(sub)
+
+    def _speculate(self, session_id: str, key: Tuple) -> None:
+        """Queue the suggestions for the session's next turn, in draft state `key`
+        (state thread only)."""
+
+        self._cancel_speculation(session_id)
+        app = self.server.sessions.get(session_id)
+        if app is None or session_id not in self.server.initialized:
+            return
+        turn = app.next_turn()
+        if turn is None:
+            return
+        side, is_ban = turn
+        # Ban suggestions analyse the opponent of the banning side (as the clients ask).
+        target = ("RED" if side == "BLUE" else "BLUE") if is_ban else side
+        _, _, roles, what_if, notes = self._suggest_options.get(session_id, ("", False, None, False, True))
+        params: SuggestParams = (target, is_ban, roles, what_if, notes)
+
+        def is_current() -> bool:
+            return self._current_key_now(session_id) == key
+
+        self._speculation_jobs[session_id] = self._speculation.submit(
+            self.server.speculate, app.fork(), params, is_current
+        )
+
+    def _cancel_speculation(self, session_id: str) -> None:
+        job = self._speculation_jobs.pop(session_id, None)
+        if job is not None and job.cancel():
+            self.server.suggestions.cancelled()
+
+    def shutdown(self) -> None:
+        if self._speculation is not None:
+            self._speculation.shutdown(wait=True, cancel_futures=True)
+        self._workers.shutdown(wait=True)
+        self._state.shutdown(wait=True)
+        _eprint(f"ML server suggestion cache: {self.server.suggestions.stats()}")
+
+
+def _decode(framing: JsonLines, data: bytes, reply: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
+    """The message in `data`; an undecodable frame is answered through `reply` and yields None."""
+
+    try:
+        msg = framing.loads(data)
+    except Exception as e:
+        _eprint("Invalid message:", data[:200])
+        reply(error_response(None, f"Invalid {framing.name}: {e}"))
+        return None
+    if not isinstance(msg, dict):
+        reply(error_response(None, "Message must be an object"))
+        return None
+    return msg
+
+
+async def serve_stream(
+    server: ConcurrentMlServer,
+    read: Callable[[JsonLines], Awaitable[Optional[bytes]]],
+    write: Callable[[bytes], None],
+) -> None:
+    """Message loop of one stream client (stdin/stdout or a socket connection).
+
+    `read(framing)` returns the next frame (None at the end of the stream) and
+    `write` sends one encoded frame. Messages are read continuously and each
+    response is written as soon as it is ready. An init asking for a framing is
+    answered before anything else is read; both directions then switch (see
+    ml_framing).
+    """
+
+    loop = asyncio.get_running_loop()
+    framing = JSON_LINES
+    pending: Set["asyncio.Task[None]"] = set()
+
+    def reply(resp: Dict[str, Any]) -> None:
+        # Called on the event loop thread only, so frames never interleave.
+        write(framing.encode(resp))
+
+    async def run(msg: Dict[str, Any]) -> None:
+        reply(await server.handle(msg))
+
+    while True:
         try:
-            msg = json.loads(line)
-        except Exception as e:
-            _eprint("Invalid JSON:", line)
-            out = {"request_id": None, "ok": False, "type": "error", "error": f"Invalid JSON: {e}"}
-            sys.stdout.write(json.dumps(out) + "\n")
-            sys.stdout.flush()
+            data = await read(framing)
+        except ValueError:
+            # Oversized line/frame: the stream cannot be resynchronised.
+            reply(error_response(None, "Message too large"))
+            break
+        if data is None:
+            break
+        if not data:
+            continue
+        msg = _decode(framing, data, reply)
+        if msg is None:
+            continue
+        if msg.get("type") == "init" and "framing" in msg:
+            resp = await server.handle(msg)
+            new_framing = negotiate(framing, msg, resp)
+            reply(resp)
+            framing = new_framing
             continue
+        task = loop.create_task(run(msg))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    if pending:
+        await asyncio.gather(*pending)
+
 
+async def serve_stdio(server: ConcurrentMlServer) -> None:
+    """Serve the client on stdin/stdout."""
+
+    loop = asyncio.get_running_loop()
+    # Blocking reads on a thread: works for pipes on every platform (incl. Windows).
+    stdin = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ml-stdin")
+
+    async def read(framing: JsonLines) -> Optional[bytes]:
+        return await loop.run_in_executor(stdin, framing.read_blocking, sys.stdin.buffer)
+
+    def write(frame: bytes) -> None:
+        sys.stdout.buffer.write(frame)
+        sys.stdout.buffer.flush()
+
+    try:
+        await serve_stream(server, read, write)
+    finally:
+        stdin.shutdown(wait=False)
+
+
+def serve_sequential(server: MlServer) -> None:
+    # One message at a time, responses in request order.
+    framing = JSON_LINES
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+
+    def reply(resp: Dict[str, Any]) -> None:
+        stdout.write(framing.encode(resp))
+        stdout.flush()
+
+    while True:
+        try:
+            data = framing.read_blocking(stdin)
+        except ValueError:
+            reply(error_response(None, "Message too large"))
+            break
+        if data is None:
+            break
+        if not data:
+            continue
+        msg = _decode(framing, data, reply)
+        if msg is None:
+            continue
         resp = server.handle(msg)
-        sys.stdout.write(json.dumps(resp) + "\n")
-        sys.stdout.flush()
+        if msg.get("type") == "init" and "framing" in msg:
+            new_framing = negotiate(framing, msg, resp)
+            reply(resp)
+            framing = new_framing
+        else:
+            reply(resp)
+
+
+# --- LOCAL TRANSPORTS ---
+# Besides stdin/stdout (owned by the Tauri sidecar), the server can listen on a Unix
+# domain socket (ATOMGG_SOCKET=<path>) and/or a localhost HTTP port
+# (ATOMGG_HTTP_PORT=<port>) so several local clients share one warm process. Every
+# transport carries the same messages as MlServer.handle and feeds the same
+# ConcurrentMlServer; clients keep their drafts apart with session_id.
+
+
+async def serve_socket_connection(
+    server: ConcurrentMlServer, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """One socket client speaking the stdin protocol (framing negotiation included).
+
+    The connection stays open for any number of messages; like stdin, responses are
+    written as soon as they are ready and matched by request_id.
+    """
+
+    async def read(framing: JsonLines) -> Optional[bytes]:
+        # Push out finished responses before waiting for more input.
+        await writer.drain()
+        return await framing.read(reader)
+
+    def write(frame: bytes) -> None:
+        if not writer.is_closing():
+            writer.write(frame)
+
+    try:
+        await serve_stream(server, read, write)
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+_HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    415: "Unsupported Media Type",
+}
+
+
+def _http_response(status: int, body: Dict[str, Any], keep_alive: bool) -> bytes:
+    data = JSON_LINES.serialize(body)
+    head = (
+        f"HTTP/1.1 {status} {_HTTP_REASONS[status]}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    return head.encode("ascii") + data
+
+
+def _names_files(msg: Dict[str, Any]) -> bool:
+    """Whether `msg` (or a message of its batch) is a reload naming a model or meta file."""
+
+    subs = msg.get("messages") if msg.get("type") == "batch" else [msg]
+    return any(
+        isinstance(sub, dict) and sub.get("type") == "reload" and ("model_file" in sub or "meta_file" in sub)
+        for sub in (subs if isinstance(subs, list) else ())
+    )
+
+
+async def serve_http_connection(
+    server: ConcurrentMlServer, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Minimal HTTP/1.1 endpoint: POST a message as the JSON body, get its response back.
+
+    Connections are persistent (keep-alive) unless the client asks otherwise, and
+    requests on one connection are answered in order. `GET /ping` is a shortcut for
+    {"type": "ping"}. Chunked request bodies are not supported.
+
+    There is no authentication, so browsers are kept out: the Host header must name
+    the loopback address or localhost with this port (DNS rebinding), bodies must be
+    sent as application/json (no CORS "simple" text/plain POSTs) and `reload` may not
+    name model or meta files.
+    """
+
+    port = writer.get_extra_info("sockname")[1]
+    allowed_hosts = {f"127.0.0.1:{port}", f"localhost:{port}"}
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            parts = request_line.decode("latin-1").split()
+            if len(parts) != 3:
+                writer.write(_http_response(400, {"ok": False, "type": "error", "error": "Bad request line"}, False))
+                break
+            method, target, version = parts
+
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+            if "chunked" in headers.get("transfer-encoding", "").lower():
+                writer.write(_http_response(400, {"ok": False, "type": "error", "error": "Chunked bodies are not supported"}, False))
+                break
+            try:
+                length = int(headers.get("content-length", "0"))
+            except ValueError:
+                length = -1
+            if length < 0 or length > MAX_MESSAGE_BYTES:
+                writer.write(_http_response(413, {"ok": False, "type": "error", "error": "Bad Content-Length"}, False))
+                break
+            body = await reader.readexactly(length)
+
+            path = target.split("?", 1)[0]
+            content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+            if headers.get("host", "").lower() not in allowed_hosts:
+                status, resp = 403, {"ok": False, "type": "error", "error": "Host not allowed"}
+            elif method == "GET" and path == "/ping":
+                status, resp = 200, await server.handle({"type": "ping"})
+            elif method != "POST":
+                status, resp = 405, {"ok": False, "type": "error", "error": f"Method not allowed: {method}"}
+            elif path != "/":
+                status, resp = 404, {"ok": False, "type": "error", "error": f"Not found: {path}"}
+            elif content_type != "application/json":
+                status, resp = 415, {"ok": False, "type": "error", "error": "Content-Type must be application/json"}
+            else:
+                try:
+                    msg = JSON_LINES.loads(body)
+                except ValueError as e:
+                    status, resp = 400, error_response(None, f"Invalid JSON: {e}")
+                else:
+                    if not isinstance(msg, dict):
+                        status, resp = 400, error_response(None, "Message must be an object")
+                    elif _names_files(msg):
+                        status, resp = 403, error_response(msg.get("request_id"), "reload files cannot be chosen over HTTP")
+                    else:
+                        status, resp = 200, await server.handle(msg)
+
+            writer.write(_http_response(status, resp, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def _is_stale_socket(path: str) -> bool:
+    """Whether `path` is a Unix socket nobody listens on (left behind by a dead server)."""
+
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return False
+    except OSError:
+        return False
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+    return False
+
+
+async def serve(
+    server: ConcurrentMlServer,
+    stdio: bool = True,
+    socket_path: Optional[str] = None,
+    http_port: Optional[int] = None,
+) -> None:
+    """Serve stdin and any configured listeners.
+
+    Without listeners the server stops at the end of stdin, as before. With listeners
+    it keeps running after stdin closes, until the process is terminated.
+    """
+
+    listeners: List[asyncio.AbstractServer] = []
+    own_socket: Optional[int] = None
+    if socket_path or http_port is not None:
+        # Stop cleanly on SIGTERM so the socket file is removed.
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except (NotImplementedError, AttributeError):
+            pass
+    try:
+        if socket_path:
+            if not hasattr(asyncio, "start_unix_server"):
+                raise RuntimeError("Unix domain sockets are not supported on this platform")
+            # A socket file left behind by a previous run would make bind() fail.
+            if os.path.lexists(socket_path):
+                if not _is_stale_socket(socket_path):
+                    raise RuntimeError(f"{socket_path} is in use or not a socket")
+                os.remove(socket_path)
+            listeners.append(
+                await asyncio.start_unix_server(
+                    lambda r, w: serve_socket_connection(server, r, w), path=socket_path, limit=MAX_MESSAGE_BYTES
+                )
+            )
+            own_socket = os.stat(socket_path).st_ino
+            _eprint(f"ML server listening on unix:{socket_path}")
+        if http_port is not None:
+            # Localhost only: the protocol has no authentication.
+            http = await asyncio.start_server(
+                lambda r, w: serve_http_connection(server, r, w), host="127.0.0.1", port=http_port, limit=MAX_MESSAGE_BYTES
+            )
+            listeners.append(http)
+            port = http.sockets[0].getsockname()[1]
+            _eprint(f"ML server listening on http://127.0.0.1:{port}/")
+
+        if stdio:
+            await serve_stdio(server)
+        if listeners:
+            await asyncio.gather(*(listener.serve_forever() for listener in listeners))
+    finally:
+        for listener in listeners:
+            listener.close()
+        # Only our own socket: another server may have taken the path over since.
+        if own_socket is not None and _is_stale_socket(socket_path):
+            try:
+                if os.stat(socket_path).st_ino == own_socket:
+                    os.remove(socket_path)
+            except OSError:
+                pass
+
+
+def main():
+    server = MlServer()
+
+    # Read JSONL from stdin, write JSONL to stdout. ATOMGG_WORKERS=0 keeps the
+    # strictly sequential loop (stdin only).
+    workers = int(os.environ.get("ATOMGG_WORKERS", "4"))
+    socket_path = os.environ.get("ATOMGG_SOCKET") or None
+    http_port = os.environ.get("ATOMGG_HTTP_PORT") or None
+    # ATOMGG_STDIO=0 ignores stdin, for a server started only to listen.
+    stdio = os.environ.get("ATOMGG_STDIO", "1") != "0"
+
+    if workers <= 0:
+        if socket_path or http_port:
+            _eprint("ML server: ATOMGG_SOCKET/ATOMGG_HTTP_PORT need ATOMGG_WORKERS > 0; serving stdin only")
+        serve_sequential(server)
+        return
+
+    # ATOMGG_SPECULATE=0 disables precomputing the next turn's suggestions.
+    speculate = os.environ.get("ATOMGG_SPECULATE", "1") != "0"
+    # ATOMGG_COALESCE=0 answers every queued request, however outdated.
+    coalesce = os.environ.get("ATOMGG_COALESCE", "1") != "0"
+    concurrent = ConcurrentMlServer(server, workers, speculate, coalesce)
+    try:
+        asyncio.run(serve(concurrent, stdio, socket_path, int(http_port) if http_port else None))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        concurrent.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Set
+
+
+# Champion select leaves 20-30s between turns while the oracle sits idle. After each
+# board change ml_server precomputes the suggestions the next turn of the pro draft
+# order will ask for (see ConcurrentMlServer) and keeps them here, keyed by the draft
+# state and the request parameters, so the following `suggest` is a memory lookup.
+
+
+class Superseded(Exception):
+    """Raised (from a get_suggestions checkpoint) once a newer draft state made the work pointless."""
+
+
+def superseded_response(request_id: Any) -> Dict[str, Any]:
+    return {"request_id": request_id, "ok": False, "type": "superseded", "error": "Superseded by a newer draft state"}
+
+
+class SuggestionCache:
+    """LRU of suggest payloads keyed by (draft state, request parameters).
+
+    A payload that is still being computed, speculatively or for a request, is
+    pending: a request for the same key waits for that computation instead of
+    starting its own. Owners must `clear()` it whenever loaded data changes. Safe to
+    share between threads; cached payloads are shared and must not be mutated.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = max(0, int(maxsize))
+        self._data: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._pending: Dict[Hashable, "Future[Dict[str, Any]]"] = {}
+        # Speculative entries no request has asked for yet.
+        self._unused: Set[Hashable] = set()
+        self._lock = threading.Lock()
+        # Bumped by clear(): results computed from older data are not stored.
+        self._epoch = 0
+        self.hits = 0
+        self.pending_hits = 0
+        self.misses = 0
+        self.speculated = 0
+        self.speculation_used = 0
+        self.speculation_cancelled = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        while True:
+            with self._lock:
+                value = self._data.get(key)
+                if value is not None:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    self._mark_used(key)
+                    return value
+                future = self._pending.get(key)
+                if future is None:
+                    future = self._pending[key] = Future()
+                    self.misses += 1
+                    break
+                self.pending_hits += 1
+
+            try:
+                value = future.result()
+            except Superseded:
+                # The computation we waited for was abandoned; this request still wants it.
+                with self._lock:
+                    self.pending_hits -= 1
+                continue
+            with self._lock:
+                self._mark_used(key)
+            return value
+        return self._compute(key, future, compute, speculative=False)
+
+    def speculate(self, key: Hashable, compute: Callable[[], Dict[str, Any]], is_current: Callable[[], bool]) -> None:
+        """Compute `key` on the calling thread unless it is cached, pending or no longer
+        current (a newer draft state arrived before the work started). `is_current` may
+        block; it is never called with the lock held."""
+
+        with self._lock:
+            if key in self._data or key in self._pending:
+                return
+        if not is_current():
+            self.cancelled()
+            return
+        with self._lock:
+            if key in self._data or key in self._pending:
+                return
+            future = self._pending[key] = Future()
+        try:
+            self._compute(key, future, compute, speculative=True)
+        except Superseded:
+            self.cancelled()
+        except Exception:
+            # A request for this key computes (and reports) the error itself.
+            pass
+
+    def cancelled(self) -> None:
+        """Count a speculation dropped before it reached the cache."""
+
+        with self._lock:
+            self.speculation_cancelled += 1
+
+    def _compute(
+        self, key: Hashable, future: "Future[Dict[str, Any]]", compute: Callable[[], Dict[str, Any]], speculative: bool
+    ) -> Dict[str, Any]:
+        epoch = self._epoch
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._pending.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._pending.pop(key, None)
+            if self.maxsize > 0 and epoch == self._epoch:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    old, _ = self._data.popitem(last=False)
+                    self._unused.discard(old)
+            if speculative:
+                self.speculated += 1
+                if key in self._data:
+                    self._unused.add(key)
+        future.set_result(value)
+        return value
+
+    def _mark_used(self, key: Hashable) -> None:
+        if key in self._unused:
+            self._unused.discard(key)
+            self.speculation_used += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._unused.clear()
+            self._epoch += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.pending_hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "pending_hits": self.pending_hits,
+            "misses": self.misses,
+            "hit_rate": ((self.hits + self.pending_hits) / total) if total else 0.0,
+            "speculated": self.speculated,
+            "speculation_used": self.speculation_used,
+            "speculation_cancelled": self.speculation_cancelled,
+        }
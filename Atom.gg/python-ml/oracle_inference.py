@@ -0,0 +1,318 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+import xgboost as xgb
+
+
+# Inference backends for the Draft Oracle booster.
+#
+# All backends take float32 model rows of shape (B, n_features) (as produced by
+# FeaturePlan.build) and return the win probability of each row as float32:
+# - "dmatrix": Booster.predict on a fresh DMatrix (the original path);
+# - "inplace": Booster.inplace_predict straight from the row buffer, no DMatrix;
+# - "numpy":   the tree ensemble exported from the booster JSON and evaluated with
+#              a few NumPy gathers per tree level (no call into xgboost at all);
+# - "auto":    "numpy" for batches of up to NUMPY_MAX_ROWS rows, "inplace" above.
+#
+# bench_inference on a 300-tree, depth-6 booster: a single row takes ~1240 us with
+# "dmatrix", ~490 us with "inplace" (xgboost's per-call overhead, not the trees) and
+# ~70 us with "numpy"; 750 rows take 11 ms, 4.7 ms and 15.5 ms. The NumPy evaluator
+# walks every (row, tree) pair level by level, so it loses from a few dozen rows on,
+# hence "auto" as the default: live win rates and small what-if batches take the
+# NumPy path, SoloQ-sized what-if batches stay in xgboost.
+#
+# The numpy backend is only used after it has been checked against Booster.predict;
+# if it cannot represent the model (or disagrees) we fall back to "inplace".
+BACKENDS = ("dmatrix", "inplace", "numpy", "auto")
+DEFAULT_BACKEND = "auto"
+
+# Largest batch "auto" sends to the NumPy evaluator (measured crossover: 32-64 rows).
+NUMPY_MAX_ROWS = 32
+
+# Max abs difference in win probability tolerated between a backend and Booster.predict.
+PARITY_TOLERANCE = 1e-5
+
+
+class BoosterPredictor:
+    backend = "dmatrix"
+
+    def __init__(self, model: xgb.Booster, feature_names: Sequence[str]):
+        self.model = model
+        self.feature_names = list(feature_names)
+
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        return self.model.predict(xgb.DMatrix(rows, feature_names=self.feature_names))
+
+
+class InplacePredictor(BoosterPredictor):
+    backend = "inplace"
+
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        # Rows come from FeaturePlan in model column order; skip the name check.
+        return self.model.inplace_predict(rows, validate_features=False)
+
+
+class TreeEnsemble:
+    """Flattened gbtree ensemble evaluated with NumPy.
+
+    Every tree's nodes are concatenated into shared arrays. Leaves point to
+    themselves, so evaluating a batch is `depth` rounds of "gather the split
+    feature, compare, step to a child" over all (row, tree) pairs at once.
+    Missing values (NaN) follow each split's default direction, as in xgboost.
+    """
+
+    SIGMOID_OBJECTIVES = ("binary:logistic", "reg:logistic")
+    IDENTITY_OBJECTIVES = ("reg:squarederror", "reg:linear")
+
+    def __init__(
+        self,
+        roots: np.ndarray,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        default_left: np.ndarray,
+        value: np.ndarray,
+        depth: int,
+        base_margin: float,
+        sigmoid: bool,
+    ):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        # children[2 * node] is the left child, children[2 * node + 1] the right one.
+        self.children = np.stack([left, right], axis=1).ravel()
+        self.default_left = default_left
+        self.value = value
+        self.depth = depth
+        self.base_margin = np.float32(base_margin)
+        self.sigmoid = sigmoid
+
+    @classmethod
+    def from_booster(cls, model: xgb.Booster) -> "TreeEnsemble":
+        return cls.from_json(json.loads(model.save_raw(raw_format="json")))
+
+    @classmethod
+    def from_json(cls, doc: Dict[str, Any]) -> "TreeEnsemble":
+        learner = doc["learner"]
+        booster = learner["gradient_booster"]
+        if booster.get("name") != "gbtree":
+            raise ValueError(f"unsupported booster: {booster.get('name')}")
+
+        objective = learner["objective"]["name"]
+        if objective not in cls.SIGMOID_OBJECTIVES + cls.IDENTITY_OBJECTIVES:
+            raise ValueError(f"unsupported objective: {objective}")
+        params = learner["learner_model_param"]
+        if int(params.get("num_class", "0")) > 1 or int(params.get("num_target", "1")) > 1:
+            raise ValueError("multi-output models are not supported")
+
+        # base_score is stored in probability space ("0.5" or "[5E-1]" depending on version).
+        base_score = float(str(params["base_score"]).strip("[]").split(",")[0])
+        sigmoid = objective in cls.SIGMOID_OBJECTIVES
+        base_margin = float(np.log(base_score / (1.0 - base_score))) if sigmoid else base_score
+
+        roots: List[int] = []
+        feature: List[np.ndarray] = []
+        threshold: List[np.ndarray] = []
+        left: List[np.ndarray] = []
+        right: List[np.ndarray] = []
+        default_left: List[np.ndarray] = []
+        value: List[np.ndarray] = []
+        depth = 0
+        offset = 0
+        for tree in booster["model"]["trees"]:
+            if any(int(t) != 0 for t in tree.get("split_type", [])):
+                raise ValueError("categorical splits are not supported")
+
+            lc = np.asarray(tree["left_children"], dtype=np.int64)
+            rc = np.asarray(tree["right_children"], dtype=np.int64)
+            cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+            n = len(lc)
+            own = np.arange(n, dtype=np.int64)
+            leaf = lc == -1
+
+            roots.append(offset)
+            feature.append(np.where(leaf, 0, np.asarray(tree["split_indices"], dtype=np.int64)))
+            threshold.append(np.where(leaf, np.float32(0.0), cond))
+            left.append(np.where(leaf, own, lc) + offset)
+            right.append(np.where(leaf, own, rc) + offset)
+            default_left.append(np.asarray(tree["default_left"], dtype=bool))
+            # Leaf values live in split_conditions for leaf nodes.
+            value.append(np.where(leaf, cond, np.float32(0.0)))
+            depth = max(depth, cls._tree_depth(lc, rc))
+            offset += n
+
+        return cls(
+            roots=np.asarray(roots, dtype=np.int64),
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold).astype(np.float32),
+            left=np.concatenate(left),
+            right=np.concatenate(right),
+            default_left=np.concatenate(default_left),
+            value=np.concatenate(value).astype(np.float32),
+            depth=depth,
+            base_margin=base_margin,
+            sigmoid=sigmoid,
+        )
+
+    @staticmethod
+    def _tree_depth(lc: np.ndarray, rc: np.ndarray) -> int:
+        depth, level = 0, [0]
+        while True:
+            level = [c for n in level for c in (lc[n], rc[n]) if c != -1]
+            if not level:
+                return depth
+            depth += 1
+
+    def margin(self, rows: np.ndarray) -> np.ndarray:
+        x = np.asarray(rows, dtype=np.float32)
+        if np.isnan(x).any():
+            return self._margin_missing(x)
+
+        b, f = x.shape
+        flat = x.ravel()
+        node = np.broadcast_to(self.roots, (b, len(self.roots)))
+        row_base = (np.arange(b, dtype=np.int64) * f)[:, None] if b > 1 else 0
+        for _ in range(self.depth):
+            v = flat[row_base + self.feature[node]]
+            node = self.children[2 * node + (v >= self.threshold[node])]
+        return self.value[node].sum(axis=1, dtype=np.float32) + self.base_margin
+
+    def _margin_missing(self, x: np.ndarray) -> np.ndarray:
+        node = np.broadcast_to(self.roots, (x.shape[0], len(self.roots)))
+        for _ in range(self.depth):
+            v = np.take_along_axis(x, self.feature[node], axis=1)
+            go_left = np.where(np.isnan(v), self.default_left[node], v < self.threshold[node])
+            node = np.where(go_left, self.children[2 * node], self.children[2 * node + 1])
+        return self.value[node].sum(axis=1, dtype=np.float32) + self.base_margin
+
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        m = self.margin(rows)
+        if not self.sigmoid:
+            return m
+        return (1.0 / (1.0 + np.exp(-m))).astype(np.float32)
+
+
+class NumpyTreePredictor(BoosterPredictor):
+    backend = "numpy"
+
+    def __init__(self, model: xgb.Booster, feature_names: Sequence[str]):
+        super().__init__(model, feature_names)
+        self.ensemble = TreeEnsemble.from_booster(model)
+
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        return self.ensemble.predict(rows)
+
+
+class AutoPredictor(InplacePredictor):
+    backend = "auto"
+
+    def __init__(self, model: xgb.Booster, feature_names: Sequence[str]):
+        super().__init__(model, feature_names)
+        self.small = NumpyTreePredictor(model, feature_names)
+
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        if rows.shape[0] <= NUMPY_MAX_ROWS:
+            return self.small.predict(rows)
+        return super().predict(rows)
+
+
+_PREDICTORS = {"dmatrix": BoosterPredictor, "inplace": InplacePredictor, "numpy": NumpyTreePredictor, "auto": AutoPredictor}
+
+
+def parity_error(predictor: BoosterPredictor, rows: np.ndarray) -> float:
+    """Max abs difference between `predictor` and Booster.predict on `rows`."""
+
+    if isinstance(predictor, AutoPredictor):
+        # Check both paths on every row, whatever the batch size.
+        return max(parity_error(predictor.small, rows), parity_error(InplacePredictor(predictor.model, predictor.feature_names), rows))
+    ref = BoosterPredictor(predictor.model, predictor.feature_names).predict(rows)
+    return float(np.max(np.abs(predictor.predict(rows).astype(np.float64) - ref.astype(np.float64))))
+
+
+def make_predictor(
+    model: xgb.Booster,
+    feature_names: Sequence[str],
+    backend: str = DEFAULT_BACKEND,
+    probe_rows: Optional[np.ndarray] = None,
+    quiet: bool = True,
+) -> BoosterPredictor:
+    """Build the requested backend, falling back to "inplace" if it fails or disagrees.
+
+    `probe_rows` (float32, model column order) are used to validate non-reference
+    backends against Booster.predict before they are put in service.
+    """
+
+    if backend not in _PREDICTORS:
+        if not quiet:
+            print(f"   Unknown inference backend '{backend}', using '{DEFAULT_BACKEND}'")
+        backend = DEFAULT_BACKEND
+
+    for name in dict.fromkeys([backend, DEFAULT_BACKEND, "inplace", "dmatrix"]):
+        try:
+            predictor = _PREDICTORS[name](model, feature_names)
+            if name != "dmatrix" and probe_rows is not None and len(probe_rows):
+                err = parity_error(predictor, probe_rows)
+                if err > PARITY_TOLERANCE:
+                    raise ValueError(f"parity check failed (max abs diff {err:.2e})")
+            return predictor
+        except Exception as e:
+            if not quiet:
+                print(f"   Inference backend '{name}' unavailable: {e}")
+    return BoosterPredictor(model, feature_names)
+
+
+class PredictionCache:
+    """LRU of win probabilities keyed by a canonical draft signature.
+
+    The oracle keys it on the resolved role slots of both sides, so states that
+    only differ in bans (or are re-sent unchanged) are served without building a
+    model row. Owners must `clear()` (or replace) it whenever the model or features
+    change. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = max(0, int(maxsize))
+        self._data: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[float]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: float) -> None:
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
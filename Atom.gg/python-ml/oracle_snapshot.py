@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+# Derived lookup structures (feature lookup, synergy table, role map, ...) are
+# expensive to rebuild from the parquet artifacts on every process start. This
+# module persists them in a small on-disk cache keyed by the fingerprints of the
+# source files, so a warm start only has to unpickle them.
+#
+# Bump SNAPSHOT_VERSION whenever the layout of the cached objects changes.
+SNAPSHOT_VERSION = 7
+
+MANIFEST_NAME = "snapshot_manifest.json"
+
+
+def file_fingerprint(path: str, known: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Return size/mtime/sha256 for `path`.
+
+    If `known` describes the same size and mtime, its hash is reused so that an
+    unchanged file is never re-read.
+    """
+
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {"missing": True}
+
+    fp: Dict[str, Any] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if known and known.get("size") == fp["size"] and known.get("mtime_ns") == fp["mtime_ns"] and known.get("sha256"):
+        fp["sha256"] = known["sha256"]
+        return fp
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    fp["sha256"] = h.hexdigest()
+    return fp
+
+
+def _same_content(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    if a.get("missing") or b.get("missing"):
+        return bool(a.get("missing")) and bool(b.get("missing"))
+    return a.get("size") == b.get("size") and a.get("sha256") == b.get("sha256")
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class SnapshotStore:
+    """Versioned snapshot of derived structures keyed by source fingerprints.
+
+    Layout inside `cache_dir`:
+    - snapshot_manifest.json: version, source fingerprints and the snapshot key
+    - snapshot-<key>.pkl: pickled Python objects
+    - snapshot-<key>.<name>.npy: numpy arrays (loaded memory-mapped, read-only)
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+        self._manifest: Optional[Dict[str, Any]] = None
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def fingerprint(self, sources: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Fingerprint every source file (hashing only files whose size/mtime changed)."""
+
+        self._manifest = self._read_manifest()
+        known = (self._manifest or {}).get("sources", {})
+        return {name: file_fingerprint(path, known.get(name)) for name, path in sources.items()}
+
+    @staticmethod
+    def snapshot_key(fingerprints: Dict[str, Dict[str, Any]]) -> str:
+        h = hashlib.sha256(f"v{SNAPSHOT_VERSION}".encode())
+        for name in sorted(fingerprints):
+            fp = fingerprints[name]
+            h.update(f"{name}:{fp.get('size')}:{fp.get('sha256')}:{fp.get('missing', False)}".encode())
+        return h.hexdigest()[:16]
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, f"snapshot-{key}{suffix}")
+
+    def load(
+        self, fingerprints: Dict[str, Dict[str, Any]]
+    ) -> Optional[Tuple[Dict[str, Any], Dict[str, np.ndarray]]]:
+        """Return (objects, arrays) if a snapshot for exactly these sources exists."""
+
+        manifest = self._manifest if self._manifest is not None else self._read_manifest()
+        if not manifest or manifest.get("version") != SNAPSHOT_VERSION:
+            return None
+
+        cached_sources = manifest.get("sources", {})
+        if set(cached_sources) != set(fingerprints):
+            return None
+        if not all(_same_content(cached_sources[n], fingerprints[n]) for n in fingerprints):
+            return None
+
+        key = manifest.get("key", "")
+        try:
+            with open(self._path(key, ".pkl"), "rb") as f:
+                objects = pickle.load(f)
+            arrays = {
+                name: np.load(self._path(key, f".{name}.npy"), mmap_mode="r")
+                for name in manifest.get("arrays", [])
+            }
+        except Exception:
+            return None
+
+        # Content matched but mtimes moved (e.g. a fresh checkout): refresh the
+        # manifest so the next start can skip hashing again.
+        if cached_sources != fingerprints:
+            try:
+                self._write_manifest(key, fingerprints, list(arrays))
+            except OSError:
+                pass
+
+        return objects, arrays
+
+    def save(
+        self,
+        fingerprints: Dict[str, Dict[str, Any]],
+        objects: Dict[str, Any],
+        arrays: Optional[Dict[str, np.ndarray]] = None,
+    ) -> None:
+        arrays = arrays or {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        key = self.snapshot_key(fingerprints)
+
+        _atomic_write(self._path(key, ".pkl"), pickle.dumps(objects, protocol=pickle.HIGHEST_PROTOCOL))
+        for name, arr in arrays.items():
+            path = self._path(key, f".{name}.npy")
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, np.ascontiguousarray(arr))
+            os.replace(tmp, path)
+
+        self._write_manifest(key, fingerprints, list(arrays))
+        self._remove_stale(key)
+
+    def _write_manifest(self, key: str, fingerprints: Dict[str, Dict[str, Any]], array_names: list) -> None:
+        manifest = {"version": SNAPSHOT_VERSION, "key": key, "sources": fingerprints, "arrays": array_names}
+        _atomic_write(self.manifest_path, json.dumps(manifest, indent=2).encode("utf-8"))
+        self._manifest = manifest
+
+    def _remove_stale(self, key: str) -> None:
+        # Best effort: files may still be memory-mapped by another process (Windows).
+        keep = f"snapshot-{key}"
+        for name in os.listdir(self.cache_dir):
+            if name.startswith("snapshot-") and not name.startswith(keep):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
@@ -0,0 +1,436 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from candidate_scoring import lane_matchup, meta_bias, soloq_counter_bonus
+
+
+# Array-backed lookup tables used on the oracle's hot paths.
+#
+# Every table is indexed through a shared ChampionIndex. Unknown champions map to
+# index -1, and each table reserves its last row (and column) as a sentinel that
+# holds the table's default value, so a plain gather returns the right answer for
+# unknown ids without any branching.
+
+
+class ChampionIndex:
+    """Dense champion id -> row index mapping (unknown ids map to -1)."""
+
+    def __init__(self, champ_ids: Sequence[int]):
+        self.ids = np.asarray(champ_ids, dtype=np.int32)
+        size = int(self.ids.max()) + 1 if len(self.ids) else 1
+        self._pos = np.full(size, -1, dtype=np.int32)
+        self._pos[self.ids] = np.arange(len(self.ids), dtype=np.int32)
+
+    @classmethod
+    def from_ids(cls, *id_sets: Iterable[int]) -> "ChampionIndex":
+        ids = set()
+        for s in id_sets:
+            ids.update(int(i) for i in s if i is not None and int(i) >= 0)
+        return cls(sorted(ids))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def index_of(self, champ_id: Optional[int]) -> int:
+        if champ_id is None or champ_id < 0 or champ_id >= len(self._pos):
+            return -1
+        return int(self._pos[champ_id])
+
+    def indices(self, champ_ids: Sequence[int]) -> np.ndarray:
+        ids = np.asarray(champ_ids, dtype=np.int64)
+        out = np.full(ids.shape, -1, dtype=np.int32)
+        ok = (ids >= 0) & (ids < len(self._pos))
+        out[ok] = self._pos[ids[ok]]
+        return out
+
+
+def _last_occurrence(keys: np.ndarray) -> np.ndarray:
+    """Positions of the last occurrence of each distinct key (dict-assignment semantics)."""
+
+    _, first_in_reversed = np.unique(keys[::-1], return_index=True)
+    return len(keys) - 1 - first_in_reversed
+
+
+class SynergyMatrix:
+    """Symmetric champion x champion duo winrate matrix (float64, default 0.5).
+
+    Kept in float64: the values feed model features (syn_*, gap_syn_mid_jg) and a
+    float32 rounding of the duo winrate is enough to flip tree splits.
+    """
+
+    DEFAULT = 0.5
+
+    def __init__(self, index: ChampionIndex, values: np.ndarray, pairs: int):
+        self.index = index
+        # Shape (n + 1, n + 1); the last row/column is the 0.5 sentinel for unknown ids.
+        self.values = values
+        self.pairs = pairs
+
+    @classmethod
+    def from_pairs(
+        cls,
+        index: ChampionIndex,
+        left_ids: np.ndarray,
+        right_ids: np.ndarray,
+        winrates: np.ndarray,
+    ) -> "SynergyMatrix":
+        n = len(index)
+        values = np.full((n + 1, n + 1), cls.DEFAULT, dtype=np.float64)
+
+        a = index.indices(left_ids)
+        b = index.indices(right_ids)
+        ok = (a >= 0) & (b >= 0)
+        a, b, wr = a[ok], b[ok], np.asarray(winrates, dtype=np.float64)[ok]
+
+        # Both directions per row, in row order; later rows overwrite earlier ones.
+        rows = np.stack([a, b], axis=1).ravel()
+        cols = np.stack([b, a], axis=1).ravel()
+        vals = np.repeat(wr, 2)
+        keep = _last_occurrence(rows.astype(np.int64) * (n + 1) + cols)
+        values[rows[keep], cols[keep]] = vals[keep]
+
+        return cls(index, values, int(len(a)))
+
+    @classmethod
+    def empty(cls, index: ChampionIndex) -> "SynergyMatrix":
+        n = len(index)
+        return cls(index, np.full((n + 1, n + 1), cls.DEFAULT, dtype=np.float64), 0)
+
+    def __bool__(self) -> bool:
+        return self.pairs > 0
+
+    def pair(self, a_id: Optional[int], b_id: Optional[int]) -> float:
+        return float(self.values[self.index.index_of(a_id), self.index.index_of(b_id)])
+
+    def against(self, cand_ids: Sequence[int], ally_ids: Sequence[int]) -> np.ndarray:
+        """Synergy of every candidate with every ally, shape (len(cand_ids), len(ally_ids))."""
+
+        rows = self.index.indices(cand_ids)
+        cols = self.index.indices(ally_ids)
+        return self.values[np.ix_(rows, cols)]
+
+
+class FeatureTensor:
+    """Feature store compiled into a [champion, position, feature] float32 tensor.
+
+    Sentinels (all reachable with index -1):
+    - champion row -1 holds the per-position means, used for unknown champions and
+      for (champion, position) pairs missing from the store;
+    - position -1 and feature -1 are all zeros (unknown position / feature).
+    """
+
+    MEAN_POSITIONS = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY", ""]
+
+    def __init__(self, index: ChampionIndex, positions: List[str], features: List[str], values: np.ndarray):
+        self.index = index
+        self.positions = list(positions)
+        self.features = list(features)
+        self.position_index = {p: i for i, p in enumerate(self.positions)}
+        self.feature_index = {f: i for i, f in enumerate(self.features)}
+        # Shape (n_champions + 1, n_positions + 1, n_features + 1).
+        self.values = values
+
+    @property
+    def pos_means(self) -> np.ndarray:
+        """Per-position global means, shape (n_positions + 1, n_features + 1)."""
+
+        return self.values[-1]
+
+    @classmethod
+    def from_columns(
+        cls,
+        index: ChampionIndex,
+        champ_ids: np.ndarray,
+        positions: Sequence[str],
+        features: Dict[str, np.ndarray],
+        pos_means: Dict[str, Sequence[float]],
+    ) -> "FeatureTensor":
+        """Build from row-aligned columns (nulls already replaced by 0.0).
+
+        `pos_means` maps each of MEAN_POSITIONS to its per-feature mean, in
+        `features` order.
+        """
+
+        feature_names = list(features)
+        pos_names = list(dict.fromkeys([*cls.MEAN_POSITIONS, *positions]))
+        pos_index = {p: i for i, p in enumerate(pos_names)}
+        n, p, f = len(index), len(pos_names), len(feature_names)
+
+        data = np.empty((len(champ_ids), f + 1), dtype=np.float32)
+        for j, name in enumerate(feature_names):
+            data[:, j] = features[name]
+        data[:, f] = 0.0
+
+        ci = index.indices(champ_ids)
+        pi = np.asarray([pos_index[str(x)] for x in positions], dtype=np.int32)
+
+        values = np.zeros((n + 1, p + 1, f + 1), dtype=np.float32)
+
+        for pos in cls.MEAN_POSITIONS:
+            if pos in pos_means:
+                values[-1, pos_index[pos], :f] = pos_means[pos]
+
+        # Missing (champion, position) pairs fall back to the position means.
+        values[:n] = values[-1]
+
+        ok = ci >= 0
+        rows = np.flatnonzero(ok)
+        keep = rows[_last_occurrence(ci[ok].astype(np.int64) * (p + 1) + pi[ok])]
+        values[ci[keep], pi[keep]] = data[keep]
+
+        return cls(index, pos_names, feature_names, values)
+
+    def column(self, name: str) -> int:
+        return self.feature_index.get(name, -1)
+
+    def columns(self, names: Sequence[str]) -> np.ndarray:
+        return np.asarray([self.feature_index.get(n, -1) for n in names], dtype=np.int64)
+
+    def position(self, name: str) -> int:
+        return self.position_index.get(name, -1)
+
+
+class CandidateTable:
+    """Candidate pool for one role as parallel column arrays, in ranking order."""
+
+    COLUMNS = ("champ_id", "games_played", "stat_winrate", "style_lane_dominance", "style_gold_hunger", "pr")
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = {name: np.asarray(columns[name]) for name in self.COLUMNS}
+
+    @classmethod
+    def empty(cls) -> "CandidateTable":
+        return cls({name: np.zeros(0, dtype=np.int64 if name == "champ_id" else np.float64) for name in cls.COLUMNS})
+
+    def __len__(self) -> int:
+        return len(self.columns["champ_id"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def take(self, selector: np.ndarray) -> "CandidateTable":
+        """Rows selected by a boolean mask or index array, order preserved."""
+
+        return CandidateTable({name: col[selector] for name, col in self.columns.items()})
+
+
+# (games, winrate, proficiency); entries may be None for incomplete source rows.
+ProSignature = Tuple[Optional[int], Optional[float], Optional[float]]
+
+
+class ProSignatureIndex:
+    """Pro signature stats keyed by lowercased (player, champion).
+
+    Stored as one signature pool per player, so every candidate of a role's player is
+    resolved against a single dict. For duplicate keys the first source row wins.
+    """
+
+    def __init__(self, pools: Dict[str, Dict[str, ProSignature]]):
+        self.pools = pools
+
+    @classmethod
+    def from_columns(
+        cls,
+        players: Sequence[Optional[str]],
+        champions: Sequence[Optional[str]],
+        games: Sequence[Optional[int]],
+        winrates: Sequence[Optional[float]],
+        proficiency: Sequence[Optional[float]],
+    ) -> "ProSignatureIndex":
+        pools: Dict[str, Dict[str, ProSignature]] = {}
+        for player, champ, g, wr, score in zip(players, champions, games, winrates, proficiency):
+            if player is None or champ is None:
+                continue
+            pools.setdefault(player.lower(), {}).setdefault(champ.lower(), (g, wr, score))
+        return cls(pools)
+
+    def __len__(self) -> int:
+        return sum(len(pool) for pool in self.pools.values())
+
+    def pool(self, player: Optional[str]) -> Dict[str, ProSignature]:
+        """{lowercased champion: signature} for one player (empty if unknown or None)."""
+
+        if player is None:
+            return {}
+        return self.pools.get(player.lower(), {})
+
+    def gather(
+        self, player: Optional[str], champions: Sequence[str]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Aligned (found, games, winrate, proficiency, invalid) arrays for `champions`.
+
+        `invalid` marks signatures with missing stats.
+        """
+
+        n = len(champions)
+        found = np.zeros(n, dtype=bool)
+        invalid = np.zeros(n, dtype=bool)
+        games = np.zeros(n, dtype=np.int64)
+        winrate = np.zeros(n)
+        proficiency = np.zeros(n)
+
+        pool = self.pool(player)
+        if not pool:
+            return found, games, winrate, proficiency, invalid
+        for i, champ in enumerate(champions):
+            sig = pool.get(champ.lower())
+            if sig is None:
+                continue
+            found[i] = True
+            if None in sig:
+                invalid[i] = True
+                continue
+            games[i], winrate[i], proficiency[i] = sig
+        return found, games, winrate, proficiency, invalid
+
+
+class MetaTable:
+    """Tournament meta compiled onto the champion index.
+
+    `entries` maps the lowercased meta key to (presence, winrate); `names` gives the
+    champion name of every ChampionIndex row. Presence, winrate and the resulting
+    meta (bonus, kind) are precomputed per row, with a trailing "not in the meta" row
+    for unknown champions, so scoring a candidate set is a single gather. Swapping
+    the meta only needs a new MetaTable over the same names.
+    """
+
+    def __init__(self, entries: Dict[str, Tuple[Optional[int], Optional[float]]], names: Sequence[Optional[str]]):
+        self.entries = entries
+        self.names = list(names)
+
+        found, presence, winrate = self.lookup([n or "" for n in self.names])
+        self.found = np.append(found, False)
+        self.presence = np.append(presence, 0)
+        self.winrate = np.append(winrate, 0.0)
+        self.bonus, self.kind = meta_bias(self.found, self.presence, self.winrate)
+
+    @classmethod
+    def from_columns(
+        cls,
+        keys: Sequence[Optional[str]],
+        presence: Sequence[Optional[int]],
+        winrate: Sequence[Optional[float]],
+        names: Sequence[Optional[str]],
+    ) -> "MetaTable":
+        entries: Dict[str, Tuple[Optional[int], Optional[float]]] = {}
+        for key, p, wr in zip(keys, presence, winrate):
+            if key is not None:
+                entries.setdefault(key, (p, wr))
+        return cls(entries, names)
+
+    def lookup(self, champ_names: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(found, presence, winrate) per champion name (matched lowercased)."""
+
+        n = len(champ_names)
+        found = np.zeros(n, dtype=bool)
+        presence = np.zeros(n, dtype=np.int64)
+        winrate = np.zeros(n)
+        for i, champ in enumerate(champ_names):
+            entry = self.entries.get(champ.lower())
+            if entry is None or entry[0] is None or entry[1] is None:
+                continue
+            found[i] = True
+            presence[i], winrate[i] = entry
+        return found, presence, winrate
+
+    def take(self, idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(bonus, kind, presence, winrate) for champion indices `idx` (-1 = unknown)."""
+
+        return self.bonus[idx], self.kind[idx], self.presence[idx], self.winrate[idx]
+
+
+class ChampionStatTable:
+    """Feature-store means per champion and per champion x role.
+
+    `champion[i, k]` is stat k averaged over all of champion i's rows (how an enemy
+    laner is judged); `by_role[r, i, k]` averages only its rows in role r (how a
+    candidate for that role is judged). Missing stats, and the sentinel row, are 0.
+    """
+
+    def __init__(
+        self, index: ChampionIndex, stats: Sequence[str], roles: Sequence[str], champion: np.ndarray, by_role: np.ndarray
+    ):
+        self.index = index
+        self.stats = list(stats)
+        self.roles = list(roles)
+        self.champion = champion
+        self.by_role = by_role
+        self._stat_col = {k: j for j, k in enumerate(self.stats)}
+        self._role_row = {r: j for j, r in enumerate(self.roles)}
+
+    @classmethod
+    def from_columns(
+        cls,
+        index: ChampionIndex,
+        stats: Sequence[str],
+        champ_ids: Sequence[int],
+        champ_values: np.ndarray,
+        role_names: Sequence[str],
+        role_champ_ids: Sequence[int],
+        role_values: np.ndarray,
+    ) -> "ChampionStatTable":
+        """Build from pre-aggregated rows: (champ_ids, champ_values) are the per-champion
+        means, (role_names, role_champ_ids, role_values) the per-(role, champion) ones."""
+
+        n, k = len(index), len(stats)
+        champion = np.zeros((n + 1, k), dtype=np.float64)
+        idx = index.indices(champ_ids)
+        ok = idx >= 0
+        champion[idx[ok]] = np.nan_to_num(np.asarray(champ_values, dtype=np.float64)[ok])
+
+        roles = list(dict.fromkeys(role_names))
+        by_role = np.zeros((len(roles), n + 1, k), dtype=np.float64)
+        role_row = np.asarray([roles.index(r) for r in role_names], dtype=np.int64)
+        idx = index.indices(role_champ_ids)
+        ok = idx >= 0
+        by_role[role_row[ok], idx[ok]] = np.nan_to_num(np.asarray(role_values, dtype=np.float64)[ok])
+        return cls(index, stats, roles, champion, by_role)
+
+    def role_index(self, role: str) -> int:
+        return self._role_row.get(role, -1)
+
+    def column(self, stat: str) -> np.ndarray:
+        """Per-champion means of `stat` (sentinel last)."""
+
+        return self.champion[:, self._stat_col[stat]]
+
+
+class LaneCounterMatrix:
+    """Dense [role, my champion, enemy champion] lane counter tables.
+
+    Derived from a ChampionStatTable: the candidate is judged by its role means and
+    the enemy laner by its overall means. Holds the SoloQ counter bonus and the lane
+    / scaling kinds of the tactical matchup notes, so both are plain lookups.
+    """
+
+    LANE_DOMINANCE = "style_lane_dominance"
+    GOLD_HUNGER = "style_gold_hunger"
+
+    def __init__(self, stats: ChampionStatTable):
+        self.stats = stats
+        en_prio = stats.column(self.LANE_DOMINANCE)[None, None, :]
+        en_scale = stats.column(self.GOLD_HUNGER)[None, None, :]
+        my_prio = stats.by_role[:, :, stats.stats.index(self.LANE_DOMINANCE), None]
+        my_scale = stats.by_role[:, :, stats.stats.index(self.GOLD_HUNGER), None]
+
+        self.bonus = soloq_counter_bonus(my_prio, my_scale, en_prio, en_scale)
+        lane, scale = lane_matchup(my_prio, my_scale, en_prio, en_scale)
+        self.lane_kind = lane.astype(np.int8)
+        self.scale_kind = scale.astype(np.int8)
+
+    def counter(self, role: str, my_idx: np.ndarray, enemy_idx: int) -> np.ndarray:
+        """Counter bonus of candidates `my_idx` vs one enemy laner (0 for unknown roles)."""
+
+        r = self.stats.role_index(role)
+        if r < 0:
+            return np.zeros(len(my_idx))
+        return self.bonus[r, my_idx, enemy_idx]
+
+    def kinds(self, role: str, my_idx: int, enemy_idx: int) -> Tuple[int, int]:
+        """(lane kind, scaling kind) of one matchup."""
+
+        r = self.stats.role_index(role)
+        if r < 0:
+            return 0, 0
+        return int(self.lane_kind[r, my_idx, enemy_idx]), int(self.scale_kind[r, my_idx, enemy_idx])
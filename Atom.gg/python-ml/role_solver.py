@@ -0,0 +1,137 @@
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from feature_plan import ROLES
+
+
+class RoleSolver:
+    """Assigns picked champions to roles by maximising the product of role probabilities.
+
+    Scoring matches the original brute-force solver: a champion's probability for a
+    role comes from `role_map` (default 0.0001), probabilities below 0.05 are
+    penalised by x0.1, and an assignment scoring below 1e-12 is invalid. Instead of
+    trying every permutation, a DP over the 5-bit mask of taken roles finds the best
+    log-score; among (near-)ties the exact product decides and the first assignment
+    in permutation order wins, exactly like before.
+
+    Results are memoized by the pick tuple. Build a new solver when `role_map` changes.
+    """
+
+    DEFAULT_PROB = 0.0001
+    PENALTY_BELOW = 0.05
+    PENALTY = 0.1
+    MIN_SCORE = 1e-12
+    # Log-score slack for treating two assignments as tied before comparing exact products.
+    TIE_EPS = 1e-9
+
+    def __init__(self, role_map: Dict[str, Dict[str, float]], roles: Sequence[str] = ROLES, cache_size: int = 4096):
+        self.roles = list(roles)
+        self.champ_row = {c: i for i, c in enumerate(role_map)}
+
+        # Champion x role probability matrix; the last row is the unknown-champion default.
+        probs = np.full((len(role_map) + 1, len(self.roles)), self.DEFAULT_PROB, dtype=np.float64)
+        role_col = {r: j for j, r in enumerate(self.roles)}
+        for c, i in self.champ_row.items():
+            for role, p in role_map[c].items():
+                if role in role_col:
+                    probs[i, role_col[role]] = p
+        self.probs = np.where(probs < self.PENALTY_BELOW, probs * self.PENALTY, probs)
+        self.log_probs = np.log(self.probs)
+
+        # Role-mask bookkeeping shared by every solve: masks grouped by popcount and
+        # the free roles of each mask.
+        n_roles = len(self.roles)
+        self._masks_by_count: List[List[int]] = [[] for _ in range(n_roles + 1)]
+        for mask in range(1 << n_roles):
+            self._masks_by_count[bin(mask).count("1")].append(mask)
+        self._free: List[List[Tuple[int, int]]] = [
+            [(r, mask | (1 << r)) for r in range(n_roles) if not mask & (1 << r)] for mask in range(1 << n_roles)
+        ]
+
+        self._solve = lru_cache(maxsize=cache_size)(self._solve_uncached)
+        self._marginals = lru_cache(maxsize=cache_size)(self._marginals_uncached)
+
+    def solve(self, picks: Sequence[str]) -> Dict[str, str]:
+        """{champion: role} for the best assignment ({} if none is valid). Do not mutate."""
+
+        return self._solve(tuple(picks))
+
+    def marginals(self, picks: Sequence[str]) -> Dict[str, Dict[str, float]]:
+        """{champion: {role: probability}} over all assignments, weighted by their score.
+
+        A fresh copy of the memoized result: callers embed it in response payloads.
+        """
+
+        return {c: dict(roles) for c, roles in self._marginals(tuple(picks)).items()}
+
+    def _pick_rows(self, picks: Tuple[str, ...]) -> Tuple[List[List[float]], List[List[float]]]:
+        rows = [self.champ_row.get(p, -1) for p in picks]
+        return self.probs[rows].tolist(), self.log_probs[rows].tolist()
+
+    def _solve_uncached(self, picks: Tuple[str, ...]) -> Dict[str, str]:
+        n, n_roles = len(picks), len(self.roles)
+        if n == 0 or n > n_roles:
+            return {}
+        probs, logp = self._pick_rows(picks)
+
+        # best[mask]: best log-score for assigning picks popcount(mask).. given the taken roles.
+        free = self._free
+        best = [0.0] * (1 << n_roles)
+        for i in range(n - 1, -1, -1):
+            row = logp[i]
+            for mask in self._masks_by_count[i]:
+                best[mask] = max(row[r] + best[nxt] for r, nxt in free[mask])
+
+        # Walk every (near-)optimal branch in permutation order and let the exact
+        # product decide, so float ties resolve the same way as the brute force.
+        winner: Tuple[int, ...] = ()
+        winner_score = -1.0
+        stack: List[Tuple[int, Tuple[int, ...]]] = [(0, ())]
+        while stack:
+            mask, combo = stack.pop()
+            i = len(combo)
+            if i == n:
+                sc = 1.0
+                for k, r in enumerate(combo):
+                    sc *= probs[k][r]
+                if sc >= self.MIN_SCORE and sc > winner_score:
+                    winner_score, winner = sc, combo
+                continue
+            floor = best[mask] - self.TIE_EPS
+            ties = [(nxt, combo + (r,)) for r, nxt in free[mask] if logp[i][r] + best[nxt] >= floor]
+            stack.extend(reversed(ties))
+
+        return {p: self.roles[r] for p, r in zip(picks, winner)} if winner else {}
+
+    def _marginals_uncached(self, picks: Tuple[str, ...]) -> Dict[str, Dict[str, float]]:
+        n, n_roles = len(picks), len(self.roles)
+        if n == 0 or n > n_roles:
+            return {}
+        probs, _ = self._pick_rows(picks)
+
+        # Forward/backward sums over role masks: fwd[mask] covers picks before
+        # popcount(mask), bwd[mask] the picks from popcount(mask) on.
+        free = self._free
+        fwd = [0.0] * (1 << n_roles)
+        fwd[0] = 1.0
+        for i in range(n):
+            for mask in self._masks_by_count[i]:
+                for r, nxt in free[mask]:
+                    fwd[nxt] += fwd[mask] * probs[i][r]
+
+        bwd = [1.0] * (1 << n_roles)
+        for i in range(n - 1, -1, -1):
+            for mask in self._masks_by_count[i]:
+                bwd[mask] = sum(probs[i][r] * bwd[nxt] for r, nxt in free[mask])
+
+        total = bwd[0]
+        out: Dict[str, Dict[str, float]] = {}
+        for i, p in enumerate(picks):
+            weights = [0.0] * n_roles
+            for mask in self._masks_by_count[i]:
+                for r, nxt in free[mask]:
+                    weights[r] += fwd[mask] * probs[i][r] * bwd[nxt]
+            out[p] = {role: (w / total if total else 0.0) for role, w in zip(self.roles, weights)}
+        return out
@@ -0,0 +1,321 @@
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import polars as pl
+import xgboost as xgb
+
+from draft_oracle import TournamentDraft
+from feature_plan import FeaturePlan
+
+
+# Reference for the compiled feature plan: the baseline per-feature dict
+# construction of draft_oracle (`BaselineFeatureRow`, ported unchanged) and a
+# parity check of `FeaturePlan.build` against it. Used by test_feature_plan and
+# by bench_feature_plan, which also reports the timings.
+
+
+class BaselineFeatureRow:
+    """Model rows as the baseline TournamentDraft built them.
+
+    `_prepare_feature_lookup`, `_get_features_for_slot`, the tuple-keyed
+    `synergy_map` and the body of `predict_live_winrate` (up to the DMatrix) are
+    the original code; only the role solving is left to the caller.
+    """
+
+    def __init__(self, df: pl.DataFrame, synergy_file: str, name_to_id: Dict[str, int], quiet: bool = True):
+        self.df = df
+        self.SYNERGY_FILE = synergy_file
+        self.name_to_id = name_to_id
+        self.quiet = quiet
+
+        if os.path.exists(self.SYNERGY_FILE):
+            if not self.quiet:
+                print("   Synergy Matrix: Loaded")
+            self.synergy_raw = pl.read_parquet(self.SYNERGY_FILE)
+            self.synergy_map: Dict[Tuple[int, int], float] = {}
+            rows = self.synergy_raw.select(["champ_id", "champ_id_right", "syn_winrate"]).to_numpy()
+            for r in rows:
+                self.synergy_map[(r[0], r[1])] = r[2]
+                self.synergy_map[(r[1], r[0])] = r[2]
+        else:
+            self.synergy_map = {}
+
+        self._feature_lookup: Dict[Tuple[int, str], Dict[str, float]] = {}
+        self._pos_means: Dict[str, Dict[str, float]] = {}
+        self._prepare_feature_lookup()
+
+    def _prepare_feature_lookup(self) -> None:
+        # Cache per-(champ_id, position) feature rows for fast lookup.
+        # The feature store is the single source of truth for per-champion stats.
+        ignore = {"champ_id", "position", "region"}
+        feature_cols = [c for c in self.df.columns if c not in ignore]
+
+        for row in self.df.select(["champ_id", "position", *feature_cols]).to_dicts():
+            champ_id = int(row["champ_id"])
+            position = str(row["position"])
+            self._feature_lookup[(champ_id, position)] = {
+                k: (0.0 if row.get(k) is None else float(row[k])) for k in feature_cols
+            }
+
+        # Precompute global per-position means so we can predict during partial drafts.
+        for pos in ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY", ""]:
+            pos_df = self.df.filter(pl.col("position") == pos)
+            if pos_df.height == 0:
+                self._pos_means[pos] = {k: 0.0 for k in feature_cols}
+                continue
+
+            mean_row = pos_df.select(feature_cols).mean().to_dicts()[0]
+            self._pos_means[pos] = {k: float(mean_row.get(k) or 0.0) for k in feature_cols}
+
+    def _champ_id(self, champ_name: str) -> Optional[int]:
+        if not champ_name:
+            return None
+        return self.name_to_id.get(champ_name.lower())
+
+    def _get_features_for_slot(self, champ_name: Optional[str], position: str) -> Dict[str, float]:
+        """Return feature dict for a given slot.
+
+        If champion is missing/unknown, returns per-position global means.
+        """
+
+        if champ_name:
+            champ_id = self._champ_id(champ_name)
+            if champ_id is not None:
+                row = self._feature_lookup.get((champ_id, position))
+                if row is not None:
+                    return row
+        return self._pos_means.get(position, {})
+
+    def feature_row(self, feature_names: List[str], blue_assign: Dict[str, str], red_assign: Dict[str, str]) -> np.ndarray:
+        roles = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+
+        blue_role_to_champ = {role: champ for champ, role in blue_assign.items()}
+        red_role_to_champ = {role: champ for champ, role in red_assign.items()}
+
+        # Base per-slot columns we can map directly from the feature store.
+        slot_cols = [
+            "stat_dpm",
+            "stat_gpm",
+            "stat_dmg_taken",
+            "stat_mitigated",
+            "stat_heal",
+            "stat_hard_cc",
+            "stat_vision_score",
+            "z_style_roaming_tendency",
+            "z_style_lane_dominance",
+            "z_style_gank_heaviness",
+            "z_style_objective_control",
+            "z_style_invade_pressure",
+            "z_style_gold_hunger",
+        ]
+
+        feats: Dict[str, float] = {k: 0.0 for k in feature_names}
+
+        def set_if_present(key: str, val: float) -> None:
+            if key in feats:
+                feats[key] = float(val)
+
+        def compute_side(side: str, role_to_champ: Dict[str, str]) -> Dict[str, Dict[str, float]]:
+            side_slots: Dict[str, Dict[str, float]] = {}
+            for r in roles:
+                side_slots[r] = self._get_features_for_slot(role_to_champ.get(r), r)
+            return side_slots
+
+        blue_slots = compute_side("blue", blue_role_to_champ)
+        red_slots = compute_side("red", red_role_to_champ)
+
+        # Per-role features
+        for r in roles:
+            for col in slot_cols:
+                set_if_present(f"blue_{r}_{col}", blue_slots[r].get(col, 0.0))
+                set_if_present(f"red_{r}_{col}", red_slots[r].get(col, 0.0))
+
+        # Team-level "__" aggregates (mean across roles)
+        for col in slot_cols:
+            blue_mean = float(np.mean([blue_slots[r].get(col, 0.0) for r in roles]))
+            red_mean = float(np.mean([red_slots[r].get(col, 0.0) for r in roles]))
+            set_if_present(f"blue__{col}", blue_mean)
+            set_if_present(f"red__{col}", red_mean)
+
+        # Team totals/ratios derived from per-slot stats.
+        # We compute totals across the 5 roles (missing roles filled with means).
+        def sum_side(col: str, side_slots: Dict[str, Dict[str, float]]) -> float:
+            return float(sum(side_slots[r].get(col, 0.0) for r in roles))
+
+        # Damage types
+        blue_magic = sum_side("avg_magic_dmg", blue_slots)
+        blue_phys = sum_side("avg_phys_dmg", blue_slots)
+        blue_true = sum_side("avg_true_dmg", blue_slots)
+        red_magic = sum_side("avg_magic_dmg", red_slots)
+        red_phys = sum_side("avg_phys_dmg", red_slots)
+        red_true = sum_side("avg_true_dmg", red_slots)
+
+        set_if_present("blue_total_magic_dmg", blue_magic)
+        set_if_present("blue_total_phys_dmg", blue_phys)
+        set_if_present("blue_total_true_dmg", blue_true)
+        set_if_present("red_total_magic_dmg", red_magic)
+        set_if_present("red_total_phys_dmg", red_phys)
+        set_if_present("red_total_true_dmg", red_true)
+
+        set_if_present(
+            "blue_magic_dmg_ratio",
+            blue_magic / max(1e-9, (blue_magic + blue_phys + blue_true)),
+        )
+        set_if_present(
+            "red_magic_dmg_ratio",
+            red_magic / max(1e-9, (red_magic + red_phys + red_true)),
+        )
+
+        # Tankiness/sustain/cc proxies
+        blue_tank = sum_side("stat_dmg_taken", blue_slots) + sum_side("stat_mitigated", blue_slots)
+        red_tank = sum_side("stat_dmg_taken", red_slots) + sum_side("stat_mitigated", red_slots)
+        set_if_present("blue_total_tankiness", blue_tank)
+        set_if_present("red_total_tankiness", red_tank)
+        set_if_present("blue_total_sustain", sum_side("stat_heal", blue_slots))
+        set_if_present("red_total_sustain", sum_side("stat_heal", red_slots))
+        set_if_present("blue_total_cc", sum_side("stat_hard_cc", blue_slots))
+        set_if_present("red_total_cc", sum_side("stat_hard_cc", red_slots))
+
+        # Strategy proxies (best-effort)
+        set_if_present(
+            "blue_strat_gank_compatibility",
+            float(np.mean([blue_slots[r].get("z_style_gank_heaviness", 0.0) for r in roles])),
+        )
+        set_if_present(
+            "red_strat_gank_compatibility",
+            float(np.mean([red_slots[r].get("z_style_gank_heaviness", 0.0) for r in roles])),
+        )
+        set_if_present(
+            "blue_strat_resource_friction",
+            float(np.std([blue_slots[r].get("z_style_gold_hunger", 0.0) for r in roles])),
+        )
+        set_if_present(
+            "red_strat_resource_friction",
+            float(np.std([red_slots[r].get("z_style_gold_hunger", 0.0) for r in roles])),
+        )
+        set_if_present(
+            "blue_strat_invade_safety",
+            float(np.mean([blue_slots[r].get("z_style_invade_pressure", 0.0) for r in roles])),
+        )
+        set_if_present(
+            "red_strat_invade_safety",
+            float(np.mean([red_slots[r].get("z_style_invade_pressure", 0.0) for r in roles])),
+        )
+
+        # Team volatility (proxy)
+        def team_vol(side_slots: Dict[str, Dict[str, float]]) -> float:
+            cols = ["var_gold_volatility", "var_damage_volatility", "var_lane_stability"]
+            per_role = [float(sum(side_slots[r].get(c, 0.0) for c in cols)) for r in roles]
+            return float(np.mean(per_role))
+
+        set_if_present("diff_team_volatility", team_vol(blue_slots) - team_vol(red_slots))
+
+        # Synergy features (baseline 0.5 if unknown)
+        def duo_syn(role_a: str, role_b: str, role_to_champ: Dict[str, str]) -> float:
+            a = role_to_champ.get(role_a)
+            b = role_to_champ.get(role_b)
+            if not a or not b:
+                return 0.5
+            a_id = self._champ_id(a)
+            b_id = self._champ_id(b)
+            if a_id is None or b_id is None:
+                return 0.5
+            return float(self.synergy_map.get((a_id, b_id), 0.5))
+
+        blue_syn_mid_jg = duo_syn("MIDDLE", "JUNGLE", blue_role_to_champ)
+        blue_syn_bot_duo = duo_syn("BOTTOM", "UTILITY", blue_role_to_champ)
+        blue_syn_top_jg = duo_syn("TOP", "JUNGLE", blue_role_to_champ)
+        red_syn_mid_jg = duo_syn("MIDDLE", "JUNGLE", red_role_to_champ)
+        red_syn_bot_duo = duo_syn("BOTTOM", "UTILITY", red_role_to_champ)
+        red_syn_top_jg = duo_syn("TOP", "JUNGLE", red_role_to_champ)
+
+        set_if_present("blue_syn_mid_jg", blue_syn_mid_jg)
+        set_if_present("blue_syn_bot_duo", blue_syn_bot_duo)
+        set_if_present("blue_syn_top_jg", blue_syn_top_jg)
+        set_if_present("red_syn_mid_jg", red_syn_mid_jg)
+        set_if_present("red_syn_bot_duo", red_syn_bot_duo)
+        set_if_present("red_syn_top_jg", red_syn_top_jg)
+        set_if_present("gap_syn_mid_jg", blue_syn_mid_jg - red_syn_mid_jg)
+
+        # Duel features
+        duel_cols = [
+            ("stat_gpm", "duel_{r}_stat_gpm"),
+            ("stat_dpm", "duel_{r}_stat_dpm"),
+            ("z_style_lane_dominance", "duel_{r}_z_style_lane_dominance"),
+        ]
+        for r in roles:
+            for src, tmpl in duel_cols:
+                key = tmpl.format(r=r)
+                set_if_present(key, blue_slots[r].get(src, 0.0) - red_slots[r].get(src, 0.0))
+
+        # Build row in the exact feature order.
+        row = np.array([[feats.get(name, 0.0) for name in feature_names]], dtype=np.float32)
+        return row
+
+
+def random_drafts(champs: List[str], n: int, seed: int = 7) -> List[Tuple[List[str], List[str]]]:
+    """`n` partial or full drafts (0-10 distinct champions, blue picks first)."""
+
+    rng = random.Random(seed)
+    drafts = []
+    for _ in range(n):
+        k = rng.randint(0, 10)
+        pool = rng.sample(champs, k)
+        drafts.append((pool[: (k + 1) // 2], pool[(k + 1) // 2 :]))
+    return drafts
+
+
+def synergy_mismatches(ref: BaselineFeatureRow, app: TournamentDraft) -> int:
+    """Pairs of the baseline synergy_map whose SynergyMatrix value is not identical."""
+
+    return sum(1 for (a, b), wr in ref.synergy_map.items() if app.synergy.pair(int(a), int(b)) != float(wr))
+
+
+def compare(app: TournamentDraft, feature_names: List[str], drafts: List[Tuple[List[str], List[str]]]) -> Dict[str, Any]:
+    """Row and win probability parity of FeaturePlan against BaselineFeatureRow."""
+
+    ref = BaselineFeatureRow(app.df, app.SYNERGY_FILE, app.name_to_id)
+    plan = FeaturePlan(feature_names, app.features, app.synergy)
+    buf = np.zeros((1, len(feature_names)), dtype=np.float32)
+    model: Optional[xgb.Booster] = app.model if app.model_cols == feature_names else None
+
+    mismatched_rows = 0
+    mismatched_features: Dict[str, int] = {}
+    max_winprob_diff = 0.0
+    legacy_s = 0.0
+    plan_s = 0.0
+    for blue, red in drafts:
+        # Role solving is shared by both paths; time only the row construction.
+        blue_assign, red_assign = app._solve_roles(blue), app._solve_roles(red)
+
+        t0 = time.perf_counter()
+        expected = ref.feature_row(feature_names, blue_assign, red_assign)
+        t1 = time.perf_counter()
+        row = plan.build(app._role_champ_indices(blue_assign), app._role_champ_indices(red_assign), out=buf)
+        t2 = time.perf_counter()
+        legacy_s += t1 - t0
+        plan_s += t2 - t1
+
+        diff = expected.view(np.uint32) != row.view(np.uint32)
+        if diff.any():
+            mismatched_rows += 1
+            for j in np.flatnonzero(diff[0]):
+                mismatched_features[feature_names[j]] = mismatched_features.get(feature_names[j], 0) + 1
+        if model is not None:
+            want = float(model.predict(xgb.DMatrix(expected, feature_names=feature_names))[0])
+            got = float(app.predictor.predict(row)[0])
+            max_winprob_diff = max(max_winprob_diff, abs(want - got))
+
+    return {
+        "synergy_pairs": len(ref.synergy_map),
+        "synergy_mismatches": synergy_mismatches(ref, app),
+        "drafts": len(drafts),
+        "mismatched_rows": mismatched_rows,
+        "mismatched_features": mismatched_features,
+        "max_winprob_diff": max_winprob_diff if model is not None else None,
+        "legacy_us": legacy_s / max(1, len(drafts)) * 1e6,
+        "plan_us": plan_s / max(1, len(drafts)) * 1e6,
+    }
@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The oracle modules are flat files next to this directory (see run_ml_server.ps1).
+ORACLE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ORACLE_DIR)
+
+from baseline_features import random_drafts  # noqa: E402
+from draft_oracle import TournamentDraft  # noqa: E402
+from feature_plan import FeaturePlan  # noqa: E402
+
+DB_FILE = os.path.join(ORACLE_DIR, "..", "src-tauri", "src", "esports_data.db")
+BUNDLED_MODEL = os.path.join(ORACLE_DIR, "draft_oracle_brain_v12_final.json")
+
+
+def load_oracle(model_file: str, cache_dir: str) -> TournamentDraft:
+    return TournamentDraft(model_file=model_file, db_file=DB_FILE, quiet=True, cache_dir=cache_dir, refresh_champions=False)
+
+
+@pytest.fixture(scope="session")
+def cache_dir(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("oracle_cache"))
+
+
+@pytest.fixture(scope="session")
+def model_file(tmp_path_factory, cache_dir):
+    """The trained booster when it is checked out, else a small one fitted to random
+    drafts (same feature layout, so every model path is exercised)."""
+
+    if os.path.exists(BUNDLED_MODEL):
+        return BUNDLED_MODEL
+
+    import xgboost as xgb
+
+    app = load_oracle(os.path.join(cache_dir, "no_model.json"), cache_dir)
+    with open(os.path.join(ORACLE_DIR, "model_features_v12.json")) as f:
+        names = json.load(f)
+    plan = FeaturePlan(names, app.features, app.synergy)
+    rows = [
+        plan.build(
+            app._role_champ_indices(app._solve_roles(blue)), app._role_champ_indices(app._solve_roles(red))
+        )[0]
+        for blue, red in random_drafts(sorted(app.role_map), 2000, seed=0)
+    ]
+    x = np.asarray(rows)
+    w = np.random.default_rng(0).normal(size=x.shape[1]) / np.maximum(1e-3, x.std(axis=0))
+    y = ((x - x.mean(axis=0)) @ w > 0).astype(np.float32)
+    booster = xgb.train(
+        {"objective": "binary:logistic", "max_depth": 6, "eta": 0.1}, xgb.DMatrix(x, label=y, feature_names=names), 100
+    )
+    path = str(tmp_path_factory.mktemp("model") / "model.json")
+    booster.save_model(path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def oracle(model_file, cache_dir):
+    """One loaded oracle; tests that change the draft work on oracle.new_session()."""
+
+    return load_oracle(model_file, cache_dir)
+
+
+@pytest.fixture(scope="session")
+def ml_server(model_file, cache_dir):
+    import ml_server
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("ATOMGG_MODEL_FILE", model_file)
+        mp.setenv("ATOMGG_DB_FILE", DB_FILE)
+        mp.setenv("ATOMGG_CACHE_DIR", cache_dir)
+        mp.setenv("ATOMGG_CHAMPION_REFRESH", "0")
+        return ml_server.MlServer()
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from baseline_features import BaselineFeatureRow, compare, random_drafts
+from oracle_inference import PARITY_TOLERANCE
+
+
+def test_rows_match_the_baseline_builder(oracle):
+    result = compare(oracle, oracle.model_cols, random_drafts(sorted(oracle.role_map), 500))
+    assert result["synergy_pairs"] > 0
+    assert result["synergy_mismatches"] == 0
+    assert result["mismatched_rows"] == 0, result["mismatched_features"]
+    assert result["max_winprob_diff"] <= PARITY_TOLERANCE
+
+
+def test_live_winrate_matches_the_baseline_prediction(oracle):
+    ref = BaselineFeatureRow(oracle.df, oracle.SYNERGY_FILE, oracle.name_to_id)
+    for blue, red in random_drafts(sorted(oracle.role_map), 50, seed=3):
+        session = oracle.new_session()
+        session.blue_picks, session.red_picks = list(blue), list(red)
+        row = ref.feature_row(oracle.model_cols, session._solve_roles(blue), session._solve_roles(red))
+        want = float(oracle.model.predict(xgb.DMatrix(row, feature_names=oracle.model_cols))[0])
+        got = session.predict_live_winrate()
+        assert got["blue"] == pytest.approx(np.clip(want, 0.0, 1.0), abs=PARITY_TOLERANCE)
+        assert got["red"] == 1.0 - got["blue"]
@@ -0,0 +1,326 @@
+import asyncio
+import contextlib
+import json
+import os
+import shutil
+import socket
+import tempfile
+
+import pytest
+
+from ml_server import ConcurrentMlServer, serve, serve_http_connection, serve_stream
+
+INIT = {"type": "init", "config": {"mode": "NORMAL", "blueTeam": "T1", "redTeam": "Gen.G Esports"}}
+SUGGEST = {"type": "suggest", "target_side": "RED", "is_ban_mode": False, "what_if": True}
+
+
+@pytest.fixture
+def session_id(request):
+    return request.node.name
+
+
+def concurrent(ml_server, **kwargs):
+    ml_server.suggestions.clear()
+    return ConcurrentMlServer(ml_server, **kwargs)
+
+
+def run_stream(server, session_id, msgs):
+    """Send `msgs` pipelined on one stream (all read before any is answered); responses by request_id."""
+
+    frames = [json.dumps(dict(m, request_id=i, session_id=session_id)).encode() for i, m in enumerate(msgs)]
+    out = []
+
+    async def read(framing):
+        return frames.pop(0) if frames else None
+
+    asyncio.run(serve_stream(server, read, out.append))
+    return {r["request_id"]: r for r in map(json.loads, out)}
+
+
+def sync(blue, red, bans):
+    return {"type": "sync_state", "blue_picks": blue, "red_picks": red, "bans": bans}
+
+
+def pick(side, champion):
+    return {"type": "pick", "side": side, "champion": champion}
+
+
+def ban(side, champion):
+    return {"type": "ban", "side": side, "champion": champion}
+
+
+# --- ORDERING ---
+DRAFT = [
+    INIT,
+    ban("BLUE", "Ahri"),
+    SUGGEST,
+    {"type": "winrate"},
+    ban("RED", "Thresh"),
+    pick("BLUE", "Jinx"),
+    {"type": "suggest", "target_side": "BLUE", "is_ban_mode": False, "what_if": False},
+    pick("RED", "Lee Sin"),
+    pick("RED", "Orianna"),
+    {"type": "winrate"},
+    sync(["Jinx", "Vi"], ["Lee Sin", "Orianna"], ["Ahri", "Thresh"]),
+    SUGGEST,
+    {"type": "batch", "messages": [pick("BLUE", "Nautilus"), {"type": "winrate"}]},
+    {"type": "bogus"},
+    {"type": "winrate"},
+    sync([], [], []),
+]
+
+
+def without_session(resp):
+    """`resp` as it goes on the wire, minus the session_id of it and of batch sub-responses."""
+
+    resp = json.loads(json.dumps(resp))
+    resp.pop("session_id", None)
+    for sub in (resp.get("payload") or {}).get("results", ()):
+        sub.pop("session_id", None)
+    return resp
+
+
+def test_pipelined_stream_answers_like_sequential_handling(ml_server, session_id):
+    # Payloads may reference the live draft, so detach each one before the next message.
+    expected = [without_session(ml_server.handle(dict(m, session_id="sequential_" + session_id))) for m in DRAFT]
+    server = concurrent(ml_server, speculate=False, coalesce=False)
+    try:
+        out = run_stream(server, session_id, DRAFT)
+    finally:
+        server.shutdown()
+    for i, want in enumerate(expected):
+        assert without_session(out[i]) == dict(want, request_id=i), DRAFT[i]
+
+
+# --- SUPERSEDE ---
+def test_suggest_superseded_by_a_board_change(ml_server, session_id):
+    server = concurrent(ml_server, speculate=False)
+    try:
+        out = run_stream(server, session_id, [INIT, SUGGEST, {"type": "pick", "side": "BLUE", "champion": "Jinx"}])
+    finally:
+        server.shutdown()
+    assert out[1]["type"] == "superseded"
+    assert out[2]["type"] == "pick_result"
+
+
+@pytest.mark.parametrize(
+    "follow_up",
+    [
+        {"type": "bogus"},
+        sync(["Jinx"], [], ["Ahri"]),
+        {"type": "configure_series", "mode": "NORMAL", "total_games": "many"},
+        {"type": "pick", "side": "RED", "champion": "Not A Champion"},
+        {"type": "set_team", "side": "BLUE", "name": "T1"},
+    ],
+    ids=["unknown_type", "identical_sync_state", "failing_message", "unknown_champion", "same_team_name"],
+)
+def test_suggest_survives_messages_that_change_nothing(ml_server, session_id, follow_up):
+    server = concurrent(ml_server, speculate=False)
+    try:
+        out = run_stream(server, session_id, [INIT, sync(["Jinx"], [], ["Ahri"]), SUGGEST, follow_up])
+    finally:
+        server.shutdown()
+    assert out[2]["type"] == "suggest_result"
+    assert out[2]["payload"]["recommendations"]
+
+
+def test_suggest_never_superseded_without_coalescing(ml_server, session_id):
+    server = concurrent(ml_server, speculate=False, coalesce=False)
+    try:
+        out = run_stream(server, session_id, [INIT, SUGGEST, {"type": "pick", "side": "BLUE", "champion": "Jinx"}])
+    finally:
+        server.shutdown()
+    assert out[1]["type"] == "suggest_result"
+    assert out[1]["payload"]["blue_winrate"] == out[0]["payload"]["blue_winrate"]
+
+
+# --- SYNC COALESCING ---
+def test_back_to_back_syncs_apply_only_the_last(ml_server, session_id):
+    server = concurrent(ml_server, speculate=False)
+    try:
+        out = run_stream(server, session_id, [INIT, sync(["Jinx"], [], ["Ahri"]), sync(["Jinx"], ["Vi"], ["Ahri", "Thresh"])])
+    finally:
+        server.shutdown()
+    assert out[1]["type"] == "superseded"
+    assert out[2]["type"] == "sync_state_result"
+    app = ml_server.sessions[session_id]
+    assert (app.blue_picks, app.red_picks, app.bans) == (["Jinx"], ["Vi"], ["Ahri", "Thresh"])
+
+
+def test_sync_read_in_between_is_not_skipped(ml_server, session_id):
+    server = concurrent(ml_server, speculate=False)
+    try:
+        out = run_stream(server, session_id, [INIT, sync(["Jinx"], [], []), {"type": "winrate"}, sync(["Jinx"], ["Vi"], [])])
+    finally:
+        server.shutdown()
+    assert [out[i]["type"] for i in (1, 2, 3)] == ["sync_state_result", "winrate_result", "sync_state_result"]
+    # The winrate is the one of the first board.
+    assert out[2]["payload"]["blue_winrate"] == out[1]["payload"]["blue_winrate"]
+    assert out[2]["payload"]["blue_winrate"] != out[3]["payload"]["blue_winrate"]
+
+
+# --- SPECULATION ---
+def test_identical_sync_keeps_the_speculated_suggestion(ml_server, session_id):
+    server = concurrent(ml_server)
+    before = ml_server.suggestions.stats()
+    try:
+        run_stream(server, session_id, [INIT, ban("BLUE", "Ahri")])
+        # Let the speculation for the next turn (a RED ban, which analyses BLUE) finish, as between turns.
+        server._speculation_jobs[session_id].result()
+        out = run_stream(
+            server, session_id, [sync([], [], ["Ahri"]), {"type": "suggest", "target_side": "BLUE", "is_ban_mode": True}]
+        )
+    finally:
+        server.shutdown()
+    after = ml_server.suggestions.stats()
+    assert out[1]["type"] == "suggest_result"
+    assert after["misses"] == before["misses"]
+    assert after["hits"] + after["pending_hits"] > before["hits"] + before["pending_hits"]
+    assert after["speculation_cancelled"] == before["speculation_cancelled"]
+
+
+# --- HTTP ---
+def post_all(server, requests):
+    """POST each request on one keep-alive connection; (status, response) pairs.
+
+    A request is a body, or (body, headers) overriding the default Host and
+    Content-Type headers (None drops one; "{port}" is the listening port).
+    """
+
+    async def run():
+        listener = await asyncio.start_server(lambda r, w: serve_http_connection(server, r, w), "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        results = []
+        try:
+            for request in requests:
+                body, extra = request if isinstance(request, tuple) else (request, {})
+                headers = {"Host": "127.0.0.1:{port}", "Content-Type": "application/json", "Content-Length": str(len(body))}
+                headers.update(extra)
+                head = "".join(f"{name}: {value.format(port=port)}\r\n" for name, value in headers.items() if value is not None)
+                writer.write(f"POST / HTTP/1.1\r\n{head}\r\n".encode() + body)
+                await writer.drain()
+                status = int((await reader.readline()).split()[1])
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                results.append((status, json.loads(await reader.readexactly(int(headers["content-length"])))))
+        finally:
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+        return results
+
+    return asyncio.run(run())
+
+
+def test_http_rejects_bodies_that_are_not_objects(ml_server):
+    server = concurrent(ml_server, speculate=False)
+    try:
+        results = post_all(server, [b"null", b"5", b"[1]", b"{bad", b'{"type": "ping"}'])
+    finally:
+        server.shutdown()
+    for status, resp in results[:3]:
+        assert (status, resp["ok"], resp["error"]) == (400, False, "Message must be an object")
+    assert results[3][0] == 400 and results[3][1]["error"].startswith("Invalid JSON")
+    assert results[4][0] == 200 and results[4][1]["type"] == "pong"
+
+
+def test_http_keeps_browsers_out(ml_server):
+    ping = b'{"type": "ping"}'
+    server = concurrent(ml_server, speculate=False)
+    try:
+        results = post_all(
+            server,
+            [
+                (ping, {"Content-Type": "text/plain"}),
+                (ping, {"Content-Type": None}),
+                (ping, {"Host": "attacker.example:80"}),
+                (ping, {"Host": None}),
+                b'{"type": "reload", "what": "model", "model_file": "/tmp/evil.json"}',
+                b'{"type": "batch", "messages": [{"type": "reload", "what": "meta", "meta_file": "x.parquet"}]}',
+                (ping, {"Host": "localhost:1"}),
+                (ping, {"Host": "localhost:{port}", "Content-Type": "application/json; charset=utf-8"}),
+            ],
+        )
+    finally:
+        server.shutdown()
+    assert [status for status, _ in results] == [415, 415, 403, 403, 403, 403, 403, 200]
+    assert not any(resp["ok"] for _, resp in results[:-1])
+    assert results[-1][1]["type"] == "pong"
+
+
+# --- UNIX SOCKET ---
+@pytest.fixture
+def socket_path():
+    # AF_UNIX paths are limited to ~100 bytes; pytest's tmp_path can be longer.
+    directory = tempfile.mkdtemp(prefix="ml")
+    yield os.path.join(directory, "ml.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_socket_server(server, socket_path):
+    """Start serve() on `socket_path`, connect once, stop it; whether a client got in."""
+
+    async def run():
+        task = asyncio.create_task(serve(server, stdio=False, socket_path=socket_path))
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if task.done():
+                return task.result()
+            try:
+                _, writer = await asyncio.open_unix_connection(socket_path)
+            except OSError:
+                continue
+            writer.close()
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+            return True
+        task.cancel()
+        return False
+
+    return asyncio.run(run())
+
+
+def test_socket_replaces_a_stale_socket_and_removes_it_on_exit(ml_server, socket_path):
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+    server = concurrent(ml_server, speculate=False)
+    try:
+        assert run_socket_server(server, socket_path)
+    finally:
+        server.shutdown()
+    assert not os.path.lexists(socket_path)
+
+
+def test_socket_refuses_a_regular_file(ml_server, socket_path):
+    with open(socket_path, "w") as f:
+        f.write("keep me")
+    server = concurrent(ml_server, speculate=False)
+    try:
+        with pytest.raises(RuntimeError):
+            run_socket_server(server, socket_path)
+    finally:
+        server.shutdown()
+    with open(socket_path) as f:
+        assert f.read() == "keep me"
+
+
+def test_socket_refuses_a_live_server(ml_server, socket_path):
+    live = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    live.bind(socket_path)
+    live.listen()
+    server = concurrent(ml_server, speculate=False)
+    try:
+        with pytest.raises(RuntimeError):
+            run_socket_server(server, socket_path)
+        assert os.path.lexists(socket_path)
+    finally:
+        server.shutdown()
+        live.close()
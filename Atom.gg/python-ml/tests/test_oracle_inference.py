@@ -0,0 +1,13 @@
+import numpy as np
+import pytest
+
+from oracle_inference import NUMPY_MAX_ROWS, PARITY_TOLERANCE, BoosterPredictor, make_predictor
+
+
+@pytest.mark.parametrize("n_rows", [1, NUMPY_MAX_ROWS, NUMPY_MAX_ROWS + 1, 750])
+def test_auto_backend_matches_booster_predict(oracle, n_rows):
+    rows = np.ascontiguousarray(oracle._probe_rows(n_rows))
+    auto = make_predictor(oracle.model, oracle.model_cols, "auto", probe_rows=rows)
+    assert auto.backend == "auto"
+    want = BoosterPredictor(oracle.model, oracle.model_cols).predict(rows)
+    np.testing.assert_allclose(auto.predict(rows), want, rtol=0, atol=PARITY_TOLERANCE)
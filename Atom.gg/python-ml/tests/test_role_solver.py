@@ -0,0 +1,89 @@
+import itertools
+import random
+
+import pytest
+
+from role_solver import RoleSolver
+
+ROLES = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+
+
+def brute_force_roles(role_map, picks):
+    """The baseline TournamentDraft._solve_roles (every permutation), unchanged."""
+
+    if not picks:
+        return {}
+    roles = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+    best_sc, best_assign = -1, {}
+    for combo in itertools.permutations(roles, len(picks)):
+        sc, valid = 1.0, True
+        temp = {}
+        for i, p in enumerate(picks):
+            prob = role_map.get(p, {}).get(combo[i], 0.0001)
+            if prob < 0.05:
+                prob *= 0.1
+            sc *= prob
+            temp[p] = combo[i]
+            if sc < 1e-12:
+                valid = False
+                break
+        if valid and sc > best_sc:
+            best_sc = sc
+            best_assign = temp
+    return best_assign
+
+
+def brute_force_marginals(role_map, picks):
+    weights = {p: dict.fromkeys(ROLES, 0.0) for p in picks}
+    total = 0.0
+    for combo in itertools.permutations(ROLES, len(picks)):
+        sc = 1.0
+        for p, role in zip(picks, combo):
+            prob = role_map.get(p, {}).get(role, 0.0001)
+            sc *= prob * 0.1 if prob < 0.05 else prob
+        total += sc
+        for p, role in zip(picks, combo):
+            weights[p][role] += sc
+    return {p: {r: w / total for r, w in roles.items()} for p, roles in weights.items()}
+
+
+def tie_heavy_map():
+    """Flex champions with equal role probabilities, so many assignments tie exactly."""
+
+    rng = random.Random(3)
+    levels = [0.5, 0.25, 0.04, 0.3]
+    return {f"Flex{i}": {r: rng.choice(levels) for r in rng.sample(ROLES, rng.randint(1, 5))} for i in range(12)}
+
+
+def pick_sets(champs, n, seed):
+    rng = random.Random(seed)
+    pool = list(champs) + ["UnknownChamp"]
+    return [rng.sample(pool, rng.randint(0, 5)) for _ in range(n)]
+
+
+@pytest.mark.parametrize("source", ["oracle", "ties"])
+def test_solve_matches_brute_force(oracle, source):
+    role_map = oracle.role_map if source == "oracle" else tie_heavy_map()
+    solver = RoleSolver(role_map)
+    for picks in pick_sets(sorted(role_map), 1500, seed=11):
+        assert solver.solve(picks) == brute_force_roles(role_map, picks), picks
+
+
+def test_marginals_match_brute_force(oracle):
+    solver = RoleSolver(oracle.role_map)
+    for picks in pick_sets(sorted(oracle.role_map), 300, seed=5):
+        got = solver.marginals(picks)
+        want = brute_force_marginals(oracle.role_map, picks) if picks else {}
+        assert got.keys() == want.keys()
+        for p in want:
+            assert got[p] == pytest.approx(want[p], rel=1e-9, abs=1e-15)
+
+
+def test_marginals_are_not_shared():
+    solver = RoleSolver({"Ahri": {"MIDDLE": 0.9}, "LeeSin": {"JUNGLE": 0.8}})
+    first = solver.marginals(["Ahri", "LeeSin"])
+    first["Ahri"]["MIDDLE"] = 0.0
+    first.pop("LeeSin")
+    again = solver.marginals(["Ahri", "LeeSin"])
+    assert again["Ahri"]["MIDDLE"] > 0.99
+    assert "LeeSin" in again